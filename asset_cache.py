@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+静态资源缓存
+
+Playwright 启用请求路由后会绕过浏览器自身的 HTTP 缓存，克隆或重置的用户数据目录
+每次都要重新下载厂商的 JS / CSS / 字体。本模块在请求路由中为这些资源提供一个
+本机所有会话共享的磁盘缓存：
+
+- 索引保存在 ASSET_CACHE_DIR/index.db（SQLite，多进程共享），按 URL 记录 ETag、
+  内容摘要、响应头、过期时间和最近使用时间
+- 响应体按 SHA-256 存为 ASSET_CACHE_DIR/blobs/<前两位>/<摘要>，相同内容只存一份
+- 在 Cache-Control max-age 内直接返回缓存；过期后带 If-None-Match 重新验证，304 时返回缓存
+- 总大小超过 ASSET_CACHE_MAX_BYTES 时按最近使用时间淘汰
+
+    python asset_cache.py stats     # 查看缓存条目数和大小
+    python asset_cache.py clear     # 清空缓存
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+import time
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_last_used ON assets (last_used);
+"""
+
+# 响应体已由 Playwright 解码，这些头不能原样回放
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class AssetCache:
+    """磁盘静态资源缓存（每个进程各自创建实例，共享同一目录）"""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        self.cache_dir = cache_dir or config.ASSET_CACHE_DIR
+        self.max_bytes = config.ASSET_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.blob_dir = os.path.join(self.cache_dir, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(self.cache_dir, "index.db"), timeout=30,
+                                    isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.reset_stats()
+
+    def close(self):
+        self.conn.close()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    @staticmethod
+    def cacheable(request):
+        return request.method == "GET" and request.resource_type in config.ASSET_CACHE_TYPES
+
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def lookup(self, url):
+        """返回 (索引行, 响应体)，未命中或文件丢失时返回 (None, None)"""
+        row = self.conn.execute("SELECT * FROM assets WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None, None
+        try:
+            with open(self._blob_path(row["digest"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            self.conn.execute("DELETE FROM assets WHERE url = ?", (url,))
+            return None, None
+        return row, body
+
+    def touch(self, url, expires_at=None):
+        if expires_at is None:
+            self.conn.execute("UPDATE assets SET last_used = ? WHERE url = ?", (time.time(), url))
+        else:
+            self.conn.execute("UPDATE assets SET last_used = ?, expires_at = ? WHERE url = ?",
+                              (time.time(), expires_at, url))
+
+    @staticmethod
+    def _expires_at(headers):
+        cache_control = headers.get("cache-control", "")
+        if "no-store" in cache_control:
+            return None
+        match = MAX_AGE_RE.search(cache_control)
+        max_age = 0 if "no-cache" in cache_control or not match else int(match.group(1))
+        return time.time() + max_age
+
+    def store(self, url, status, headers, body):
+        """保存 200 响应；只缓存带 ETag 或 max-age 的响应"""
+        if status != 200:
+            return
+        headers = {k.lower(): v for k, v in headers.items()}
+        expires_at = self._expires_at(headers)
+        etag = headers.get("etag")
+        if expires_at is None or (not etag and expires_at <= time.time()):
+            return
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        kept = {k: v for k, v in headers.items() if k not in DROP_HEADERS}
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO assets (url, etag, digest, size, headers, expires_at, stored_at, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, digest, len(body), json.dumps(kept), expires_at, now, now),
+        )
+        self.evict()
+
+    def evict(self):
+        """总大小超过上限时按最近使用时间淘汰"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for row in self.conn.execute("SELECT url, digest, size FROM assets ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM assets WHERE url = ?", (row["url"],))
+            total -= row["size"]
+            shared = self.conn.execute("SELECT 1 FROM assets WHERE digest = ? LIMIT 1", (row["digest"],)).fetchone()
+            if shared is None:
+                try:
+                    os.remove(self._blob_path(row["digest"]))
+                except OSError:
+                    pass
+
+    def _fresh(self, row):
+        return row["expires_at"] > time.time()
+
+    def _cached_response(self, row, body):
+        self.bytes_saved += len(body)
+        return {"status": 200, "headers": json.loads(row["headers"]), "body": body}
+
+    async def serve(self, route):
+        """从缓存返回或取回并缓存（asyncio API 的路由），返回 (结果, 节省的字节数)
+
+        结果为 "hits" / "revalidated" / "misses"，与 stats() 的键一致。
+        """
+        request = route.request
+        row, body = self.lookup(request.url)
+        if row is not None and self._fresh(row):
+            self.hits += 1
+            self.touch(request.url)
+            await route.fulfill(**self._cached_response(row, body))
+            return "hits", len(body)
+
+        headers = dict(request.headers)
+        if row is not None and row["etag"]:
+            headers["if-none-match"] = row["etag"]
+        response = await route.fetch(headers=headers)
+        if response.status == 304 and row is not None:
+            self.revalidated += 1
+            self.touch(request.url, self._expires_at(response.headers))
+            await route.fulfill(**self._cached_response(row, body))
+            return "revalidated", len(body)
+
+        self.misses += 1
+        response_body = await response.body()
+        self.store(request.url, response.status, response.headers, response_body)
+        await route.fulfill(response=response, body=response_body)
+        return "misses", 0
+
+    def summary(self):
+        count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM assets").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="静态资源缓存")
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args()
+
+    if args.command == "clear":
+        shutil.rmtree(config.ASSET_CACHE_DIR, ignore_errors=True)
+        print(f"🧹 已清空静态资源缓存: {config.ASSET_CACHE_DIR}")
+        return
+    cache = AssetCache()
+    info = cache.summary()
+    cache.close()
+    print(f"📦 静态资源缓存: {info['entries']} 个条目，"
+          f"{info['bytes'] / (1024 * 1024):.1f}MB / {info['max_bytes'] / (1024 * 1024):.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
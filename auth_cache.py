@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+登录状态缓存
+
+每个厂商在完成登录后通过 context.storage_state() 导出一次 Cookie 与 localStorage，
+之后新建的浏览器上下文直接载入缓存，跳过扫码登录流程。
+缓存按保存时间和登录 Cookie 的过期时间判断是否过期，载入后只发送一个轻量请求复核，
+不做完整的页面加载：请求后登录 Cookie 仍然有效（配置了 AUTH_CHECK_URLS 时还要求该接口返回成功）
+才跳过登录，复核失败时删除缓存并直接进入扫码登录。
+
+未配置 AUTH_CHECK_URLS 时复核只是过期检查：公开的聊天页面无论是否登录都返回 200，只能发现已过期
+或被服务端在响应中清除的登录 Cookie，发现不了服务端已注销、Cookie 仍在的会话（由之后的登录检查发现）。
+
+上下文中已有有效的登录 Cookie 时（持久化用户数据目录、浏览器池中复用的上下文）不载入缓存，
+避免用较旧的缓存覆盖浏览器中更新的会话。
+"""
+
+import json
+import os
+import time
+
+import config
+
+# 页面加载前补齐 localStorage（只写入页面中尚不存在的键，避免覆盖更新的值）
+LOCAL_STORAGE_SCRIPT = """
+((origins) => {
+    const items = origins[location.origin];
+    if (!items) return;
+    for (const [name, value] of items) {
+        if (localStorage.getItem(name) === null) localStorage.setItem(name, value);
+    }
+})(%s)
+"""
+
+
+class AuthStateCache:
+    """单个厂商的登录状态缓存文件"""
+
+    def __init__(self, vendor, cache_dir=None, max_age=None):
+        self.vendor = vendor
+        self.path = os.path.join(cache_dir or config.AUTH_STATE_DIR, f"{vendor}.json")
+        self.max_age = max_age or config.AUTH_STATE_MAX_AGE
+
+    def load(self):
+        """读取缓存的 storage_state，不存在或损坏时返回 None"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, state=None):
+        """缓存存在、未超过最长保存时间，且登录 Cookie 未过期"""
+        try:
+            age = time.time() - os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if age > self.max_age:
+            return False
+
+        state = state or self.load()
+        if not state:
+            return False
+        if not config.AUTH_COOKIE_NAMES.get(self.vendor):
+            return True
+        return self.session_cookies_valid(state.get("cookies", []))
+
+    def save(self, state):
+        """原子写入缓存（包含登录凭据，仅当前用户可读）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        print(f"🔑 已缓存 {self.vendor} 登录状态: {self.path}")
+
+    def invalidate(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def restore_parts(self, state):
+        """返回 (cookies, localStorage 初始化脚本)，供上下文 add_cookies / add_init_script 使用"""
+        origins = {
+            item["origin"]: [[entry["name"], entry["value"]] for entry in item.get("localStorage", [])]
+            for item in state.get("origins", [])
+        }
+        script = LOCAL_STORAGE_SCRIPT % json.dumps(origins, ensure_ascii=False) if origins else None
+        return state.get("cookies", []), script
+
+    def session_cookies_valid(self, cookies):
+        """登录 Cookie 都存在且未过期（expires 为 -1 表示会话 Cookie）"""
+        names = config.AUTH_COOKIE_NAMES.get(self.vendor) or []
+        now = time.time()
+        found = [c for c in cookies if c.get("name") in names]
+        return bool(found) and all(c.get("expires", -1) < 0 or c["expires"] > now for c in found)
+
+    def has_probe(self):
+        """是否配置了复核登录状态的方式（需要登录的接口或登录 Cookie）"""
+        return bool(config.AUTH_CHECK_URLS.get(self.vendor) or config.AUTH_COOKIE_NAMES.get(self.vendor))
+
+    def expiry_only(self):
+        """没有配置需要登录的接口，复核只检查登录 Cookie 是否过期或被清除"""
+        return not config.AUTH_CHECK_URLS.get(self.vendor)
+
+    def check_url(self, base_url):
+        return config.AUTH_CHECK_URLS.get(self.vendor) or base_url
+
+    def is_valid(self, response, cookies):
+        """复核请求成功、没有被重定向到登录页，且请求后上下文中的登录 Cookie 仍然有效
+
+        公开的聊天页面无论是否登录都返回 200，单看响应无法区分；服务端拒绝会话时会在响应中清除
+        或改写登录 Cookie，因此以请求后的 Cookie 为准。配置了需要登录的接口时同时以接口响应为准。
+        """
+        if not response.ok or "login" in response.url.lower():
+            return False
+        if not config.AUTH_COOKIE_NAMES.get(self.vendor):
+            return True
+        return self.session_cookies_valid(cookies)
+
+    def drop_message(self):
+        return f"⚠️ 缓存的 {self.vendor} 登录状态已失效，已删除缓存，直接进入扫码登录"
+
+
+async def restore_auth_state(cache, context, base_url):
+    """把缓存的登录状态载入上下文并复核
+
+    返回 True 表示可以跳过登录流程；没有可用缓存或上下文中已有有效会话时返回 None；
+    复核失败时返回 False，此时缓存文件和已载入的登录 Cookie 都已删除，调用方应直接进入扫码登录。
+    """
+    state = cache.load()
+    if not cache.is_fresh(state):
+        return None
+    if not cache.has_probe():
+        print(f"⚠️ 未配置 {cache.vendor} 的登录状态复核方式，不使用缓存")
+        return None
+    cookies, script = cache.restore_parts(state)
+    try:
+        if cache.session_cookies_valid(await context.cookies()):
+            # 上下文自己的会话可能比缓存更新，不覆盖，由登录检查确认
+            print("🔑 浏览器上下文中已有登录会话，不载入缓存的登录状态")
+            return None
+        await context.add_cookies(cookies)
+        if script:
+            await context.add_init_script(script)
+        # 与上下文共享 Cookie 的 APIRequestContext，只发一个请求，不加载页面资源
+        response = await context.request.get(cache.check_url(base_url), timeout=15000)
+        valid = cache.is_valid(response, await context.cookies())
+        await response.dispose()
+    except Exception as e:
+        print(f"⚠️ 载入缓存的登录状态失败: {str(e)}")
+        return None
+    if not valid:
+        print(cache.drop_message())
+        cache.invalidate()
+        for name in config.AUTH_COOKIE_NAMES.get(cache.vendor) or []:
+            await context.clear_cookies(name=name)
+        return False
+    if cache.expiry_only():
+        print("🔑 已载入缓存的登录状态（未配置 AUTH_CHECK_URLS，仅按登录 Cookie 是否过期判断）")
+    else:
+        print("🔑 已载入缓存的登录状态")
+    return True
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+asyncio 并发会话基准测试
+
+在单个进程、单个事件循环中同时运行多个研究会话（豆包/通义千问交替），
+目标为本地模拟页面服务。每个会话使用同一浏览器下的独立上下文；指定 --tabs-per-context
+时每 N 个会话共用一个上下文（各占一个标签页），用于比较多标签页复用下单位内存的并发数。
+输出每档并发数下的成功数、总耗时、线程数以及进程树内存。
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from playwright.async_api import async_playwright
+
+from browser_launch import BACKGROUND_TAB_ARGS
+from mock_vendor_server import start_mock_server, vendor_urls
+from process_stats import process_tree_rss
+from vendors import load_vendor_class
+
+SESSION_VENDORS = ["doubao", "qwen"]
+
+
+async def _run_session(context, index, urls, work_dir, clipboard_lock):
+    """在给定上下文中新建标签页运行单个会话，返回是否成功"""
+    vendor = SESSION_VENDORS[index % len(SESSION_VENDORS)]
+    session_dir = os.path.join(work_dir, f"session_{index}")
+    os.makedirs(session_dir, exist_ok=True)
+
+    session = load_vendor_class(vendor)(
+        headless=True,
+        workspace_dir=session_dir,
+        topic=f"并发基准测试主题 {index}",
+        base_url=urls[vendor],
+        download_dir=session_dir,
+        context=context,
+    )
+    # 同一上下文中的标签页共享剪贴板
+    session.clipboard_lock = clipboard_lock
+    return await session.run_async()
+
+
+async def _run_context(browser, indexes, urls, work_dir):
+    """在一个上下文中以多个标签页并发运行一组会话"""
+    context = await browser.new_context(accept_downloads=True)
+    clipboard_lock = asyncio.Lock()
+    try:
+        return await asyncio.gather(
+            *(_run_session(context, i, urls, work_dir, clipboard_lock) for i in indexes),
+            return_exceptions=True,
+        )
+    finally:
+        await context.close()
+
+
+async def _sample_peak_rss(stop_event, peak):
+    """会话运行期间周期性采样进程树内存峰值"""
+    while not stop_event.is_set():
+        peak[0] = max(peak[0], process_tree_rss())
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_level(sessions, urls, work_dir, tabs_per_context=1):
+    """以指定并发数运行一轮会话，每 tabs_per_context 个会话共用一个上下文"""
+    groups = [list(range(i, min(i + tabs_per_context, sessions))) for i in range(0, sessions, tabs_per_context)]
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(
+            headless=True,
+            args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"] + BACKGROUND_TAB_ARGS,
+        )
+        stop_event = asyncio.Event()
+        peak = [0]
+        sampler = asyncio.create_task(_sample_peak_rss(stop_event, peak))
+
+        start_time = time.time()
+        grouped = await asyncio.gather(
+            *(_run_context(browser, indexes, urls, work_dir) for indexes in groups),
+            return_exceptions=True,
+        )
+        elapsed = time.time() - start_time
+
+        stop_event.set()
+        await sampler
+        await browser.close()
+
+    succeeded = sum(1 for results in grouped if isinstance(results, list) for r in results if r is True)
+    return {
+        "sessions": sessions,
+        "contexts": len(groups),
+        "succeeded": succeeded,
+        "elapsed": elapsed,
+        "threads": threading.active_count(),
+        "peak_rss_mb": peak[0] / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio 并发会话基准测试")
+    parser.add_argument("--sessions", default="1,5,10,25", help="逗号分隔的并发会话数")
+    parser.add_argument("--completion-delay", type=float, default=10.0, help="模拟研究耗时（秒）")
+    parser.add_argument("--tabs-per-context", type=int, default=1, help="每个浏览器上下文承载的会话（标签页）数")
+    args = parser.parse_args()
+
+    server, base = start_mock_server(completion_delay=args.completion_delay)
+    urls = vendor_urls(base)
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="bench_async_") as work_dir:
+        for sessions in levels:
+            print(f"\n🚀 并发会话数: {sessions} (每个上下文 {args.tabs_per_context} 个标签页)")
+            reports.append(asyncio.run(run_level(sessions, urls, work_dir, max(1, args.tabs_per_context))))
+    server.shutdown()
+
+    print("\n" + "=" * 60)
+    print("📊 asyncio 并发会话基准结果")
+    print("=" * 60)
+    print(f"{'会话数':>6} {'上下文':>6} {'成功':>6} {'耗时(秒)':>10} {'线程数':>6} {'峰值内存(MB)':>12} {'会话/GB':>8}")
+    for r in reports:
+        per_gb = r['sessions'] / (r['peak_rss_mb'] / 1024) if r['peak_rss_mb'] else 0
+        print(f"{r['sessions']:>6} {r['contexts']:>6} {r['succeeded']:>6} {r['elapsed']:>10.1f} {r['threads']:>6} "
+              f"{r['peak_rss_mb']:>12.1f} {per_gb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动配置内存基准测试
+
+分别用 default 与 dense 启动配置同时打开 N 个持久化浏览器上下文（各自独立的用户数据目录），
+在每个上下文中针对本地模拟页面跑完一次研究流程并保持页面打开，
+统计所有会话同时存在时的进程树内存，以及扣除基线后平均每个会话的内存。
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from playwright.async_api import async_playwright
+
+from browser_launch import launch_persistent
+from mock_vendor_server import start_mock_server, vendor_urls
+from process_stats import process_tree_rss
+from vendors import load_vendor_class
+
+VENDORS = ["doubao", "qwen"]
+
+
+async def measure(profile, sessions, urls, work_dir, headless):
+    """用指定启动配置打开 sessions 个会话，返回内存统计"""
+    contexts = []
+    succeeded = 0
+    async with async_playwright() as playwright:
+        baseline = process_tree_rss()
+        start_time = time.time()
+        for index in range(sessions):
+            vendor = VENDORS[index % len(VENDORS)]
+            session_dir = os.path.join(work_dir, f"{profile}_{index}")
+            context = await launch_persistent(playwright, os.path.join(session_dir, "profile"), headless,
+                                              session_dir, profile=profile)
+            await context.grant_permissions(["clipboard-read", "clipboard-write"])
+            contexts.append(context)
+            page = context.pages[0] if context.pages else await context.new_page()
+
+            auto = load_vendor_class(vendor)(
+                headless=headless,
+                workspace_dir=session_dir,
+                topic=f"内存基准测试主题 {index}",
+                base_url=urls[vendor],
+                download_dir=session_dir,
+                context=context,
+                page=page,
+                launch_profile=profile,
+            )
+            auto.trace.log_dir = session_dir
+            if await auto.run_async() and auto.result_path:
+                succeeded += 1
+
+        peak = process_tree_rss()
+        elapsed = time.time() - start_time
+        for context in contexts:
+            await context.close()
+
+    return {
+        "profile": profile,
+        "sessions": sessions,
+        "succeeded": succeeded,
+        "elapsed": elapsed,
+        "total_mb": peak / (1024 * 1024),
+        "per_session_mb": (peak - baseline) / sessions / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动配置内存基准测试")
+    parser.add_argument("--sessions", type=int, default=4, help="同时打开的会话数")
+    parser.add_argument("--profiles", default="default,dense", help="逗号分隔的启动配置")
+    parser.add_argument("--headed-default", action="store_true", help="default 配置使用可见窗口（需要显示器或 Xvfb）")
+    parser.add_argument("--completion-delay", type=float, default=1.0, help="模拟研究耗时（秒）")
+    args = parser.parse_args()
+
+    server, base = start_mock_server(completion_delay=args.completion_delay)
+    urls = vendor_urls(base)
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="bench_dense_") as work_dir:
+        for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+            headless = not (profile == "default" and args.headed_default)
+            print(f"\n🚀 启动配置: {profile} × {args.sessions}")
+            reports.append(asyncio.run(measure(profile, args.sessions, urls, work_dir, headless)))
+    server.shutdown()
+
+    print("\n" + "=" * 60)
+    print("📊 启动配置内存基准结果")
+    print("=" * 60)
+    print(f"{'配置':>8} {'会话数':>6} {'成功':>6} {'耗时(秒)':>10} {'总内存(MB)':>12} {'每会话(MB)':>12}")
+    for r in reports:
+        print(f"{r['profile']:>8} {r['sessions']:>6} {r['succeeded']:>6} {r['elapsed']:>10.1f} "
+              f"{r['total_mb']:>12.1f} {r['per_session_mb']:>12.1f}")
+    if len(reports) == 2 and reports[1]["per_session_mb"] > 0:
+        ratio = reports[0]["per_session_mb"] / reports[1]["per_session_mb"]
+        print(f"\n⚡ 每会话内存: {reports[1]['profile']} 为 {reports[0]['profile']} 的 1/{ratio:.1f}")
+
+
+if __name__ == "__main__":
+    main()
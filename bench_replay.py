@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线回放基准测试
+
+针对本地模拟页面端到端运行同步版 DoubaoResearchAuto / QwenResearchAuto
+（可选先走一遍模拟扫码登录），统计：
+
+- 每个步骤的耗时（来自运行追踪）
+- 自动化自身开销：总耗时 - 模拟研究耗时 - 模拟扫码耗时
+- 运行期间进程树（Python + Playwright 驱动 + Chromium）的内存峰值
+
+用于在不访问真实站点的情况下比较改动前后的数字。
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from mock_vendor_server import start_mock_server, vendor_urls
+from process_stats import process_tree_rss
+from vendors import VENDOR_NAMES, load_vendor_class
+
+
+class PeakRssSampler:
+    """后台线程周期性采样进程树内存峰值"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, process_tree_rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, process_tree_rss())
+
+
+def run_once(vendor, url, work_dir, index, completion_delay, login_delay):
+    """完整运行一次，返回本次的统计结果"""
+    run_dir = os.path.join(work_dir, f"{vendor}_{index}")
+    os.makedirs(run_dir, exist_ok=True)
+    vendor_class = load_vendor_class(vendor)
+
+    with PeakRssSampler() as sampler:
+        start_time = time.time()
+        auto = vendor_class(
+            headless=True,
+            workspace_dir=run_dir,
+            topic=f"回放基准测试主题 {index}",
+            base_url=url,
+            profile_dir=os.path.join(run_dir, "profile"),
+            download_dir=run_dir,
+        )
+        launch_seconds = time.time() - start_time
+        auto.trace.log_dir = run_dir
+        try:
+            success = bool(auto.run() and auto.result_path)
+        finally:
+            auto.close()
+        total = time.time() - start_time
+
+    simulated = completion_delay + (login_delay or 0)
+    return {
+        "vendor": vendor,
+        "success": success,
+        "total": total,
+        "overhead": total - simulated,
+        "steps": {"launch": launch_seconds * 1000, **{s["step"]: s["duration_ms"] for s in auto.trace.steps}},
+        "peak_rss_mb": sampler.peak / (1024 * 1024),
+    }
+
+
+def _median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else 0
+
+
+def report(results, completion_delay, login_delay):
+    print("\n" + "=" * 60)
+    print("📊 离线回放基准结果")
+    print("=" * 60)
+    print(f"模拟研究耗时 {completion_delay}秒" + (f"，模拟扫码耗时 {login_delay}秒" if login_delay else ""))
+    for vendor in VENDOR_NAMES:
+        runs = [r for r in results if r["vendor"] == vendor]
+        if not runs:
+            continue
+        ok = sum(1 for r in runs if r["success"])
+        print(f"\n🏭 {VENDOR_NAMES[vendor]}: {len(runs)} 次运行，成功 {ok} 次")
+        step_names = []
+        for r in runs:
+            step_names.extend(s for s in r["steps"] if s not in step_names)
+        for step in step_names:
+            values = [r["steps"][step] for r in runs if step in r["steps"]]
+            print(f"  {step:<32} 中位数 {_median(values) / 1000:8.2f}秒  最大 {max(values) / 1000:8.2f}秒")
+        print(f"  {'总耗时':<30} 中位数 {_median([r['total'] for r in runs]):8.2f}秒")
+        print(f"  {'自动化开销':<29} 中位数 {_median([r['overhead'] for r in runs]):8.2f}秒")
+        print(f"  {'内存峰值':<30} 最大 {max(r['peak_rss_mb'] for r in runs):10.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线回放基准测试")
+    parser.add_argument("--vendors", default=",".join(VENDOR_NAMES), help="逗号分隔的厂商列表")
+    parser.add_argument("--runs", type=int, default=3, help="每个厂商的运行次数")
+    parser.add_argument("--completion-delay", type=float, default=5.0, help="模拟研究耗时（秒）")
+    parser.add_argument("--login-delay", type=float, default=None, help="模拟扫码耗时（秒），不指定则跳过登录流程")
+    args = parser.parse_args()
+
+    server, base = start_mock_server(completion_delay=args.completion_delay)
+    urls = vendor_urls(base, login_delay=args.login_delay)
+    vendors = [v.strip() for v in args.vendors.split(",") if v.strip()]
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_replay_") as work_dir:
+        for vendor in vendors:
+            for index in range(args.runs):
+                print(f"\n🚀 {VENDOR_NAMES[vendor]} 第 {index + 1}/{args.runs} 次")
+                results.append(run_once(vendor, urls[vendor], work_dir, index,
+                                        args.completion_delay, args.login_delay))
+    server.shutdown()
+    report(results, args.completion_delay, args.login_delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+浏览器启动公共逻辑
+
+启动配置：
+- default: 1920×1080 最大化窗口，可配合 Xvfb / noVNC 观察
+- dense:   高密度部署用的无头低内存配置（新版 headless、较小视口、限制渲染进程数、
+           关闭后台服务），登录后再由 request_router 屏蔽图片/字体/媒体请求；需要扫码时由自动化类临时切换为可见窗口
+
+浏览器统一使用 Playwright 的 asyncio API，同步调用方（任务队列 worker、融合研究等）通过 run_sync() 运行。
+"""
+
+import asyncio
+import glob
+import os
+import shutil
+import threading
+
+import config
+
+# Chromium 启动参数
+LAUNCH_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--window-size=1920,1080",
+    "--start-maximized",
+]
+
+# dense 配置的 Chromium 启动参数
+DENSE_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--headless=new",
+    f"--renderer-process-limit={config.DENSE_RENDERER_PROCESS_LIMIT}",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,BackForwardCache,AutofillServerCommunication",
+]
+
+# 多标签页复用时后台标签页也要按时运行定时器、接收流式响应（见 tab_multiplexer.py）
+BACKGROUND_TAB_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+LAUNCH_PROFILES = ("default", "dense")
+
+# 每个线程常驻的 asyncio.Runner（见 run_sync）
+_runners = threading.local()
+
+
+def run_sync(coro):
+    """在当前线程常驻的事件循环中运行协程并返回结果
+
+    Playwright 对象绑定在创建它的事件循环上，同一线程内的多次调用共用一个循环，
+    因此浏览器池借出的上下文、自动化实例的 run() 和 close() 可以分开调用。
+    主线程中按 Ctrl+C 会取消正在运行的协程（协程内完成清理）后抛出 KeyboardInterrupt。
+    """
+    runner = getattr(_runners, "runner", None)
+    if runner is None:
+        runner = _runners.runner = asyncio.Runner()
+    return runner.run(coro)
+
+
+def clean_profile_locks(profile_dir, verbose=False):
+    """清理 Chromium 锁文件，防止 "profile in use" 错误"""
+    for lock_pattern in ["SingletonLock", "SingletonCookie", "SingletonSocket"]:
+        for lock_file in glob.glob(os.path.join(profile_dir, lock_pattern)):
+            if os.path.lexists(lock_file):
+                if verbose:
+                    print(f"🧹 发现旧的锁文件，正在清理: {lock_file}")
+                try:
+                    if os.path.islink(lock_file) or os.path.isfile(lock_file):
+                        os.remove(lock_file)
+                    elif os.path.isdir(lock_file):
+                        shutil.rmtree(lock_file)
+                except Exception as e:
+                    if verbose:
+                        print(f"⚠️ 清理锁文件失败: {e}")
+
+
+def launch_persistent(playwright, profile_dir, headless=False, download_dir=None, profile=None, extra_args=None):
+    """使用用户数据目录启动持久化浏览器上下文（profile 为启动配置名，默认取 config.LAUNCH_PROFILE）
+
+    返回需要 await 的协程。extra_args 追加到所选配置的 Chromium 启动参数之后。
+    """
+    profile = profile or config.LAUNCH_PROFILE
+    extra_args = list(extra_args or [])
+    os.makedirs(profile_dir, exist_ok=True)
+    print(f"📁 Chrome 用户数据目录: {profile_dir}")
+    if profile == "dense":
+        width, height = config.DENSE_VIEWPORT
+        return playwright.chromium.launch_persistent_context(
+            user_data_dir=profile_dir,
+            headless=True,
+            args=DENSE_ARGS + extra_args,
+            viewport={"width": width, "height": height},
+            ignore_default_args=["--enable-automation"],
+            downloads_path=download_dir,
+        )
+    return playwright.chromium.launch_persistent_context(
+        user_data_dir=profile_dir,
+        headless=headless,
+        args=LAUNCH_ARGS + extra_args,
+        viewport=None,  # 让浏览器窗口决定视口大小
+        ignore_default_args=["--enable-automation"],
+        downloads_path=download_dir,
+    )
+
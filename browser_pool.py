@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+预热浏览器上下文池
+
+长期持有若干个已启动、已打开厂商聊天页面（并沿用用户数据目录中登录状态）的浏览器上下文，
+任务直接借用，省去每次启动 Playwright、启动浏览器和加载页面的开销。
+上下文在使用次数达到上限或 JS 堆内存增长过多时回收重建。
+池使用 asyncio API，同步的 worker 通过 browser_launch.run_sync() 在同一个事件循环中调用。
+"""
+
+import time
+from contextlib import asynccontextmanager
+
+from playwright.async_api import async_playwright
+
+import config
+from browser_launch import clean_profile_locks, launch_persistent
+from metrics import registry
+from request_router import RequestRouter, routing_needed
+
+
+class PooledContext:
+    """池中的一个浏览器上下文"""
+
+    def __init__(self, slot, profile_dir, context, page):
+        self.slot = slot
+        self.profile_dir = profile_dir
+        self.context = context
+        self.page = page
+        self.uses = 0
+        self.baseline_heap = 0
+        # 归还时关闭上下文后执行的回调（例如把会话目录提升为黄金目录，必须在浏览器退出后复制）
+        self.after_close = None
+        self.created_at = time.time()
+
+    def is_alive(self):
+        try:
+            return not self.page.is_closed() and len(self.context.pages) > 0
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """同一进程内的预热浏览器上下文池（asyncio API，需在创建它的事件循环中使用）"""
+
+    def __init__(self, vendor, profile_dirs, headless=False, base_url=None, download_dir=None,
+                 max_uses=None, max_heap_growth_mb=None):
+        self.vendor = vendor
+        self.profile_dirs = list(profile_dirs)
+        self.headless = headless
+        self.base_url = base_url or config.VENDOR_URLS[vendor]
+        self.download_dir = download_dir or config.SYSTEM_DOWNLOADS_DIR
+        self.max_uses = max_uses or config.BROWSER_POOL_MAX_USES
+        self.max_heap_growth = (max_heap_growth_mb or config.BROWSER_POOL_MAX_HEAP_GROWTH_MB) * 1024 * 1024
+        self.playwright = None
+        self.idle = []
+        self.busy = []
+
+    async def start(self):
+        """启动并预热所有上下文"""
+        print(f"🔥 正在预热浏览器池 ({self.vendor} × {len(self.profile_dirs)})...")
+        self.playwright = await async_playwright().start()
+        for slot in range(len(self.profile_dirs)):
+            self.idle.append(await self._launch(slot))
+        print("✅ 浏览器池预热完成")
+        return self
+
+    async def _launch(self, slot):
+        profile_dir = self.profile_dirs[slot]
+        clean_profile_locks(profile_dir)
+        context = await launch_persistent(self.playwright, profile_dir, self.headless, self.download_dir)
+        registry().gauge_add("drf_active_contexts", 1, vendor=self.vendor)
+        await context.grant_permissions(["clipboard-read", "clipboard-write"])
+        if routing_needed(config.LAUNCH_PROFILE):
+            # 预热导航也走请求路由
+            await RequestRouter.install(context, self.vendor)
+        page = context.pages[0] if context.pages else await context.new_page()
+        item = PooledContext(slot, profile_dir, context, page)
+        await self._warm(item)
+        item.baseline_heap = await self._heap_size(item)
+        return item
+
+    async def _warm(self, item):
+        """让页面停留在厂商聊天首页，供下一个任务直接使用"""
+        try:
+            await item.page.goto(self.base_url, wait_until="networkidle", timeout=60000)
+        except Exception as e:
+            print(f"⚠️ 预热页面失败: {str(e)}")
+
+    async def _heap_size(self, item):
+        try:
+            return await item.page.evaluate("performance.memory ? performance.memory.usedJSHeapSize : 0")
+        except Exception:
+            return 0
+
+    async def _recycle(self, item):
+        print(f"♻️ 回收浏览器上下文 #{item.slot} (已使用 {item.uses} 次)")
+        await self._close_context(item)
+        if item.after_close:
+            after_close, item.after_close = item.after_close, None
+            try:
+                after_close()
+            except Exception as e:
+                print(f"⚠️ 上下文关闭后的处理失败: {str(e)}")
+        return await self._launch(item.slot)
+
+    async def acquire(self):
+        """借出一个预热好的上下文（上次重建失败的上下文在这里重新启动）"""
+        if not self.idle:
+            raise RuntimeError("浏览器池中没有空闲的上下文")
+        item = self.idle.pop(0)
+        if not item.is_alive():
+            try:
+                item = await self._recycle(item)
+            except Exception:
+                # 启动失败时槽位留在池中，下次借出时再试
+                self.idle.append(item)
+                raise
+        self.busy.append(item)
+        return item
+
+    async def release(self, item):
+        """归还上下文：达到回收条件或设置了 after_close 时重建，否则重新预热
+
+        重建失败（用户数据目录被占用、Chromium 崩溃等）时关闭上下文后仍把槽位放回池中，
+        由下一次 acquire() 重新启动，池不会因此少一个上下文。
+        """
+        self.busy.remove(item)
+        item.uses += 1
+        try:
+            heap_growth = await self._heap_size(item) - item.baseline_heap if item.is_alive() else 0
+            if (item.after_close or not item.is_alive() or item.uses >= self.max_uses
+                    or heap_growth > self.max_heap_growth):
+                item = await self._recycle(item)
+            else:
+                # 关闭任务期间额外打开的页面
+                for page in item.context.pages:
+                    if page != item.page:
+                        await page.close()
+                await self._warm(item)
+        except Exception as e:
+            print(f"⚠️ 重建浏览器上下文 #{item.slot} 失败，下次借出时重试: {str(e)}")
+            await self._close_context(item)
+        self.idle.append(item)
+
+    @asynccontextmanager
+    async def lease(self):
+        item = await self.acquire()
+        try:
+            yield item
+        finally:
+            # 归还失败不能覆盖任务本身的结果
+            try:
+                await self.release(item)
+            except Exception as e:
+                print(f"⚠️ 归还浏览器上下文失败: {str(e)}")
+
+    def stats(self):
+        return {"idle": len(self.idle), "busy": len(self.busy)}
+
+    async def _close_context(self, item):
+        if item.context is None:
+            return
+        try:
+            await item.context.close()
+        except Exception:
+            pass
+        item.context = None
+        registry().gauge_add("drf_active_contexts", -1, vendor=self.vendor)
+
+    async def close(self):
+        for item in self.idle + self.busy:
+            await self._close_context(item)
+        self.idle = []
+        self.busy = []
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行检查点
+
+每次运行在 CHECKPOINT_DIR/<vendor>_<run_id>.json 中记录厂商、主题、当前对话地址、
+已完成的步骤和时间戳，每完成一个步骤原子写入一次。进程在等待研究结果期间退出时，
+研究仍在厂商侧继续；之后以恢复模式运行会回到检查点记录的对话地址，从已完成的步骤之后继续，
+不会重新提交主题。运行成功后删除检查点文件。
+
+    python checkpoint.py list       # 查看未完成的检查点
+"""
+
+import argparse
+import json
+import os
+import time
+
+import config
+
+STATUS_RUNNING = "running"
+STATUS_FAILED = "failed"
+STATUS_INTERRUPTED = "interrupted"
+
+
+class Checkpoint:
+    """单次运行的检查点"""
+
+    def __init__(self, vendor, topic, run_id, checkpoint_dir=None, state=None):
+        self.checkpoint_dir = checkpoint_dir or config.CHECKPOINT_DIR
+        now = time.time()
+        self.state = state or {
+            "vendor": vendor,
+            "topic": topic,
+            "run_id": run_id,
+            "status": STATUS_RUNNING,
+            "step": None,
+            "steps": {},
+            "conversation_url": None,
+            "submitted_at": None,
+            "started_at": now,
+            "updated_at": now,
+        }
+        self._tracked = None
+
+    @property
+    def path(self):
+        return os.path.join(self.checkpoint_dir, f"{self.state['vendor']}_{self.state['run_id']}.json")
+
+    @property
+    def step(self):
+        return self.state["step"]
+
+    @property
+    def submitted(self):
+        """主题是否已经提交给厂商"""
+        return self.state["submitted_at"] is not None
+
+    @property
+    def conversation_url(self):
+        return self.state["conversation_url"]
+
+    def save(self):
+        if not config.CHECKPOINT_ENABLED:
+            return
+        self.state["updated_at"] = time.time()
+        try:
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 写入检查点失败: {str(e)}")
+
+    def done(self, step):
+        return step in self.state["steps"]
+
+    def step_done(self, step, url=None, submitted=False):
+        """记录已完成的步骤；submitted 表示该步骤已把主题提交给厂商"""
+        now = time.time()
+        self.state["step"] = step
+        self.state["steps"][step] = now
+        self.state["status"] = STATUS_RUNNING
+        if submitted and self.state["submitted_at"] is None:
+            self.state["submitted_at"] = now
+        if url and self.submitted:
+            self.state["conversation_url"] = url
+        self.save()
+
+    def track(self, page):
+        """提交后页面地址变化（单页应用切换到新对话）时同步更新对话地址"""
+        def on_navigated(frame):
+            if frame == page.main_frame and self.submitted and frame.url != self.state["conversation_url"]:
+                self.state["conversation_url"] = frame.url
+                self.save()
+        self.untrack()
+        self._tracked = (page, on_navigated)
+        page.on("framenavigated", on_navigated)
+
+    def untrack(self):
+        """移除页面监听（浏览器池中的页面会被后续任务复用）"""
+        if self._tracked:
+            page, handler = self._tracked
+            try:
+                page.remove_listener("framenavigated", handler)
+            except Exception:
+                pass
+            self._tracked = None
+
+    def finish(self, success, interrupted=False):
+        """运行成功删除检查点，失败或被中断时保留以便恢复"""
+        if success:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            return
+        self.state["status"] = STATUS_INTERRUPTED if interrupted else STATUS_FAILED
+        self.save()
+
+    @classmethod
+    def load(cls, vendor, run_id=None, checkpoint_dir=None):
+        """读取指定运行的检查点，没有时返回 None
+
+        不指定 run_id 时取该厂商最近一次失败或被中断的检查点：仍在运行中的检查点可能属于另一个
+        正在进行的运行，队列任务（job-<任务ID>）的检查点由任务队列按运行 ID 恢复，都不自动选取。
+        """
+        checkpoint_dir = checkpoint_dir or config.CHECKPOINT_DIR
+        if run_id:
+            candidates = [os.path.join(checkpoint_dir, f"{vendor}_{run_id}.json")]
+        else:
+            candidates = [s["_path"] for s in list_checkpoints(checkpoint_dir)
+                          if s.get("vendor") == vendor and s.get("status") in (STATUS_FAILED, STATUS_INTERRUPTED)
+                          and not str(s.get("run_id")).startswith("job-")]
+        for path in candidates:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            state.pop("_path", None)
+            return cls(vendor, state["topic"], state["run_id"], checkpoint_dir, state=state)
+        return None
+
+
+def list_checkpoints(checkpoint_dir=None):
+    """返回所有检查点状态，最近更新的在前"""
+    checkpoint_dir = checkpoint_dir or config.CHECKPOINT_DIR
+    states = []
+    if not os.path.isdir(checkpoint_dir):
+        return states
+    for name in os.listdir(checkpoint_dir):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(checkpoint_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        state["_path"] = path
+        states.append(state)
+    states.sort(key=lambda s: s.get("updated_at", 0), reverse=True)
+    return states
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="运行检查点")
+    parser.add_argument("command", choices=["list"])
+    args = parser.parse_args()
+
+    states = list_checkpoints()
+    if not states:
+        print("📭 没有未完成的检查点")
+    for state in states:
+        updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state["updated_at"]))
+        print(f"📌 {state['vendor']} {state['run_id']} [{state['status']}] 步骤: {state['step']}  "
+              f"更新: {updated}\n   主题: {state['topic']}\n   对话: {state['conversation_url'] or '-'}")
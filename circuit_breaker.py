@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+厂商熔断
+
+同一厂商连续失败 CIRCUIT_FAILURE_THRESHOLD 次后熔断（open）：该厂商的 worker 不再领取新任务，
+任务留在队列中等待。冷却 CIRCUIT_COOLDOWN 秒后进入半开（half_open），只放行一个 worker
+领取一个任务作为探测：探测成功则恢复（closed），失败则重新熔断并再次冷却。
+
+状态保存在任务队列数据库的 circuits 表中，所有 worker 进程共享：
+
+    python circuit_breaker.py status                 # 查看各厂商的熔断状态
+    python circuit_breaker.py reset --vendor doubao  # 手动恢复
+"""
+
+import argparse
+import sqlite3
+import time
+
+import config
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS circuits (
+    vendor TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    opened_at REAL,
+    probe_at REAL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class CircuitBreaker:
+    """基于 SQLite 的厂商熔断器（每个进程各自创建实例；多标签页模式在线程中串行使用同一实例）"""
+
+    def __init__(self, db_path=None, threshold=None, cooldown=None, probe_timeout=None):
+        self.db_path = db_path or config.JOB_DB_PATH
+        self.threshold = threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.cooldown = config.CIRCUIT_COOLDOWN if cooldown is None else cooldown
+        # 探测任务的 worker 异常退出时，超过该时间允许其他 worker 重新探测
+        self.probe_timeout = probe_timeout or config.JOB_TIME_BUDGET or config.JOB_LEASE_TIMEOUT
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def state(self, vendor):
+        row = self.conn.execute("SELECT * FROM circuits WHERE vendor = ?", (vendor,)).fetchone()
+        return dict(row) if row else {"vendor": vendor, "state": STATE_CLOSED, "failures": 0,
+                                      "opened_at": None, "probe_at": None, "updated_at": None}
+
+    def allow(self, vendor):
+        """是否可以为该厂商领取新任务；返回 False、True，或 STATE_HALF_OPEN 表示本 worker 负责探测"""
+        current = self.state(vendor)
+        if current["state"] == STATE_CLOSED:
+            return True
+        now = time.time()
+        # 条件更新保证同一时刻只有一个 worker 拿到探测机会
+        cursor = self.conn.execute(
+            "UPDATE circuits SET state = ?, probe_at = ?, updated_at = ? WHERE vendor = ? AND "
+            "((state = ? AND opened_at <= ?) OR (state = ? AND probe_at <= ?))",
+            (STATE_HALF_OPEN, now, now, vendor,
+             STATE_OPEN, now - self.cooldown, STATE_HALF_OPEN, now - self.probe_timeout),
+        )
+        if cursor.rowcount == 1:
+            print(f"🩺 {vendor} 熔断冷却结束，放行一个任务进行探测")
+            return STATE_HALF_OPEN
+        return False
+
+    def release_probe(self, vendor):
+        """拿到探测机会但没有可领取的任务时交还，下一次轮询可以重新探测"""
+        self.conn.execute(
+            "UPDATE circuits SET state = ?, updated_at = ? WHERE vendor = ? AND state = ?",
+            (STATE_OPEN, time.time(), vendor, STATE_HALF_OPEN),
+        )
+
+    def record_success(self, vendor):
+        current = self.state(vendor)
+        if current["state"] == STATE_CLOSED and current["failures"] == 0:
+            return
+        if current["state"] != STATE_CLOSED:
+            print(f"✅ {vendor} 探测成功，解除熔断")
+        self._set(vendor, STATE_CLOSED, 0, None, None)
+
+    def record_failure(self, vendor):
+        """记录一次失败，达到阈值（或探测失败）时熔断"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = self.state(vendor)
+            failures = current["failures"] + 1
+            if current["state"] == STATE_HALF_OPEN or failures >= self.threshold:
+                self._set(vendor, STATE_OPEN, failures, time.time(), None)
+                opened = True
+            else:
+                self._set(vendor, current["state"], failures, current["opened_at"], current["probe_at"])
+                opened = False
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        if opened:
+            print(f"🚫 {vendor} 连续失败 {failures} 次，熔断 {self.cooldown:.0f} 秒")
+        return opened
+
+    def reset(self, vendor=None):
+        if vendor:
+            self.conn.execute("DELETE FROM circuits WHERE vendor = ?", (vendor,))
+        else:
+            self.conn.execute("DELETE FROM circuits")
+
+    def states(self):
+        return [dict(r) for r in self.conn.execute("SELECT * FROM circuits ORDER BY vendor").fetchall()]
+
+    def _set(self, vendor, state, failures, opened_at, probe_at):
+        self.conn.execute(
+            "INSERT INTO circuits (vendor, state, failures, opened_at, probe_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(vendor) DO UPDATE SET state = excluded.state, "
+            "failures = excluded.failures, opened_at = excluded.opened_at, probe_at = excluded.probe_at, "
+            "updated_at = excluded.updated_at",
+            (vendor, state, failures, opened_at, probe_at, time.time()),
+        )
+
+
+def _format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="厂商熔断")
+    parser.add_argument("command", choices=["status", "reset"])
+    parser.add_argument("--vendor", default=None)
+    args = parser.parse_args()
+
+    breaker = CircuitBreaker()
+    try:
+        if args.command == "status":
+            states = breaker.states()
+            if not states:
+                print("✅ 没有熔断记录")
+            for item in states:
+                print(f"🔌 {item['vendor']} [{item['state']}] 连续失败 {item['failures']} 次  "
+                      f"熔断时间: {_format_time(item['opened_at'])}")
+        elif args.command == "reset":
+            breaker.reset(args.vendor)
+            print(f"✅ 已恢复 {args.vendor or '所有厂商'}")
+    finally:
+        breaker.close()
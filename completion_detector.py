@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+事件驱动的研究完成检测
+
+通过 page.wait_for_function(polling="mutation") 在页面内用 MutationObserver 监听 DOM 变化，
+"终止任务" / "直接开始研究" 按钮出现或消失时立即返回 Python，不再定时轮询 is_visible()。
+等待期间只有一个挂起的 CDP 调用，空闲时没有额外的往返。
+
+从检查点恢复时研究可能已在进程退出期间完成，"终止任务" 按钮不会再出现；此时传入 done_selector
+（结果的下载按钮等只在完成后出现的元素），该元素可见且没有 "终止任务" 按钮即判定完成。
+"""
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# 检测到的页面状态
+STATE_START = "start"      # "直接开始研究" 按钮出现，需要点击
+STATE_RUNNING = "running"  # "终止任务" 按钮出现，研究进行中
+STATE_DONE = "done"        # "终止任务" 按钮出现后又消失，研究完成
+
+# 页面内判定脚本：在每次 DOM 变化时执行，返回非假值时 wait_for_function 结束
+STATE_SCRIPT = """
+([stopText, startText, seenStop, doneSelector]) => {
+    const shown = (el) => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== "hidden";
+    const isVisible = (text) => {
+        const result = document.evaluate(
+            `//*[text()[contains(., "${text}")]]`,
+            document,
+            null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE,
+            null
+        );
+        for (let i = 0; i < result.snapshotLength; i++) {
+            if (shown(result.snapshotItem(i))) {
+                return true;
+            }
+        }
+        return false;
+    };
+    if (isVisible(startText)) return "start";
+    const stopVisible = isVisible(stopText);
+    if (stopVisible && !seenStop) return "running";
+    if (!stopVisible && seenStop) return "done";
+    if (!stopVisible && doneSelector && Array.from(document.querySelectorAll(doneSelector)).some(shown)) return "done";
+    return false;
+}
+"""
+
+
+class CompletionDetector:
+    """监听研究任务生命周期按钮的状态变化（asyncio API）"""
+
+    def __init__(self, page, stop_text="终止任务", start_text="直接开始研究", done_selector=None):
+        self.page = page
+        self.stop_text = stop_text
+        self.start_text = start_text
+        self.done_selector = done_selector
+        self.seen_stop = False
+
+    async def next_state(self, timeout_ms):
+        """等待下一次状态变化，超时返回 None"""
+        try:
+            handle = await self.page.wait_for_function(
+                STATE_SCRIPT,
+                arg=[self.stop_text, self.start_text, self.seen_stop, self.done_selector],
+                polling="mutation",
+                timeout=timeout_ms,
+            )
+        except PlaywrightTimeoutError:
+            return None
+        state = await handle.json_value()
+        if state == STATE_RUNNING:
+            self.seen_stop = True
+        return state
+
+    async def click_start(self, timeout_ms=5000):
+        """点击 "直接开始研究" 并等待按钮消失，避免重复触发"""
+        start_btn = self.page.get_by_text(self.start_text).first
+        await start_btn.click()
+        try:
+            await start_btn.wait_for(state="hidden", timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            pass
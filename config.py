@@ -29,9 +29,179 @@ LOG_DIR = os.path.join(WORKSPACE_DIR, "logs")
 # 豆包网址配置
 DOUBAO_URL = "https://www.doubao.com/chat/"
 
+# 通义千问网址配置
+QWEN_URL = "https://www.qianwen.com/chat/"
+
+# 各厂商聊天页面
+VENDOR_URLS = {
+    "doubao": DOUBAO_URL,
+    "qwen": QWEN_URL,
+}
+
 # 研究主题配置
 RESEARCH_TOPIC = "调用主流模型厂商提供深入研究功能，有没有这样一款产品，聚合这个功能就是一个输入调研主题分别调用这个模型厂商提供的深度研究能力"
 
+# 并行研究时各厂商独立的浏览器用户数据目录（同一目录不能被两个浏览器同时打开）
+VENDOR_PROFILE_DIRS = {
+    "doubao": os.path.join(WORKSPACE_DIR, "chrome_profile_doubao"),
+    "qwen": os.path.join(WORKSPACE_DIR, "chrome_profile_qwen"),
+}
+
+# 并发会话从上面的厂商目录（黄金目录）克隆独立的用户数据目录使用
+PROFILE_CLONING = os.environ.get("PROFILE_CLONING", "true").lower() == "true"
+
+# 会话克隆目录的存放位置
+PROFILE_SESSIONS_DIR = os.path.join(WORKSPACE_DIR, "profile_sessions")
+
+# 研究任务队列数据库（位于工作区，容器重启后任务不会丢失）
+JOB_DB_PATH = os.path.join(WORKSPACE_DIR, "jobs.db")
+
+# 每个厂商同时运行的浏览器（worker）数量，可通过环境变量覆盖
+WORKER_CONCURRENCY = {
+    "doubao": int(os.environ.get("DOUBAO_WORKERS", "1")),
+    "qwen": int(os.environ.get("QWEN_WORKERS", "1")),
+}
+
+# worker 空闲时轮询队列的间隔（秒）
+JOB_POLL_INTERVAL = 5
+
+# 运行中任务的心跳间隔与过期时间（秒），心跳过期的任务会被重新排队
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_LEASE_TIMEOUT = 300
+
+# 等待研究完成期间打印进度的间隔（秒），期间不产生额外的页面轮询
+COMPLETION_PROGRESS_INTERVAL = 60
+
+# 研究结果获取方式：ui 为页面下载/剪贴板，network 为直接从对话接口的流式响应重建报告
+RESULT_CAPTURE_MODE = os.environ.get("RESULT_CAPTURE_MODE", "ui")
+
+# network 模式下需要捕获的对话接口 URL（正则）
+CAPTURE_URL_PATTERNS = {
+    "doubao": [r"/samantha/chat/completion"],
+    "qwen": [r"/api/v\d+/chat", r"/dialog/conversation"],
+}
+
+# 研究进行期间是否把正文实时写入 .partial.md（完成后原子重命名为最终结果）
+STREAM_PARTIAL = os.environ.get("STREAM_PARTIAL", "false").lower() == "true"
+
+# .partial.md 的 fsync 间隔（秒）
+PARTIAL_FSYNC_INTERVAL = 10
+
+# worker 是否使用预热浏览器池（任务之间复用已打开聊天页面的浏览器）
+BROWSER_POOL_ENABLED = os.environ.get("BROWSER_POOL_ENABLED", "true").lower() == "true"
+
+# 池中上下文使用多少次后回收重建
+BROWSER_POOL_MAX_USES = 20
+
+# 池中上下文 JS 堆内存相对预热时增长超过该值（MB）时回收重建
+BROWSER_POOL_MAX_HEAP_GROWTH_MB = 300
+
+# 是否把每次运行的步骤耗时写入 LOG_DIR/trace_YYYYMMDD.jsonl
+TRACE_ENABLED = os.environ.get("TRACE_ENABLED", "true").lower() == "true"
+
+# 浏览器启动配置：default（1920×1080 窗口）/ dense（无头低内存，见 browser_launch.py）
+LAUNCH_PROFILE = os.environ.get("LAUNCH_PROFILE", "default")
+
+# dense 配置的视口大小、渲染进程上限和登录后屏蔽的资源类型
+DENSE_VIEWPORT = (1280, 800)
+DENSE_RENDERER_PROCESS_LIMIT = 2
+DENSE_BLOCKED_RESOURCE_TYPES = ["image", "font", "media"]
+
+# 请求路由：按 URL 规则和资源类型拦截自动化用不到的请求（见 request_router.py）
+# 默认关闭：启用路由后 Playwright 绕过浏览器 HTTP 缓存（dense 启动配置始终注册路由）
+ROUTING_ENABLED = os.environ.get("ROUTING_ENABLED", "false").lower() == "true"
+
+# 所有厂商共用的拦截规则（第三方统计与监控上报）
+ROUTING_DENY_COMMON = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"hm\.baidu\.com",
+]
+
+# 各厂商的路由规则：allow 优先于 deny 和 block_types；二维码和图标依赖图片与字体，默认只按类型拦截媒体
+ROUTING_RULES = {
+    "doubao": {
+        "allow": [],
+        "deny": [r"mcs\.zijieapi\.com", r"mon\.zijieapi\.com", r"/monitor_browser/collect", r"slardar"],
+        "block_types": ["media"],
+    },
+    "qwen": {
+        "allow": [],
+        "deny": [r"arms-retcode\.aliyuncs\.com", r"mmstat\.com", r"/aplus", r"sentry"],
+        "block_types": ["media"],
+    },
+}
+
+# 静态资源缓存：请求路由中缓存厂商的 JS / CSS / 字体，本机所有会话共享（见 asset_cache.py）
+ASSET_CACHE_ENABLED = os.environ.get("ASSET_CACHE_ENABLED", "false").lower() == "true"
+ASSET_CACHE_DIR = os.path.join(WORKSPACE_DIR, "asset_cache")
+ASSET_CACHE_MAX_BYTES = int(os.environ.get("ASSET_CACHE_MAX_MB", "512")) * 1024 * 1024
+ASSET_CACHE_TYPES = ["script", "stylesheet", "font"]
+
+# 运行检查点：每完成一个步骤写入 CHECKPOINT_DIR，进程退出后可从原对话恢复（见 checkpoint.py）
+CHECKPOINT_ENABLED = os.environ.get("CHECKPOINT_ENABLED", "true").lower() == "true"
+CHECKPOINT_DIR = os.path.join(WORKSPACE_DIR, "checkpoints")
+
+# 研究结果库：记录每次成功运行的结果；有效期内相同厂商 + 主题直接返回已有结果（见 result_store.py）
+RESULT_STORE_DB = os.path.join(WORKSPACE_DIR, "results.db")
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_MAX_AGE = float(os.environ.get("RESULT_CACHE_MAX_AGE_HOURS", "24")) * 3600
+
+# 选择器命中统计与上次命中的候选（见 selector_registry.py）
+SELECTOR_STATS_PATH = os.path.join(WORKSPACE_DIR, "selector_stats.json")
+
+# 单次运行的时间预算（分钟），所有等待和轮询从中扣减，用完即结束运行；0 表示不限时（见 deadline.py）
+JOB_TIME_BUDGET = float(os.environ.get("JOB_TIME_BUDGET_MINUTES", "150")) * 60
+
+# 步骤重试策略：attempts 为总尝试次数，backoff 为首次重试前的等待秒数（之后每次翻倍，最多 max_backoff）
+# 键为步骤方法名，"<厂商>.<步骤>" 可覆盖单个厂商；会提交主题的步骤始终只执行一次（见 retry_policy.py）
+STEP_RETRY_ENABLED = os.environ.get("STEP_RETRY_ENABLED", "true").lower() == "true"
+STEP_RETRY_DEFAULT = {"attempts": 1, "backoff": 5, "max_backoff": 60}
+STEP_RETRY_POLICIES = {
+    "visit_page": {"attempts": 3},
+    "input_topic": {"attempts": 2},
+    "save_results": {"attempts": 3, "backoff": 3},
+}
+
+# 厂商熔断：连续失败达到阈值后暂停领取该厂商的任务，冷却（秒）后放行一个任务探测（见 circuit_breaker.py）
+CIRCUIT_BREAKER_ENABLED = os.environ.get("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true"
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_COOLDOWN = float(os.environ.get("CIRCUIT_COOLDOWN_MINUTES", "10")) * 60
+
+# 每个浏览器上下文同时运行的研究对话数（标签页数），大于 1 时 worker 以多标签页模式运行（见 tab_multiplexer.py）
+TABS_PER_CONTEXT = max(1, int(os.environ.get("TABS_PER_CONTEXT", "1")))
+
+# Prometheus 指标服务端口，0 表示不启动；各进程的指标快照写入 METRICS_DIR
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))
+METRICS_ENABLED = METRICS_PORT > 0 or os.environ.get("METRICS_ENABLED", "false").lower() == "true"
+METRICS_DIR = os.path.join(WORKSPACE_DIR, "metrics")
+
+# 各厂商的主题输入策略：human（逐字模拟打字）/ chunked（分段快速打字）/ fast（一次写入）
+# 默认保持逐字打字；fast 尚未在两个厂商的编辑器上验证（contenteditable / React 受控输入框可能忽略
+# 没有按键事件的写入），需要时通过环境变量显式开启
+INPUT_STRATEGIES = {
+    "doubao": os.environ.get("DOUBAO_INPUT_STRATEGY", "human"),
+    "qwen": os.environ.get("QWEN_INPUT_STRATEGY", "human"),
+}
+
+# 登录状态缓存（context.storage_state() 导出的 Cookie 与 localStorage）
+AUTH_STATE_ENABLED = os.environ.get("AUTH_STATE_ENABLED", "true").lower() == "true"
+AUTH_STATE_DIR = os.path.join(WORKSPACE_DIR, "auth_state")
+
+# 登录状态缓存最长保存时间（秒）
+AUTH_STATE_MAX_AGE = 7 * 24 * 3600
+
+# 各厂商表示登录状态的 Cookie，任一过期即视为缓存失效（为空时不检查）
+AUTH_COOKIE_NAMES = {
+    "doubao": ["sessionid"],
+    "qwen": ["tongyi_sso_ticket"],
+}
+
+# 复核登录状态时请求的需要登录才能访问的接口（未登录时返回错误或跳转登录页）；未配置时请求厂商聊天页面
+# （只取 HTML，不加载页面资源），此时公开页面总是返回 200，复核只是过期检查：以请求后 AUTH_COOKIE_NAMES
+# 中的 Cookie 仍然存在且未过期为准，服务端已注销但 Cookie 仍在的会话由之后的页面登录检查发现
+AUTH_CHECK_URLS = {}
+
 # 浏览器配置
 BROWSER_CONFIG = {
     "window_size": (1920, 1080),
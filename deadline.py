@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+时间预算
+
+每次运行持有一个 Deadline（默认 JOB_TIME_BUDGET），所有等待、轮询和重试的超时都从剩余预算中扣减：
+单个等待的超时取「原上限」与「剩余预算」中较小的一个，预算用完后下一次等待直接抛出
+DeadlineExceeded，卡住的步骤不会无限期占用 worker。
+
+步骤内的局部上限（例如扫码登录最多 5 分钟）用 limit() 派生出子预算，子预算到期只结束该等待，
+整体预算到期才抛出 DeadlineExceeded。其他线程可以用 cancel() 提前结束整体预算（例如任务租约被收回）。
+"""
+
+import math
+import time
+
+import config
+
+
+class DeadlineExceeded(BaseException):
+    """整体时间预算已用完
+
+    与 KeyboardInterrupt 一样继承 BaseException，不会被步骤方法内部的 except Exception 吞掉，
+    直接结束本次运行。
+    """
+
+
+class Deadline:
+    """运行的时间预算（budget 为秒数，None 表示不限时）"""
+
+    def __init__(self, budget=None, parent=None, end=None):
+        self.parent = parent
+        if end is None and budget is not None:
+            end = time.monotonic() + budget
+        self.end = end
+        # cancel() 提前结束预算的原因
+        self.reason = None
+
+    @classmethod
+    def from_config(cls):
+        return cls(config.JOB_TIME_BUDGET or None)
+
+    @property
+    def root(self):
+        return self.parent.root if self.parent else self
+
+    def remaining(self):
+        """剩余秒数"""
+        if self.end is None:
+            return math.inf
+        return max(0.0, self.end - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def check(self, what=None):
+        """整体预算用完时抛出 DeadlineExceeded"""
+        root = self.root
+        if root.expired():
+            raise DeadlineExceeded(f"{root.reason or '时间预算已用完'}{f'（{what}）' if what else ''}")
+
+    def cancel(self, reason):
+        """立即结束整体预算，之后的等待直接抛出 DeadlineExceeded（可以在其他线程中调用）"""
+        root = self.root
+        root.reason = reason
+        root.end = time.monotonic()
+
+    def ms(self, upper_ms=None, what=None):
+        """本次等待可用的超时毫秒数：min(upper_ms, 剩余预算)，至少 1 毫秒（Playwright 中 0 表示不限时）"""
+        self.check(what)
+        remaining = self.remaining() * 1000
+        if upper_ms is not None:
+            remaining = min(upper_ms, remaining)
+        return max(1, int(remaining)) if remaining != math.inf else 0
+
+    def limit(self, seconds):
+        """派生一个最多 seconds 秒、且不超过当前预算的子预算"""
+        end = time.monotonic() + seconds
+        if self.end is not None:
+            end = min(end, self.end)
+        return Deadline(parent=self, end=end)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多厂商并行深度研究
+
+同一个研究主题同时交给豆包和通义千问执行，每个厂商运行在独立的进程和浏览器用户数据目录
+（默认从厂商黄金目录克隆）中，总耗时取决于最慢的厂商而不是各厂商耗时之和。
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import time
+
+import config
+from profile_manager import ProfileManager, vendor_profile_dir
+from result_store import cached_result
+from vendors import VENDOR_NAMES, load_vendor_class
+
+# 等待子进程回传结果时检查进程存活的间隔（秒）
+RESULT_POLL_INTERVAL = 5
+
+
+def _run_vendor(vendor, topic, headless, base_url, force, result_queue):
+    """子进程入口：运行单个厂商的完整流程并回传结果"""
+    start_time = time.time()
+    success = False
+    result_path = None
+    profiles = ProfileManager() if config.PROFILE_CLONING else None
+    profile_dir = profiles.clone(vendor) if profiles else vendor_profile_dir(vendor)
+    try:
+        vendor_class = load_vendor_class(vendor)
+        auto = vendor_class(
+            headless=headless,
+            topic=topic,
+            base_url=base_url,
+            profile_dir=profile_dir,
+            force=force,
+        )
+        success = auto.run()
+        result_path = auto.result_path
+        auto.close()
+        if profiles and auto.login_performed:
+            profiles.promote(vendor, profile_dir)
+    except BaseException as e:
+        print(f"❌ [{VENDOR_NAMES[vendor]}] 执行出错: {str(e)}")
+    finally:
+        if profiles:
+            profiles.release(profile_dir)
+        result_queue.put({
+            "vendor": vendor,
+            "success": bool(success and result_path),
+            "result_path": result_path,
+            "elapsed": time.time() - start_time,
+        })
+
+
+def _collect_results(processes, result_queue, start_time):
+    """等待各子进程回传结果；子进程异常退出（崩溃、被杀死）没有回传时记为失败，不会一直等待"""
+    pending = dict(processes)
+    results = []
+    while pending:
+        try:
+            result = result_queue.get(timeout=RESULT_POLL_INTERVAL)
+        except queue.Empty:
+            exited = [vendor for vendor, process in pending.items() if not process.is_alive()]
+            if not exited:
+                continue
+            # 进程退出前写入的结果已经在管道中
+            while True:
+                try:
+                    result = result_queue.get_nowait()
+                except queue.Empty:
+                    break
+                pending.pop(result["vendor"], None)
+                results.append(result)
+            for vendor in exited:
+                if vendor not in pending:
+                    continue
+                print(f"❌ [{VENDOR_NAMES[vendor]}] 研究进程异常退出 (exitcode={pending[vendor].exitcode})")
+                del pending[vendor]
+                results.append({"vendor": vendor, "success": False, "result_path": None,
+                                "elapsed": time.time() - start_time})
+            continue
+        pending.pop(result["vendor"], None)
+        results.append(result)
+    return results
+
+
+def run_fuse(topic=None, vendors=None, headless=False, base_urls=None, force=False):
+    """并行运行多个厂商的深度研究，返回各厂商结果列表（force 为 True 时忽略已有结果）"""
+    topic = topic or config.RESEARCH_TOPIC
+    vendors = vendors or list(VENDOR_NAMES)
+    base_urls = base_urls or {}
+
+    print("\n" + "=" * 60)
+    print("🔀 多厂商并行深度研究")
+    print("=" * 60)
+    print(f"📋 研究主题: {topic}")
+    print(f"🏭 参与厂商: {', '.join(VENDOR_NAMES[v] for v in vendors)}")
+
+    # 使用 spawn 避免子进程继承父进程中的浏览器/线程状态
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    processes = {}
+    results = []
+    start_time = time.time()
+
+    for vendor in vendors:
+        cached = None if force or base_urls.get(vendor) else cached_result(vendor, topic)
+        if cached:
+            print(f"♻️ [{VENDOR_NAMES[vendor]}] 有效期内已有该主题的结果，直接返回: {cached}")
+            results.append({"vendor": vendor, "success": True, "result_path": cached, "elapsed": 0.0})
+            continue
+        process = ctx.Process(
+            target=_run_vendor,
+            args=(vendor, topic, headless, base_urls.get(vendor), force, result_queue),
+            name=f"research-{vendor}",
+        )
+        process.start()
+        processes[vendor] = process
+
+    results.extend(_collect_results(processes, result_queue, start_time))
+    for process in processes.values():
+        process.join()
+
+    total = time.time() - start_time
+    print("\n" + "=" * 60)
+    print("📊 并行研究结果汇总")
+    print("=" * 60)
+    for result in sorted(results, key=lambda r: vendors.index(r["vendor"])):
+        name = VENDOR_NAMES[result["vendor"]]
+        status = "✅" if result["success"] else "❌"
+        print(f"{status} {name}: {result['result_path'] or '无结果'} (耗时 {int(result['elapsed'])}秒)")
+    print(f"⏱️ 总耗时: {int(total)}秒")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多厂商并行深度研究")
+    parser.add_argument("--topic", default=None, help="研究主题，默认使用 config.RESEARCH_TOPIC")
+    parser.add_argument("--vendors", default=",".join(VENDOR_NAMES), help="逗号分隔的厂商列表")
+    parser.add_argument("--mock", action="store_true", help="使用本地模拟页面代替真实厂商站点")
+    parser.add_argument("--completion-delay", type=float, default=3.0, help="模拟页面的研究耗时（秒）")
+    parser.add_argument("--force", action="store_true", help="忽略有效期内的已有结果，重新研究")
+    args = parser.parse_args()
+
+    headless_env = os.environ.get("HEADLESS", "false").lower() == "true"
+    vendors = [v.strip() for v in args.vendors.split(",") if v.strip()]
+
+    base_urls = None
+    if args.mock:
+        from mock_vendor_server import start_mock_server, vendor_urls
+        server, base = start_mock_server(completion_delay=args.completion_delay)
+        base_urls = vendor_urls(base)
+        print(f"🧪 使用本地模拟页面: {base}")
+
+    results = run_fuse(topic=args.topic, vendors=vendors, headless=headless_env, base_urls=base_urls,
+                       force=args.force)
+    if not all(r["success"] for r in results):
+        sys.exit(1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+主题输入策略
+
+- human:   完整模拟人类操作，鼠标分步移动、随机停顿、逐字打字（原有行为）
+- chunked: 按片段快速打字，片段之间短暂停顿，保留真实按键事件
+- fast:    直接点击，正文通过 keyboard.insert_text 一次写入（只触发 input 事件），
+           最后一个字符用真实按键输入，补齐编辑器依赖的 keydown / keyup 事件
+
+各厂商使用的策略由 config.INPUT_STRATEGIES 配置，实际使用的策略和输入耗时记录在运行元数据中。
+"""
+
+import random
+import time
+
+import config
+
+STRATEGIES = ("human", "chunked", "fast")
+
+# chunked 策略每段字符数与段间停顿（毫秒）
+CHUNK_SIZE = 16
+CHUNK_PAUSE_MS = (30, 80)
+
+
+def resolve_strategy(vendor, name=None):
+    """返回厂商使用的输入策略名称，未知名称回退为 human"""
+    name = name or config.INPUT_STRATEGIES.get(vendor, "human")
+    if name not in STRATEGIES:
+        print(f"⚠️ 未知的输入策略 {name}，改用 human")
+        return "human"
+    return name
+
+
+def _chunks(text):
+    return [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+
+class InputStrategy:
+    """主题输入策略（asyncio API）"""
+
+    def __init__(self, page, name="human"):
+        self.page = page
+        self.name = name
+        self.human = name == "human"
+        self.typing_seconds = 0.0
+
+    async def pause(self, low_ms, high_ms):
+        """只在 human 策略下插入随机停顿"""
+        if self.human:
+            await self.page.wait_for_timeout(random.randint(low_ms, high_ms))
+
+    async def click(self, locator, steps=1, hover_ms=(500, 1000)):
+        """human 策略下平滑移动鼠标后按下/抬起，其他策略直接点击"""
+        box = await locator.bounding_box() if self.human else None
+        if not box:
+            await locator.click()
+            return
+        x = box['x'] + box['width'] / 2
+        y = box['y'] + box['height'] / 2
+        await self.page.mouse.move(x, y, steps=steps)
+        await self.pause(*hover_ms)
+        await self.page.mouse.down()
+        await self.pause(50, 150)
+        await self.page.mouse.up()
+
+    async def key(self, locator, text):
+        """输入需要真实按键事件触发的短文本（例如 "/" 技能菜单）"""
+        await locator.type(text, delay=random.randint(100, 300) if self.human else 0)
+
+    async def type(self, locator, text):
+        """按策略输入正文"""
+        start_time = time.time()
+        if self.name == "human" or len(text) < 2:
+            await locator.type(text, delay=random.randint(50, 150) if self.human else 0)
+        elif self.name == "chunked":
+            for chunk in _chunks(text):
+                await locator.type(chunk, delay=0)
+                await self.page.wait_for_timeout(random.randint(*CHUNK_PAUSE_MS))
+        else:
+            await locator.focus()
+            await self.page.keyboard.insert_text(text[:-1])
+            await self.page.keyboard.type(text[-1])
+        self.typing_seconds += time.time() - start_time
+
+    def metadata(self):
+        return {"input_strategy": self.name, "input_seconds": round(self.typing_seconds, 2)}
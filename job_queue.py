@@ -0,0 +1,449 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+研究任务队列与 worker 池
+
+任务 (vendor, topic) 持久化在工作区的 SQLite 数据库中。每个厂商按配置启动若干个
+worker 进程，每个 worker 独占一个从厂商黄金目录克隆出的浏览器用户数据目录，循环领取任务
+并交给对应厂商的自动化类执行。运行中的任务定期写入心跳，心跳过期（进程或容器重启等）的任务会重新排队。
+每次领取生成一个租约令牌，心跳和完成/失败只对持有当前租约的 worker 生效：任务被重新排队后，
+原 worker 的心跳发现租约已被收回时提前结束运行，不会覆盖新 worker 的状态。
+厂商连续失败时熔断，暂停领取该厂商的任务，冷却后放行一个任务探测（见 circuit_breaker.py）。
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+import config
+from browser_launch import run_sync
+from browser_pool import BrowserPool
+from circuit_breaker import STATE_HALF_OPEN, CircuitBreaker
+from deadline import Deadline
+from metrics import start_metrics_server
+from profile_manager import ProfileManager, vendor_profile_dir
+from result_store import cached_result
+from vendors import VENDOR_NAMES, load_vendor_class
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vendor TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    result_path TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    lease TEXT,
+    force INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_vendor_status ON jobs (vendor, status, id);
+"""
+
+# 旧版本数据库中缺少的列
+MIGRATIONS = {
+    "lease": "TEXT",
+    "force": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class JobQueue:
+    """基于 SQLite 的持久化任务队列（每个进程/线程各自创建实例；多标签页模式在线程中串行使用同一实例）"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config.JOB_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        for name, definition in MIGRATIONS.items():
+            if name in columns:
+                continue
+            try:
+                self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+            except sqlite3.OperationalError as e:
+                # 其他进程同时完成了迁移
+                if "duplicate column" not in str(e):
+                    raise
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, vendor, topic, force=False):
+        """添加任务，返回任务 id（force 为 True 时忽略结果库中有效期内的已有结果）"""
+        if vendor not in VENDOR_NAMES:
+            raise ValueError(f"未知厂商: {vendor}")
+        cursor = self.conn.execute(
+            "INSERT INTO jobs (vendor, topic, status, created_at, force) VALUES (?, ?, ?, ?, ?)",
+            (vendor, topic, STATUS_QUEUED, time.time(), int(force)),
+        )
+        return cursor.lastrowid
+
+    def claim(self, vendor, worker):
+        """原子地领取指定厂商最早的排队任务，无任务时返回 None；返回的任务带有本次领取的租约令牌 lease"""
+        now = time.time()
+        lease = uuid.uuid4().hex
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE vendor = ? AND status = ? ORDER BY id LIMIT 1",
+                (vendor, STATUS_QUEUED),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                "started_at = ?, heartbeat_at = ?, lease = ? WHERE id = ?",
+                (STATUS_RUNNING, worker, now, now, lease, row["id"]),
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        job = dict(row)
+        job.update(status=STATUS_RUNNING, worker=worker, attempts=row["attempts"] + 1, lease=lease)
+        return job
+
+    def heartbeat(self, job_id, lease):
+        """续租，租约已被收回（任务被重新排队或由其他 worker 领取）时返回 False"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND lease = ?",
+            (time.time(), job_id, STATUS_RUNNING, lease),
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id, lease, result_path):
+        """标记任务完成，租约已被收回时不修改并返回 False"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, result_path = ?, error = NULL, finished_at = ?, lease = NULL "
+            "WHERE id = ? AND lease = ?",
+            (STATUS_DONE, result_path, time.time(), job_id, lease),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id, lease, error):
+        """标记任务失败，租约已被收回时不修改并返回 False"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease = NULL WHERE id = ? AND lease = ?",
+            (STATUS_FAILED, error, time.time(), job_id, lease),
+        )
+        return cursor.rowcount > 0
+
+    def requeue_running(self, older_than):
+        """把心跳早于 older_than 秒的运行中任务重新排队并收回租约"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = ?, worker = NULL, lease = NULL WHERE status = ? AND heartbeat_at < ?",
+            (STATUS_QUEUED, STATUS_RUNNING, time.time() - older_than),
+        )
+        return cursor.rowcount
+
+    def list_jobs(self, status=None, limit=50):
+        if status:
+            rows = self.conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id DESC LIMIT ?", (status, limit)
+            ).fetchall()
+        else:
+            rows = self.conn.execute("SELECT * FROM jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def counts(self):
+        rows = self.conn.execute(
+            "SELECT vendor, status, COUNT(*) AS n FROM jobs GROUP BY vendor, status"
+        ).fetchall()
+        return {(r["vendor"], r["status"]): r["n"] for r in rows}
+
+
+def worker_profile_dir(vendor, slot, profiles=None):
+    """worker 独占的浏览器用户数据目录
+
+    提供 profiles 时从厂商黄金目录克隆，否则 0 号 worker 使用厂商默认目录。
+    """
+    if profiles is not None:
+        return profiles.clone(vendor, f"{slot}-{os.getpid()}")
+    base = vendor_profile_dir(vendor)
+    return base if slot == 0 else f"{base}_{slot}"
+
+
+def _heartbeat_loop(db_path, job, deadline, stop_event):
+    """任务运行期间定期续租（独立连接，避免与主线程共用 SQLite 连接）
+
+    租约已被收回时结束本次运行的时间预算，运行在下一次等待时退出，不与新 worker 重复执行。
+    """
+    queue = JobQueue(db_path)
+    try:
+        while not stop_event.wait(config.JOB_HEARTBEAT_INTERVAL):
+            if not queue.heartbeat(job["id"], job["lease"]):
+                print(f"⚠️ 任务 #{job['id']} 的租约已被收回（已重新排队），结束本次运行")
+                deadline.cancel("任务租约已被收回")
+                break
+    finally:
+        queue.close()
+
+
+def start_heartbeat(db_path, job, deadline):
+    """启动心跳线程，返回 (线程, 停止事件)"""
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat_loop, args=(db_path, job, deadline, stop_event), daemon=True)
+    heartbeat.start()
+    return heartbeat, stop_event
+
+
+def _promote(vendor, profile_dir):
+    """会话中重新扫码登录过，把登录状态同步回黄金目录（浏览器关闭后调用），失败不影响任务结果"""
+    try:
+        ProfileManager().promote(vendor, profile_dir)
+    except Exception as e:
+        print(f"⚠️ 提升黄金用户数据目录失败: {str(e)}")
+
+
+def run_job(job, profile_dir, headless=False, base_url=None, pool=None, deadline=None):
+    """在当前进程执行单个任务，返回结果文件路径（失败时为 None）
+
+    提供 pool 时借用池中预热好的浏览器上下文，否则为本任务单独启动浏览器。
+    """
+    force = bool(job.get("force"))
+    if base_url is None and not force:
+        # 有效期内已有相同主题的结果时不再启动浏览器
+        cached = cached_result(job["vendor"], job["topic"])
+        if cached:
+            print(f"♻️ 任务 #{job['id']} 直接使用已有结果: {cached}")
+            return cached
+
+    vendor_class = load_vendor_class(job["vendor"])
+    options = {
+        "headless": headless,
+        "topic": job["topic"],
+        "base_url": base_url,
+        "profile_dir": profile_dir,
+        "run_id": f"job-{job['id']}",
+        # 重新排队的任务从上次的检查点继续，不重复提交主题
+        "resume": True,
+        "force": force,
+        # 从领取任务开始计时，等待浏览器池也计入预算
+        "deadline": deadline or Deadline.from_config(),
+    }
+    # 会话中重新扫码登录过时把登录状态同步回黄金目录，后续会话无需再次登录
+    cloned = profile_dir != config.VENDOR_PROFILE_DIRS[job["vendor"]]
+    if pool is not None:
+        async def run_leased():
+            async with pool.lease() as item:
+                auto = vendor_class(context=item.context, page=item.page, **options)
+                success = await auto.run_async()
+                if auto.login_performed and cloned:
+                    # 池中的浏览器仍在写入用户数据目录，归还时关闭该上下文后再提升
+                    item.after_close = lambda: _promote(job["vendor"], profile_dir)
+            return auto, success
+
+        # 池在 worker 线程常驻的事件循环中创建，借出的上下文只能在同一个循环中使用
+        auto, success = run_sync(run_leased())
+    else:
+        auto = vendor_class(**options)
+        try:
+            success = auto.run()
+        finally:
+            auto.close()
+        if auto.login_performed and cloned:
+            _promote(job["vendor"], profile_dir)
+    if success and auto.result_path:
+        return auto.result_path
+    return None
+
+
+def worker_main(vendor, slot, db_path, headless=False, base_url=None):
+    """worker 进程入口：循环领取并执行任务"""
+    # 父进程统一处理中断，worker 收到 SIGTERM 直接退出，未完成任务由心跳过期/重启恢复
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker = f"{socket.gethostname()}:{os.getpid()}:{vendor}-{slot}"
+    queue = JobQueue(db_path)
+    print(f"👷 worker 已启动: {worker}")
+
+    profiles = ProfileManager() if config.PROFILE_CLONING else None
+    profile_dir = worker_profile_dir(vendor, slot, profiles)
+
+    breaker = CircuitBreaker(db_path) if config.CIRCUIT_BREAKER_ENABLED else None
+
+    if config.TABS_PER_CONTEXT > 1:
+        # 多标签页模式：一个上下文同时运行多个任务（tab_multiplexer 依赖本模块，延迟导入）
+        from tab_multiplexer import run_tab_worker
+        run_tab_worker(vendor, worker, queue, db_path, profile_dir, headless=headless, base_url=base_url,
+                       breaker=breaker)
+        return
+
+    pool = None
+    if config.BROWSER_POOL_ENABLED:
+        try:
+            pool = run_sync(BrowserPool(vendor, [profile_dir], headless=headless, base_url=base_url).start())
+        except Exception as e:
+            print(f"⚠️ 浏览器池启动失败，改为每个任务单独启动浏览器: {str(e)}")
+            pool = None
+
+    while True:
+        # 厂商熔断期间不领取新任务，任务留在队列中
+        allowed = breaker.allow(vendor) if breaker else True
+        if not allowed:
+            time.sleep(config.JOB_POLL_INTERVAL)
+            continue
+        job = queue.claim(vendor, worker)
+        if job is None:
+            if allowed == STATE_HALF_OPEN:
+                breaker.release_probe(vendor)
+            time.sleep(config.JOB_POLL_INTERVAL)
+            continue
+
+        print(f"\n📥 [{worker}] 领取任务 #{job['id']}: {job['topic']}")
+        deadline = Deadline.from_config()
+        heartbeat, stop_event = start_heartbeat(db_path, job, deadline)
+        try:
+            result_path = run_job(job, profile_dir, headless=headless, base_url=base_url, pool=pool,
+                                  deadline=deadline)
+            if result_path:
+                owned = queue.complete(job["id"], job["lease"], result_path)
+                print(f"✅ [{worker}] 任务 #{job['id']} 完成: {result_path}")
+            else:
+                owned = queue.fail(job["id"], job["lease"], "未获取到研究结果")
+                print(f"❌ [{worker}] 任务 #{job['id']} 失败")
+        except (Exception, SystemExit) as e:
+            # 浏览器启动失败时自动化类会调用 sys.exit，这里记为任务失败而不是让 worker 退出
+            result_path = None
+            owned = queue.fail(job["id"], job["lease"], str(e))
+            print(f"❌ [{worker}] 任务 #{job['id']} 异常: {str(e)}")
+        finally:
+            stop_event.set()
+            heartbeat.join()
+        if not owned:
+            # 任务已由其他 worker 接手，本次结果不计入任务状态和熔断
+            print(f"⚠️ [{worker}] 任务 #{job['id']} 的租约已被收回，未更新任务状态")
+            continue
+        if breaker:
+            if result_path:
+                breaker.record_success(vendor)
+            else:
+                breaker.record_failure(vendor)
+
+
+def run_pool(concurrency=None, db_path=None, headless=False, base_urls=None):
+    """启动 worker 池并持续运行，worker 异常退出时自动重启"""
+    concurrency = concurrency or config.WORKER_CONCURRENCY
+    db_path = db_path or config.JOB_DB_PATH
+    base_urls = base_urls or {}
+
+    queue = JobQueue(db_path)
+    # 只恢复心跳过期的任务：其他主机或未退出的 worker 可能仍在运行心跳正常的任务
+    recovered = queue.requeue_running(older_than=config.JOB_LEASE_TIMEOUT)
+    if recovered:
+        print(f"♻️ 已恢复 {recovered} 个心跳过期的任务")
+    if config.PROFILE_CLONING:
+        # worker 被终止时来不及删除克隆目录，启动时统一清理
+        removed = ProfileManager().cleanup_stale()
+        if removed:
+            print(f"🧹 已清理 {removed} 个残留的会话用户数据目录")
+
+    if config.METRICS_PORT:
+        start_metrics_server()
+
+    ctx = multiprocessing.get_context("spawn")
+    workers = {}
+
+    def start_worker(vendor, slot):
+        process = ctx.Process(
+            target=worker_main,
+            args=(vendor, slot, db_path, headless, base_urls.get(vendor)),
+            name=f"worker-{vendor}-{slot}",
+        )
+        process.start()
+        workers[(vendor, slot)] = process
+
+    for vendor, count in concurrency.items():
+        for slot in range(count):
+            start_worker(vendor, slot)
+    print(f"🚀 worker 池已启动: {', '.join(f'{VENDOR_NAMES[v]}×{n}' for v, n in concurrency.items())}")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    try:
+        while not stopping.wait(config.JOB_POLL_INTERVAL):
+            for key, process in list(workers.items()):
+                if not process.is_alive():
+                    print(f"⚠️ worker {process.name} 已退出 (exitcode={process.exitcode})，正在重启...")
+                    if config.PROFILE_CLONING:
+                        ProfileManager().cleanup_stale()
+                    start_worker(*key)
+            stale = queue.requeue_running(older_than=config.JOB_LEASE_TIMEOUT)
+            if stale:
+                print(f"♻️ {stale} 个任务心跳过期，已重新排队")
+    except KeyboardInterrupt:
+        print("\n⚠️ 用户中断操作")
+    finally:
+        for process in workers.values():
+            process.terminate()
+        for process in workers.values():
+            process.join()
+        queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="研究任务队列")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = subparsers.add_parser("add", help="添加研究任务")
+    add_parser.add_argument("--topic", default=None, help="研究主题，默认使用 config.RESEARCH_TOPIC")
+    add_parser.add_argument("--vendor", default="all", help="厂商名，all 表示所有厂商")
+    add_parser.add_argument("--force", action="store_true", help="忽略有效期内的已有结果，重新研究")
+
+    list_parser = subparsers.add_parser("list", help="查看任务")
+    list_parser.add_argument("--status", default=None)
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    work_parser = subparsers.add_parser("work", help="启动 worker 池")
+    for vendor in VENDOR_NAMES:
+        work_parser.add_argument(f"--{vendor}", type=int, default=None, help=f"{VENDOR_NAMES[vendor]} worker 数量")
+
+    args = parser.parse_args()
+
+    if args.command == "add":
+        vendors = list(VENDOR_NAMES) if args.vendor == "all" else [args.vendor]
+        queue = JobQueue()
+        for vendor in vendors:
+            job_id = queue.enqueue(vendor, args.topic or config.RESEARCH_TOPIC, force=args.force)
+            print(f"📥 已添加任务 #{job_id} ({VENDOR_NAMES[vendor]})")
+        queue.close()
+    elif args.command == "list":
+        queue = JobQueue()
+        for job in queue.list_jobs(status=args.status, limit=args.limit):
+            print(f"#{job['id']:<5} {job['vendor']:<8} {job['status']:<8} {job['topic'][:40]} {job['result_path'] or ''}")
+        queue.close()
+    elif args.command == "work":
+        concurrency = dict(config.WORKER_CONCURRENCY)
+        for vendor in VENDOR_NAMES:
+            if getattr(args, vendor) is not None:
+                concurrency[vendor] = getattr(args, vendor)
+        concurrency = {v: n for v, n in concurrency.items() if n > 0}
+        headless_env = os.environ.get("HEADLESS", "false").lower() == "true"
+        run_pool(concurrency=concurrency, headless=headless_env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Prometheus 文本格式指标
+
+每个进程在内存中累计计数器 / 直方图 / 仪表，并在每次更新后原子写入
+METRICS_DIR/<pid>-<启动时间>.json。快照以 pid + 进程启动时间标识写入者，METRICS_DIR 跨容器重启保留时，
+复用了旧 pid 的新进程不会被当成旧进程，也不会覆盖旧进程的快照。
+指标服务在抓取时合并所有进程的快照：计数器和直方图累加（已退出进程的数据并入归档文件，
+保证计数单调递增），仪表只取仍在运行的进程，并实时读取这些进程树的常驻内存。
+
+    python metrics.py --port 9100      # 单独启动指标服务
+    METRICS_PORT=9100 python job_queue.py work   # 随 worker 池一起启动
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import config
+from process_stats import process_start_time, process_tree_rss, same_process
+
+# 直方图分桶（秒）
+JOB_DURATION_BUCKETS = (30, 60, 120, 300, 600, 900, 1200, 1800, 2700, 3600, 7200)
+LOGIN_WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300)
+
+HELP = {
+    "drf_jobs_started_total": ("counter", "已开始的研究运行数"),
+    "drf_jobs_completed_total": ("counter", "成功完成的研究运行数"),
+    "drf_jobs_failed_total": ("counter", "失败的研究运行数"),
+    "drf_job_duration_seconds": ("histogram", "单次研究运行耗时"),
+    "drf_login_wait_seconds": ("histogram", "登录检查与扫码等待耗时"),
+    "drf_qr_refresh_total": ("counter", "二维码失效刷新次数"),
+    "drf_download_bytes_total": ("counter", "保存的研究结果字节数"),
+    "drf_result_cache_hits_total": ("counter", "直接返回已有结果的运行数"),
+    "drf_step_retries_total": ("counter", "步骤失败后的自动重试次数"),
+    "drf_circuit_open": ("gauge", "厂商熔断状态（0 正常 / 1 熔断 / 0.5 探测中）"),
+    "drf_active_contexts": ("gauge", "当前打开的浏览器上下文数"),
+    "drf_process_rss_bytes": ("gauge", "进程树常驻内存"),
+    "drf_queue_jobs": ("gauge", "任务队列中各状态的任务数"),
+}
+
+ARCHIVE_FILE = "_archive.json"
+LOCK_FILE = ".collect.lock"
+
+
+def _series(name, **labels):
+    """序列键：name{label="value",...}"""
+    if not labels:
+        return name
+    inner = ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{inner}}}"
+
+
+def _split_series(series):
+    name, _, rest = series.partition("{")
+    return name, rest.rstrip("}")
+
+
+class MetricsRegistry:
+    """进程内的指标累计与快照写入"""
+
+    def __init__(self, metrics_dir=None, enabled=None):
+        self.metrics_dir = metrics_dir or config.METRICS_DIR
+        self.enabled = config.METRICS_ENABLED if enabled is None else enabled
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+
+    def inc(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        with self.lock:
+            key = _series(name, **labels)
+            self.counters[key] = self.counters.get(key, 0) + value
+            self._flush()
+
+    def observe(self, name, value, buckets, **labels):
+        if not self.enabled:
+            return
+        with self.lock:
+            key = _series(name, **labels)
+            hist = self.histograms.setdefault(key, {"le": list(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(hist["le"]):
+                if value <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+            self._flush()
+
+    def gauge_add(self, name, delta, **labels):
+        if not self.enabled:
+            return
+        with self.lock:
+            key = _series(name, **labels)
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+            self._flush()
+
+    def _flush(self):
+        pid = os.getpid()
+        start_time = process_start_time(pid)
+        snapshot = {"pid": pid, "start_time": start_time, "counters": self.counters,
+                    "histograms": self.histograms, "gauges": self.gauges}
+        try:
+            os.makedirs(self.metrics_dir, exist_ok=True)
+            path = os.path.join(self.metrics_dir, f"{pid}-{start_time or 0}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ 写入指标快照失败: {str(e)}")
+
+
+# 进程级单例，spawn 出来的 worker 进程各自拥有一份
+_registry = None
+
+
+def registry():
+    global _registry
+    if _registry is None or _registry.metrics_dir != config.METRICS_DIR:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def _merge_into(total, snapshot):
+    for key, value in snapshot.get("counters", {}).items():
+        total["counters"][key] = total["counters"].get(key, 0) + value
+    for key, hist in snapshot.get("histograms", {}).items():
+        merged = total["histograms"].get(key)
+        if merged is None:
+            total["histograms"][key] = {"le": list(hist["le"]), "counts": list(hist["counts"]),
+                                        "sum": hist["sum"], "count": hist["count"]}
+            continue
+        merged["counts"] = [a + b for a, b in zip(merged["counts"], hist["counts"])]
+        merged["sum"] += hist["sum"]
+        merged["count"] += hist["count"]
+
+
+def _empty():
+    return {"counters": {}, "histograms": {}, "gauges": {}}
+
+
+_collect_lock = threading.Lock()
+
+
+def _is_live(snapshot):
+    """快照的写入进程仍在运行（没有 start_time 的旧格式快照来自升级前的进程，按已退出处理）"""
+    pid = snapshot.get("pid")
+    return bool(pid) and "start_time" in snapshot and same_process(pid, snapshot["start_time"])
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def collect(metrics_dir=None):
+    """合并所有进程的快照，返回 (合并结果, 存活进程 pid 列表)
+
+    已退出进程的计数并入归档文件后再删除快照；归档同时记录已并入的文件名，删除前中断时
+    下次抓取不会重复累加。同一目录的抓取互斥（线程锁 + 文件锁），并发抓取不会重复归档。
+    """
+    metrics_dir = metrics_dir or config.METRICS_DIR
+    os.makedirs(metrics_dir, exist_ok=True)
+    with _collect_lock, open(os.path.join(metrics_dir, LOCK_FILE), "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        return _collect(metrics_dir)
+
+
+def _collect(metrics_dir):
+    archive_path = os.path.join(metrics_dir, ARCHIVE_FILE)
+    try:
+        with open(archive_path, "r", encoding="utf-8") as f:
+            archive = json.load(f)
+    except (OSError, ValueError):
+        archive = _empty()
+    merged = set(archive.get("merged", []))
+
+    total = _empty()
+    alive = []
+    dead = []
+    names = [n for n in os.listdir(metrics_dir) if n.endswith(".json") and n != ARCHIVE_FILE]
+    for name in names:
+        if name in merged:
+            # 已并入归档但上次没来得及删除
+            dead.append(name)
+            continue
+        path = os.path.join(metrics_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if _is_live(snapshot):
+            alive.append(snapshot["pid"])
+            _merge_into(total, snapshot)
+            for key, value in snapshot.get("gauges", {}).items():
+                total["gauges"][key] = total["gauges"].get(key, 0) + value
+        else:
+            # 已退出进程的计数并入归档，仪表丢弃
+            _merge_into(archive, snapshot)
+            merged.add(name)
+            dead.append(name)
+
+    if dead:
+        archive["merged"] = sorted(merged)
+        _write_json(archive_path, archive)
+        for name in dead:
+            try:
+                os.remove(os.path.join(metrics_dir, name))
+            except OSError:
+                pass
+        # 快照都已删除后不再需要记录文件名
+        remaining = set(os.listdir(metrics_dir))
+        archive["merged"] = sorted(merged & remaining)
+        _write_json(archive_path, archive)
+    _merge_into(total, archive)
+    return total, alive
+
+
+def _queue_counts():
+    if not os.path.exists(config.JOB_DB_PATH):
+        return {}
+    from job_queue import JobQueue
+    queue = JobQueue(config.JOB_DB_PATH)
+    try:
+        return queue.counts()
+    finally:
+        queue.close()
+
+
+def _circuit_states():
+    if not os.path.exists(config.JOB_DB_PATH):
+        return []
+    from circuit_breaker import CircuitBreaker
+    breaker = CircuitBreaker(config.JOB_DB_PATH)
+    try:
+        return breaker.states()
+    finally:
+        breaker.close()
+
+
+def render(metrics_dir=None):
+    """生成 Prometheus 文本格式"""
+    total, alive = collect(metrics_dir)
+    lines = []
+    emitted = set()
+
+    def header(name):
+        if name in emitted:
+            return
+        emitted.add(name)
+        kind, text = HELP.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    for key in sorted(total["counters"]):
+        header(_split_series(key)[0])
+        lines.append(f"{key} {total['counters'][key]}")
+    for key in sorted(total["histograms"]):
+        name, labels = _split_series(key)
+        hist = total["histograms"][key]
+        header(name)
+        prefix = f"{labels}," if labels else ""
+        for bound, count in zip(hist["le"], hist["counts"]):
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {hist["count"]}')
+        suffix = f"{{{labels}}}" if labels else ""
+        lines.append(f"{name}_sum{suffix} {hist['sum']}")
+        lines.append(f"{name}_count{suffix} {hist['count']}")
+    for key in sorted(total["gauges"]):
+        header(_split_series(key)[0])
+        lines.append(f"{key} {total['gauges'][key]}")
+
+    header("drf_process_rss_bytes")
+    for pid in sorted(alive):
+        lines.append(f"{_series('drf_process_rss_bytes', pid=pid)} {process_tree_rss(pid)}")
+
+    counts = _queue_counts()
+    if counts:
+        header("drf_queue_jobs")
+        for (vendor, status), n in sorted(counts.items()):
+            lines.append(f"{_series('drf_queue_jobs', vendor=vendor, status=status)} {n}")
+
+    circuits = _circuit_states()
+    if circuits:
+        header("drf_circuit_open")
+        levels = {"closed": 0, "half_open": 0.5, "open": 1}
+        for item in circuits:
+            lines.append(f"{_series('drf_circuit_open', vendor=item['vendor'])} {levels[item['state']]}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        data = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=None, host="0.0.0.0"):
+    """在后台线程启动指标服务，返回 server"""
+    port = config.METRICS_PORT if port is None else port
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 指标服务已启动: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prometheus 指标服务")
+    parser.add_argument("--port", type=int, default=config.METRICS_PORT or 9100)
+    args = parser.parse_args()
+    server = start_metrics_server(args.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
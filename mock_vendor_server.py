@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地厂商模拟页面服务
+
+提供模仿豆包和通义千问聊天页面 DOM 结构的桩页面，用于在不访问真实站点的情况下
+端到端运行 DoubaoResearchAuto / QwenResearchAuto。
+
+页面地址带 ?login=<毫秒> 时先进入未登录状态：点击"登录"弹出登录框和二维码，
+二维码显示后经过指定毫秒数模拟扫码成功（登录状态保存在 localStorage 中）。
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 模拟研究报告内容
+MOCK_REPORT = """# 模拟深度研究报告
+
+## 主题
+
+{topic}
+
+## 结论
+
+这是本地模拟页面生成的研究结果，用于验证自动化流程。
+"""
+
+DOUBAO_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>豆包 (模拟)</title>
+<style>
+  .hidden { display: none !important; }
+  #menu, #sidebar, #download-menu { border: 1px solid #ccc; padding: 8px; }
+  #semi-modal-body canvas { width: 160px; height: 160px; background: #000; }
+</style>
+</head>
+<body>
+<div class="header"><button id="login-btn" class="hidden">登录</button><span class="avatar">U</span></div>
+<div id="semi-modal-body" class="hidden"><div><div><div><div><div>
+  <div><div id="qr-toggle">扫码</div></div>
+  <div><div id="qr-box"></div></div>
+</div></div></div></div></div></div>
+<div id="messages"></div>
+<div id="suggest" class="hidden">
+  <div data-testid="suggest_message_item">直接开始研究</div>
+</div>
+<div id="menu" class="hidden"><div id="research-option">深入研究</div></div>
+<textarea class="text-area" placeholder="发消息或输入 / 选择技能"></textarea>
+<button data-testid="chat_input_send_button">发送</button>
+<button data-testid="asr_btn">语音</button>
+<div id="sidebar" class="hidden">
+  <button id="download-btn">下载</button>
+  <div id="download-menu" class="hidden"><a id="markdown-opt" download="report.md">Markdown</a></div>
+</div>
+<script>
+  const REPORT_TEMPLATE = __REPORT__;
+  const $ = (sel) => document.querySelector(sel);
+  const input = $("textarea");
+  const asrBtn = $("[data-testid='asr_btn']");
+
+  // 模拟登录：二维码显示 loginDelay 毫秒后视为扫码成功
+  const loginDelay = new URLSearchParams(location.search).get("login");
+  if (loginDelay !== null && !localStorage.getItem("mock_logged_in")) {
+    $(".avatar").classList.add("hidden");
+    $("#login-btn").classList.remove("hidden");
+  }
+  $("#login-btn").addEventListener("click", () => $("#semi-modal-body").classList.remove("hidden"));
+  $("#qr-toggle").addEventListener("click", () => {
+    $("#qr-box").innerHTML = "<canvas></canvas>";
+    setTimeout(() => {
+      localStorage.setItem("mock_logged_in", "1");
+      $("#semi-modal-body").classList.add("hidden");
+      $("#login-btn").classList.add("hidden");
+      $(".avatar").classList.remove("hidden");
+    }, Number(loginDelay) || 0);
+  });
+
+  input.addEventListener("input", () => {
+    $("#menu").classList.toggle("hidden", !input.value.startsWith("/"));
+  });
+  $("#research-option").addEventListener("click", () => {
+    input.value = "";
+    $("#menu").classList.add("hidden");
+    input.dataset.skill = "deep_research";
+  });
+  $("[data-testid='chat_input_send_button']").addEventListener("click", () => {
+    const topic = input.value;
+    input.value = "";
+    asrBtn.classList.add("hidden");
+    const msg = document.createElement("div");
+    msg.className = "user-message";
+    msg.textContent = topic;
+    $("#messages").appendChild(msg);
+    window.__topic = topic;
+    setTimeout(() => $("#suggest").classList.remove("hidden"), 500);
+  });
+  $("[data-testid='suggest_message_item']").addEventListener("click", async () => {
+    $("#suggest").classList.add("hidden");
+    // 研究过程以流式接口返回，响应结束即研究完成
+    const res = await fetch("/doubao/samantha/chat/completion", { method: "POST", body: window.__topic || "" });
+    await res.text();
+    const card = document.createElement("div");
+    card.setAttribute("data-testid", "doc_card");
+    card.textContent = "研究报告";
+    card.addEventListener("click", () => $("#sidebar").classList.remove("hidden"));
+    $("#messages").appendChild(card);
+    asrBtn.classList.remove("hidden");
+  });
+  $("#download-btn").addEventListener("click", () => {
+    const report = REPORT_TEMPLATE.replace("{topic}", window.__topic || "");
+    const blob = new Blob([report], { type: "text/markdown" });
+    $("#markdown-opt").href = URL.createObjectURL(blob);
+    $("#download-menu").classList.remove("hidden");
+  });
+</script>
+</body>
+</html>
+"""
+
+QWEN_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>通义千问 (模拟)</title>
+<style>
+  .hidden { display: none !important; }
+  #copy-menu { border: 1px solid #ccc; padding: 8px; }
+  .StyledRight-tongyi-login-mock canvas { width: 160px; height: 160px; background: #000; }
+</style>
+</head>
+<body>
+<div id="toolbar"><button id="login-btn" class="hidden">登录</button><span id="deep-research">深度研究</span></div>
+<div class="StyledRight-tongyi-login-mock hidden" id="login-modal"><canvas></canvas></div>
+<div id="messages"></div>
+<button id="start-research" class="hidden">直接开始研究</button>
+<button id="stop-task" class="hidden">终止任务</button>
+<div id="answer" class="hidden">
+  <span data-icon-type="qwpcicon-down">⬇</span>
+  <div id="copy-menu" class="hidden"><div id="copy-markdown">复制为Markdown</div></div>
+</div>
+<textarea class="ant-input" placeholder="输入研究主题"></textarea>
+<script>
+  const REPORT_TEMPLATE = __REPORT__;
+  const $ = (sel) => document.querySelector(sel);
+  const input = $(".ant-input");
+
+  // 模拟登录：弹出登录框 loginDelay 毫秒后视为扫码成功
+  const loginDelay = new URLSearchParams(location.search).get("login");
+  if (loginDelay !== null && !localStorage.getItem("mock_logged_in")) {
+    $("#login-btn").classList.remove("hidden");
+  }
+  $("#login-btn").addEventListener("click", () => {
+    $("#login-modal").classList.remove("hidden");
+    setTimeout(() => {
+      localStorage.setItem("mock_logged_in", "1");
+      $("#login-modal").classList.add("hidden");
+      $("#login-btn").classList.add("hidden");
+    }, Number(loginDelay) || 0);
+  });
+
+  function showAnswer() {
+    $("#answer").classList.remove("hidden");
+  }
+  if (sessionStorage.getItem("mock_qwen_report")) {
+    showAnswer();
+  }
+
+  $("#deep-research").addEventListener("click", () => {
+    sessionStorage.removeItem("mock_qwen_report");
+    input.dataset.mode = "deep_research";
+  });
+  input.addEventListener("keydown", (event) => {
+    if (event.key !== "Enter") return;
+    event.preventDefault();
+    const topic = input.value;
+    input.value = "";
+    const msg = document.createElement("div");
+    msg.className = "user-message";
+    msg.textContent = topic;
+    $("#messages").appendChild(msg);
+    window.__topic = topic;
+    setTimeout(() => $("#start-research").classList.remove("hidden"), 500);
+  });
+  $("#start-research").addEventListener("click", async () => {
+    $("#start-research").classList.add("hidden");
+    $("#stop-task").classList.remove("hidden");
+    // 研究过程以流式接口返回，响应结束即研究完成
+    const res = await fetch("/qwen/api/v2/chat", { method: "POST", body: window.__topic || "" });
+    await res.text();
+    $("#stop-task").classList.add("hidden");
+    sessionStorage.setItem("mock_qwen_report", REPORT_TEMPLATE.replace("{topic}", window.__topic || ""));
+    showAnswer();
+  });
+  $("[data-icon-type='qwpcicon-down']").addEventListener("mouseenter", () => {
+    $("#copy-menu").classList.remove("hidden");
+  });
+  $("#copy-markdown").addEventListener("click", async () => {
+    await navigator.clipboard.writeText(sessionStorage.getItem("mock_qwen_report") || "");
+  });
+</script>
+</body>
+</html>
+"""
+
+# 流式接口每次推送的报告片段数
+STREAM_CHUNKS = 10
+
+
+def _doubao_event(chunk):
+    """豆包风格事件：增量文本，正文嵌套在 JSON 字符串中"""
+    content = json.dumps({"text": chunk}, ensure_ascii=False)
+    event_data = json.dumps({"message": {"content": content}}, ensure_ascii=False)
+    return {"event_type": 2001, "event_data": event_data}
+
+
+def _qwen_event(text):
+    """通义千问风格事件：每次携带截至当前的全文"""
+    return {"data": {"messages": [{"role": "assistant", "content": text}]}}
+
+
+STREAMS = {
+    "/doubao/samantha/chat/completion": ("delta", _doubao_event),
+    "/qwen/api/v2/chat": ("cumulative", _qwen_event),
+}
+
+PAGES = {
+    "/doubao/chat/": DOUBAO_PAGE,
+    "/qwen/chat/": QWEN_PAGE,
+}
+
+
+class MockVendorHandler(BaseHTTPRequestHandler):
+    """模拟页面请求处理"""
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        template = PAGES.get(path)
+        if template is None:
+            self.send_error(404)
+            return
+
+        body = template.replace("__REPORT__", json.dumps(MOCK_REPORT))
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        stream = STREAMS.get(path)
+        if stream is None:
+            self.send_error(404)
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        topic = self.rfile.read(length).decode("utf-8") if length else ""
+        report = MOCK_REPORT.replace("{topic}", topic)
+        style, make_event = stream
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        # 按研究耗时均匀推送报告片段
+        step = max(1, -(-len(report) // STREAM_CHUNKS))
+        interval = self.server.completion_delay / STREAM_CHUNKS
+        for start in range(0, len(report), step):
+            time.sleep(interval)
+            chunk = report[start:start + step] if style == "delta" else report[:start + step]
+            event = json.dumps(make_event(chunk), ensure_ascii=False)
+            try:
+                self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_server(host="127.0.0.1", port=0, completion_delay=3.0):
+    """在后台线程启动模拟服务，返回 (server, 基础地址)"""
+    server = ThreadingHTTPServer((host, port), MockVendorHandler)
+    server.daemon_threads = True
+    server.completion_delay = completion_delay
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://{host}:{server.server_address[1]}"
+    return server, base
+
+
+def vendor_urls(base, login_delay=None):
+    """返回各厂商模拟页面地址，login_delay（秒）不为空时页面先进入未登录状态"""
+    query = "" if login_delay is None else f"?login={int(login_delay * 1000)}"
+    return {
+        "doubao": f"{base}/doubao/chat/{query}",
+        "qwen": f"{base}/qwen/chat/{query}",
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地厂商模拟页面服务")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--completion-delay", type=float, default=3.0, help="模拟研究耗时（秒）")
+    args = parser.parse_args()
+
+    server, base = start_mock_server(port=args.port, completion_delay=args.completion_delay)
+    for vendor, url in vendor_urls(base).items():
+        print(f"🌐 {vendor}: {url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
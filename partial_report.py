@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+研究报告增量落盘
+
+研究进行期间把厂商产生的正文持续追加到 .partial.md 文件，按间隔 fsync；
+研究完成后原子地重命名为最终结果文件。进程崩溃时已写入的部分仍保留在磁盘上。
+"""
+
+import os
+import time
+
+import config
+
+
+class PartialReportWriter:
+    """把不断增长的报告正文写入 .partial.md，完成时重命名为最终文件"""
+
+    def __init__(self, final_path, fsync_interval=None):
+        self.final_path = final_path
+        self.partial_path = os.path.splitext(final_path)[0] + ".partial.md"
+        self.fsync_interval = config.PARTIAL_FSYNC_INTERVAL if fsync_interval is None else fsync_interval
+        self.written = ""
+        self.file = None
+        self.last_fsync = time.time()
+
+    def update(self, text):
+        """写入当前全文：与已写入内容前缀一致时只追加新增部分，否则整体重写"""
+        if text == self.written:
+            return
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.partial_path), exist_ok=True)
+            self.file = open(self.partial_path, "w", encoding="utf-8")
+            print(f"📝 研究正文实时写入: {self.partial_path}")
+
+        if text.startswith(self.written):
+            self.file.write(text[len(self.written):])
+        else:
+            self.file.seek(0)
+            self.file.truncate()
+            self.file.write(text)
+        self.file.flush()
+        self.written = text
+
+        if time.time() - self.last_fsync >= self.fsync_interval:
+            os.fsync(self.file.fileno())
+            self.last_fsync = time.time()
+
+    def close(self):
+        """落盘并关闭文件，保留 .partial.md（用于异常退出时保存已有进度）"""
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def commit(self):
+        """落盘并原子重命名为最终文件，没有内容时返回 None"""
+        if not self.written:
+            self.discard()
+            return None
+        self.close()
+        os.replace(self.partial_path, self.final_path)
+        # 同步目录项，保证重命名本身在崩溃后可见
+        try:
+            dir_fd = os.open(os.path.dirname(self.final_path), os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+        return self.final_path
+
+    def discard(self):
+        """放弃部分结果并删除 .partial.md"""
+        self.close()
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+进程内存统计
+
+通过 /proc 读取进程及其所有子进程（Playwright 驱动、Chromium 渲染进程等）的常驻内存，
+仅支持 Linux；其他平台返回 0。另外提供进程存活判断，以 pid + 启动时间识别同一个进程，
+避免 pid 被复用后把新进程当成旧进程。
+"""
+
+import os
+
+
+def _children_map():
+    """构建 父进程 -> 子进程列表 映射"""
+    children = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                stat = f.read()
+            # comm 字段可能包含空格，取最后一个 ')' 之后的字段
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def process_tree(pid=None):
+    """返回进程及其所有后代进程的 pid 列表"""
+    pid = pid or os.getpid()
+    children = _children_map()
+    pids = []
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+
+def rss_bytes(pid):
+    """读取单个进程的常驻内存（字节）"""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def process_tree_rss(pid=None):
+    """返回进程树的常驻内存总和（字节）"""
+    return sum(rss_bytes(p) for p in process_tree(pid))
+
+
+def pid_alive(pid):
+    """pid 对应的进程是否存在（无权限发送信号说明进程存在）"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def process_start_time(pid=None):
+    """进程的启动时间（开机以来的时钟周期数，/proc/<pid>/stat 第 22 个字段），无法读取时返回 None"""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            stat = f.read()
+        # comm 之后的字段从 state（第 3 个字段）开始
+        return int(stat.rsplit(")", 1)[1].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def same_process(pid, start_time):
+    """pid 仍在运行且启动时间与记录一致（pid 被其他进程复用时返回 False）"""
+    if not pid_alive(pid):
+        return False
+    return start_time is None or process_start_time(pid) == start_time
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+浏览器用户数据目录管理
+
+每个厂商保留一个已登录的"黄金"用户数据目录（config.VENDOR_PROFILE_DIRS），
+每个并发会话从黄金目录克隆出独立目录使用，互不争抢 Singleton 锁，也不会损坏黄金目录。
+厂商目录不存在时从旧版所有厂商共用的 CHROME_PROFILE_DIR 复制一份，已有的登录状态不会丢失。
+克隆时优先使用 reflink（写时复制，几乎不占空间和时间），文件系统不支持时退化为普通复制，
+并跳过各类缓存目录。会话中重新扫码登录后可以把会话目录提升为新的黄金目录。
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import time
+import uuid
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import config
+from process_stats import pid_alive
+from vendors import VENDOR_NAMES
+
+# Linux FICLONE ioctl，用于 reflink 复制
+FICLONE = 0x40049409
+
+# 克隆时跳过的目录/文件（缓存与进程锁）
+SKIP_NAMES = {
+    "Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "DawnCache",
+    "CacheStorage", "ScriptCache", "Crashpad", "BrowserMetrics", "component_crx_cache",
+    "SingletonLock", "SingletonCookie", "SingletonSocket",
+}
+
+# 会话目录中记录所属进程的文件
+OWNER_FILE = ".drf_owner"
+
+
+def _clone_file(src, dst):
+    """优先 reflink 复制单个文件，失败时普通复制"""
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
+def _ignore(directory, names):
+    return [name for name in names if name in SKIP_NAMES]
+
+
+def profile_in_use(profile_dir):
+    """用户数据目录是否仍被运行中的 Chromium 使用（SingletonLock 是指向 "主机名-pid" 的符号链接）"""
+    try:
+        target = os.readlink(os.path.join(profile_dir, "SingletonLock"))
+    except OSError:
+        return False
+    host, _, pid = target.rpartition("-")
+    return host == socket.gethostname() and pid.isdigit() and pid_alive(int(pid))
+
+
+def vendor_profile_dir(vendor):
+    """返回厂商的用户数据目录；目录还不存在而旧版共用的 CHROME_PROFILE_DIR 中有数据时先从中复制"""
+    target = config.VENDOR_PROFILE_DIRS[vendor]
+    source = config.CHROME_PROFILE_DIR
+    if os.path.exists(target) or not os.path.isdir(source) or not os.listdir(source):
+        return target
+    if profile_in_use(source):
+        print(f"⚠️ {source} 正在被浏览器使用，暂不复制为 {VENDOR_NAMES[vendor]} 用户数据目录")
+        return target
+    staging = f"{target}.seed-{os.getpid()}"
+    shutil.copytree(source, staging, symlinks=True, ignore=_ignore, copy_function=_clone_file)
+    try:
+        os.rename(staging, target)
+    except OSError:
+        # 其他进程已经完成复制
+        shutil.rmtree(staging, ignore_errors=True)
+        return target
+    print(f"📦 已从 {source} 复制 {VENDOR_NAMES[vendor]} 用户数据目录: {target}")
+    return target
+
+
+class ProfileManager:
+    """管理黄金用户数据目录与会话克隆目录"""
+
+    def __init__(self, sessions_dir=None):
+        self.sessions_dir = sessions_dir or config.PROFILE_SESSIONS_DIR
+        os.makedirs(self.sessions_dir, exist_ok=True)
+
+    def golden_dir(self, vendor):
+        return config.VENDOR_PROFILE_DIRS[vendor]
+
+    @contextmanager
+    def _golden_lock(self, vendor):
+        """克隆与提升黄金目录时互斥，避免读到写了一半的目录"""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.golden_dir(vendor).rstrip(os.sep) + ".lock"
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "w") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def clone(self, vendor, session_id=None):
+        """从黄金目录克隆出会话目录，返回会话目录路径"""
+        session_id = session_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        session_dir = os.path.join(self.sessions_dir, f"{vendor}-{session_id}")
+        golden = vendor_profile_dir(vendor)
+        start_time = time.time()
+
+        if os.path.exists(session_dir):
+            shutil.rmtree(session_dir, ignore_errors=True)
+        with self._golden_lock(vendor):
+            if os.path.isdir(golden):
+                shutil.copytree(golden, session_dir, symlinks=True, ignore=_ignore, copy_function=_clone_file)
+            else:
+                print(f"⚠️ {VENDOR_NAMES[vendor]} 黄金用户数据目录不存在，会话将从空目录开始: {golden}")
+                os.makedirs(session_dir)
+
+        with open(os.path.join(session_dir, OWNER_FILE), "w") as f:
+            f.write(str(os.getpid()))
+        print(f"🧬 已克隆用户数据目录: {session_dir} ({time.time() - start_time:.2f}秒)")
+        return session_dir
+
+    def release(self, session_dir):
+        """删除会话目录"""
+        if session_dir and os.path.abspath(session_dir).startswith(os.path.abspath(self.sessions_dir)):
+            shutil.rmtree(session_dir, ignore_errors=True)
+
+    def promote(self, vendor, session_dir):
+        """把会话目录（例如刚完成扫码登录）提升为新的黄金目录
+
+        只能在使用该目录的浏览器关闭之后调用：运行中的 Chromium 仍在写入 Cookie 数据库和 LevelDB，
+        复制出的黄金目录可能损坏。目录仍被占用时抛出 RuntimeError。
+        """
+        if profile_in_use(session_dir):
+            raise RuntimeError(f"用户数据目录仍被浏览器使用，不能提升为黄金目录: {session_dir}")
+        golden = self.golden_dir(vendor)
+        staging = f"{golden}.staging-{os.getpid()}"
+        backup = f"{golden}.old-{os.getpid()}"
+        shutil.copytree(session_dir, staging, symlinks=True, ignore=_ignore, copy_function=_clone_file)
+        owner_file = os.path.join(staging, OWNER_FILE)
+        if os.path.exists(owner_file):
+            os.remove(owner_file)
+        with self._golden_lock(vendor):
+            if os.path.exists(golden):
+                os.rename(golden, backup)
+            os.rename(staging, golden)
+        shutil.rmtree(backup, ignore_errors=True)
+        print(f"👑 已将会话登录状态提升为 {VENDOR_NAMES[vendor]} 黄金用户数据目录")
+
+    def cleanup_stale(self):
+        """删除所属进程已退出的会话目录，返回删除数量"""
+        removed = 0
+        for name in os.listdir(self.sessions_dir):
+            session_dir = os.path.join(self.sessions_dir, name)
+            try:
+                with open(os.path.join(session_dir, OWNER_FILE), "r") as f:
+                    pid = int(f.read().strip())
+            except (OSError, ValueError):
+                pid = None
+            if pid is None or not pid_alive(pid):
+                shutil.rmtree(session_dir, ignore_errors=True)
+                removed += 1
+        return removed
+
+    @contextmanager
+    def session(self, vendor, session_id=None):
+        """with 语句中使用克隆目录，结束后自动删除"""
+        session_dir = self.clone(vendor, session_id)
+        try:
+            yield session_dir
+        finally:
+            self.release(session_dir)
+
+
+def login_golden(vendor, headless=False):
+    """直接打开黄金目录完成扫码登录（独占使用，不要与会话同时运行）"""
+    from vendors import load_vendor_class
+    vendor_class = load_vendor_class(vendor)
+    auto = vendor_class(headless=headless, profile_dir=vendor_profile_dir(vendor))
+    try:
+        return bool(auto.login_only())
+    finally:
+        auto.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="浏览器用户数据目录管理")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    login_parser = subparsers.add_parser("login", help="在黄金目录中完成扫码登录")
+    login_parser.add_argument("--vendor", required=True, choices=list(VENDOR_NAMES))
+
+    subparsers.add_parser("cleanup", help="清理已失效的会话目录")
+
+    args = parser.parse_args()
+    if args.command == "login":
+        headless_env = os.environ.get("HEADLESS", "false").lower() == "true"
+        ok = login_golden(args.vendor, headless=headless_env)
+        print("✅ 登录完成" if ok else "❌ 登录失败")
+    elif args.command == "cleanup":
+        removed = ProfileManager().cleanup_stale()
+        print(f"🧹 已清理 {removed} 个会话目录")
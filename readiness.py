@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+自适应就绪等待
+
+把步骤方法中固定时长的 wait_for_timeout 换成等待具体的 DOM / 网络条件：条件满足立即继续，
+原来的固定时长只作为超时上限。超时后与原来一样继续执行后续步骤（由后续步骤自行判断失败）。
+每次等待都会记录条件实际耗时，便于找出最慢的步骤。传入 Deadline 时超时上限不超过剩余时间预算，
+预算用完后抛出 DeadlineExceeded。
+"""
+
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# DOM 在 quiet_ms 毫秒内没有变化即视为稳定（首次调用时在页面中安装 MutationObserver）
+DOM_QUIET_SCRIPT = """
+(quietMs) => {
+    if (!window.__drfQuiet) {
+        window.__drfQuiet = { last: Date.now() };
+        new MutationObserver(() => { window.__drfQuiet.last = Date.now(); })
+            .observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    }
+    return Date.now() - window.__drfQuiet.last >= quietMs;
+}
+"""
+
+# 稳定判定所需的无变化时长（毫秒）
+DOM_QUIET_MS = 500
+
+
+class WaitRecord:
+    """单次就绪等待的结果"""
+
+    def __init__(self, name, upper_ms, elapsed_ms, ready):
+        self.name = name
+        self.upper_ms = upper_ms
+        self.elapsed_ms = elapsed_ms
+        self.ready = ready
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "upper_ms": self.upper_ms,
+            "elapsed_ms": round(self.elapsed_ms),
+            "ready": self.ready,
+        }
+
+
+class ReadinessWaiter:
+    """页面的就绪等待（asyncio API）"""
+
+    def __init__(self, page, deadline=None):
+        self.page = page
+        self.deadline = deadline
+        self.records = []
+
+    async def until(self, name, wait, upper_ms):
+        """等待 wait(timeout_ms)，超时不抛出异常，返回条件是否在上限内满足"""
+        timeout_ms = self.deadline.ms(upper_ms, name) if self.deadline else upper_ms
+        start_time = time.time()
+        try:
+            await wait(timeout_ms)
+            ready = True
+        except PlaywrightTimeoutError:
+            ready = False
+        record = WaitRecord(name, upper_ms, (time.time() - start_time) * 1000, ready)
+        self.records.append(record)
+        return ready
+
+    async def visible(self, name, locator, upper_ms):
+        return await self.until(name, lambda t: locator.wait_for(state="visible", timeout=t), upper_ms)
+
+    async def hidden(self, name, locator, upper_ms):
+        return await self.until(name, lambda t: locator.wait_for(state="hidden", timeout=t), upper_ms)
+
+    async def load_state(self, name, upper_ms, state="networkidle"):
+        return await self.until(name, lambda t: self.page.wait_for_load_state(state, timeout=t), upper_ms)
+
+    async def function(self, name, script, upper_ms, arg=None):
+        return await self.until(
+            name, lambda t: self.page.wait_for_function(script, arg=arg, polling="mutation", timeout=t), upper_ms)
+
+    async def dom_quiet(self, name, upper_ms, quiet_ms=DOM_QUIET_MS):
+        return await self.until(
+            name, lambda t: self.page.wait_for_function(DOM_QUIET_SCRIPT, arg=quiet_ms, polling=100, timeout=t), upper_ms)
+
+    def saved_ms(self):
+        """相比固定等待节省的总时长（毫秒）"""
+        return sum(max(0, r.upper_ms - r.elapsed_ms) for r in self.records)
+
+    def summary(self):
+        """打印每个条件的实际耗时"""
+        if not self.records:
+            return
+        print("\n⏱️ 就绪等待统计:")
+        for r in self.records:
+            status = "✅" if r.ready else "⌛"
+            print(f"  {status} {r.name}: {r.elapsed_ms / 1000:.2f}秒 / 上限 {r.upper_ms / 1000:.0f}秒")
+        print(f"  ⚡ 相比固定等待节省 {self.saved_ms() / 1000:.1f}秒")
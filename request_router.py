@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+请求路由
+
+在浏览器上下文上注册统一的路由处理，按 URL 规则和资源类型拦截自动化用不到的请求
+（埋点、监控上报、媒体等），减少页面加载等待和流量。规则按厂商配置：
+
+- allow:       始终放行的 URL 正则（优先级最高）
+- deny:        直接中止的 URL 正则（另加所有厂商共用的 ROUTING_DENY_COMMON）
+- block_types: 直接中止的资源类型（image / font / media / stylesheet ...）
+
+主文档请求始终放行。放行的脚本/样式/字体请求交给 asset_cache 的磁盘缓存处理。
+每次运行的放行/拦截数量、响应字节数和缓存命中情况记录到运行元数据中。
+"""
+
+import re
+import weakref
+
+import config
+from asset_cache import AssetCache
+
+
+def routing_needed(launch_profile=None):
+    """是否需要在上下文上注册路由"""
+    return config.ROUTING_ENABLED or config.ASSET_CACHE_ENABLED or launch_profile == "dense"
+
+
+class RouteStats:
+    """一次运行的路由统计（按发起请求的页面归属，共享上下文的并发运行互不影响）"""
+
+    def __init__(self, cache_enabled=False):
+        self.allowed = 0
+        self.blocked = {}
+        self.bytes_in = 0
+        self.cache = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0} if cache_enabled else None
+
+    def to_dict(self):
+        return {
+            "allowed": self.allowed,
+            "blocked": sum(self.blocked.values()),
+            "blocked_by": dict(self.blocked),
+            "bytes_in": self.bytes_in,
+            "cache": dict(self.cache) if self.cache is not None else None,
+        }
+
+
+class RequestRouter:
+    """请求路由（asyncio API，每个浏览器上下文只注册一次，供复用该上下文的任务共享）
+
+    每次运行用 track(page) 登记自己的页面并取得独立的 RouteStats，请求按发起页面计入对应运行。
+    """
+
+    def __init__(self, vendor, rules=None):
+        rules = config.ROUTING_RULES.get(vendor, {}) if rules is None else rules
+        common = config.ROUTING_DENY_COMMON if config.ROUTING_ENABLED else []
+        if not config.ROUTING_ENABLED:
+            rules = {}
+        self.vendor = vendor
+        self.allow = [re.compile(p) for p in rules.get("allow", [])]
+        self.deny = [re.compile(p) for p in common + rules.get("deny", [])]
+        self.block_types = set(rules.get("block_types", []))
+        # block() 临时追加的资源类型（dense 配置登录后屏蔽的图片等），unblock() 时移除
+        self.extra_block_types = set()
+        self.cache = None
+        if config.ASSET_CACHE_ENABLED:
+            try:
+                self.cache = AssetCache()
+            except Exception as e:
+                print(f"⚠️ 静态资源缓存不可用: {str(e)}")
+        # 页面 -> 该页面所属运行的统计
+        self.runs = {}
+        # 由磁盘缓存返回的请求，不计入接收字节数
+        self.served = weakref.WeakSet()
+
+    def track(self, page, stats=None):
+        """登记运行使用的页面，返回该运行的统计（重新启动浏览器后传入原统计继续累计）"""
+        stats = stats or RouteStats(self.cache is not None)
+        self.runs[page] = stats
+        return stats
+
+    def untrack(self, page):
+        self.runs.pop(page, None)
+
+    def block(self, resource_types):
+        """追加需要拦截的资源类型（例如登录完成后的图片）"""
+        self.extra_block_types.update(resource_types)
+
+    def unblock(self):
+        """移除 block() 追加的资源类型，返回是否有被移除的类型（复用的上下文需要重新扫码登录时）"""
+        removed = bool(self.extra_block_types)
+        self.extra_block_types.clear()
+        return removed
+
+    def decide(self, url, resource_type):
+        """返回拦截原因，放行时返回 None"""
+        if resource_type == "document" or any(p.search(url) for p in self.allow):
+            return None
+        if any(p.search(url) for p in self.deny):
+            return "deny"
+        if resource_type in self.block_types or resource_type in self.extra_block_types:
+            return f"type:{resource_type}"
+        return None
+
+    def _stats_for(self, request):
+        """发起请求的页面所属运行的统计，不属于任何运行（Service Worker 等）时返回 None"""
+        try:
+            return self.runs.get(request.frame.page)
+        except Exception:
+            return None
+
+    def _count(self, route):
+        request = route.request
+        reason = self.decide(request.url, request.resource_type)
+        stats = self._stats_for(request)
+        if stats is not None:
+            if reason:
+                stats.blocked[reason] = stats.blocked.get(reason, 0) + 1
+            else:
+                stats.allowed += 1
+        return reason
+
+    async def _handle(self, route):
+        if self._count(route):
+            await route.abort()
+        elif self.cache and self.cache.cacheable(route.request):
+            try:
+                outcome, saved = await self.cache.serve(route)
+            except Exception as e:
+                print(f"⚠️ 静态资源缓存处理失败，直接请求: {str(e)}")
+                try:
+                    await route.continue_()
+                except Exception:
+                    pass
+                return
+            if outcome != "misses":
+                self.served.add(route.request)
+            stats = self._stats_for(route.request)
+            if stats is not None and stats.cache is not None:
+                stats.cache[outcome] += 1
+                stats.cache["bytes_saved"] += saved
+        else:
+            await route.continue_()
+
+    async def _on_request_finished(self, request):
+        """按实际接收的响应体大小累计（分块传输和压缩响应通常没有 content-length）"""
+        if request in self.served:
+            return
+        stats = self._stats_for(request)
+        if stats is None:
+            return
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        stats.bytes_in += max(0, sizes.get("responseBodySize", 0))
+
+    @classmethod
+    async def install(cls, context, vendor):
+        """在上下文上注册路由；已注册时直接复用（各运行的统计由 track() 分开记录）"""
+        router = getattr(context, "_drf_router", None)
+        if router is not None:
+            return router
+        router = cls(vendor)
+        await context.route("**/*", router._handle)
+        context.on("requestfinished", router._on_request_finished)
+        context._drf_router = router
+        return router
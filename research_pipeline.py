@@ -0,0 +1,614 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+深度研究流水线
+
+各厂商共用的运行流程：启动浏览器（锁文件清理、启动配置、请求路由、登录状态缓存）、访问页面、
+登录检查与扫码等待、提交主题、等待完成、保存结果，以及检查点、结果库、时间预算、步骤重试、
+运行追踪和指标。厂商插件继承 ResearchPipeline，只实现与页面相关的部分（均为 async 方法）：
+
+- VENDOR                     厂商名（同时决定 config 中的地址、用户数据目录、路由规则和 SELECTORS 中的选择器）
+- CONTEXT_PERMISSIONS        浏览器上下文需要的额外权限
+- 登录策略                   login_state() / open_login() / login_completed() / qr_expired() / refresh_qr()
+- 提交策略                   SUBMIT_STEPS 中列出的步骤方法
+- 完成检测                   COMPLETION_STEPS 中列出的步骤方法
+- 结果提取                   extract_result()（流式正文和网络捕获由流水线统一处理）
+
+流水线基于 Playwright 的 asyncio API，由 run_async() 运行，多标签页复用和并发会话直接在自己的事件循环中
+调用；命令行入口、任务队列和融合研究等同步调用方使用 run() / close()，由 browser_launch.run_sync()
+在当前线程常驻的事件循环中运行同一流程。
+
+新厂商在 vendors.py 的 VENDOR_PLUGINS 中注册后，任务队列、浏览器池、多标签页模式、融合研究和
+基准测试即可直接使用。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from playwright.async_api import async_playwright
+
+import config
+from auth_cache import AuthStateCache, restore_auth_state
+from browser_launch import clean_profile_locks, launch_persistent, run_sync
+from checkpoint import Checkpoint
+from deadline import Deadline, DeadlineExceeded
+from input_strategy import InputStrategy, resolve_strategy
+from metrics import registry
+from partial_report import PartialReportWriter
+from readiness import ReadinessWaiter
+from request_router import RequestRouter, routing_needed
+from result_store import ResultStore, cached_result, release_result_path, reserve_result_path
+from retry_policy import retry_step
+from run_trace import RunTrace, traced_step
+from selector_registry import SelectorRegistry
+from stream_capture import ResponseCapture, StreamRecorder
+from vendors import VENDOR_NAMES
+
+
+class ResearchPipeline:
+    """厂商深度研究自动化的基类（asyncio API，同步调用方使用 run() / close()）"""
+
+    VENDOR = None
+    # 浏览器上下文需要的额外权限，例如通过剪贴板读取结果
+    CONTEXT_PERMISSIONS = []
+    # 提交主题的步骤：(步骤方法名, 完成后主题是否已提交给厂商)，恢复模式下跳过
+    SUBMIT_STEPS = []
+    # 等待研究完成的步骤方法名，检查点中已完成的步骤恢复时跳过
+    COMPLETION_STEPS = []
+    # 结果文件名前缀（result_store 按文件名识别厂商）
+    RESULT_FILE_PREFIX = None
+    # 扫码登录最长等待秒数
+    LOGIN_TIMEOUT = 300
+
+    def __init__(self, headless=False, workspace_dir=None, topic=None, base_url=None,
+                 profile_dir=None, download_dir=None, capture_mode=None,
+                 stream_partial=None, context=None, page=None, input_strategy=None,
+                 run_id=None, launch_profile=None, resume=False, force=False,
+                 deadline=None):
+        """初始化运行参数（浏览器在 run_async() 开始时启动）
+
+        传入 context 时复用调用方已启动的浏览器，例如浏览器池中预热好的上下文；同时传入 page 时直接使用
+        该页面，否则在上下文中新建标签页，运行结束后关闭。context / page 必须属于运行 run_async() 的事件循环。
+        deadline 为本次运行的时间预算（默认 JOB_TIME_BUDGET），所有等待都从中扣减。
+        force 为 True 时忽略结果库中有效期内的已有结果，重新发起研究。
+        resume 为 True 时读取 run_id（未指定时取最近一次）的检查点，主题已提交则回到原对话继续。
+        """
+        # 确保目录存在
+        config.ensure_dirs()
+
+        vendor = self.VENDOR
+        self.workspace_dir = workspace_dir or config.WORKSPACE_DIR
+        self.headless = headless
+        self.deadline = deadline or Deadline.from_config()
+        self.launch_profile = launch_profile or config.LAUNCH_PROFILE
+        self.topic = topic or config.RESEARCH_TOPIC
+        self.profile_dir = profile_dir or config.CHROME_PROFILE_DIR
+        self.download_dir = download_dir or config.SYSTEM_DOWNLOADS_DIR
+        self.result_path = None
+        # 本次运行的元数据（输入策略等）
+        self.run_metadata = {}
+        # 运行被 Ctrl+C 或取消打断（检查点记为 interrupted）
+        self.interrupted = False
+        # 恢复模式沿用检查点中的主题和运行 ID
+        self.checkpoint = Checkpoint.load(vendor, run_id) if resume else None
+        if self.checkpoint:
+            self.topic = self.checkpoint.state["topic"]
+            run_id = self.checkpoint.state["run_id"]
+        self.trace = RunTrace(vendor, self.topic, run_id=run_id)
+        self.resumed = bool(self.checkpoint and self.checkpoint.submitted and self.checkpoint.conversation_url)
+        if not self.resumed:
+            # 主题尚未提交时从头运行
+            self.checkpoint = Checkpoint(vendor, self.topic, self.trace.run_id)
+        self.capture_mode = capture_mode or config.RESULT_CAPTURE_MODE
+        self.capture = None
+        self.stream_partial = config.STREAM_PARTIAL if stream_partial is None else stream_partial
+        self.partial = None
+        self.recorder = None
+        self.playwright = None
+        self.browser = None
+        self.context = context
+        self.page = page
+        self.owns_context = context is None
+        # 在调用方的上下文中自行打开的标签页，结束时关闭
+        self.owns_page = context is not None and page is None
+        # 多个会话共享浏览器上下文时由调用方传入同一把 asyncio 锁，串行使用剪贴板
+        self.clipboard_lock = None
+        # 本次运行中是否完成了扫码登录（供用户数据目录管理提升为黄金目录）
+        self.login_performed = False
+        # 登录状态缓存只用于真实站点，模拟页面等自定义地址不读写缓存
+        real_site = base_url in (None, config.VENDOR_URLS[vendor])
+        self.auth_cache = AuthStateCache(vendor) if config.AUTH_STATE_ENABLED and real_site else None
+        # 缓存的登录状态复核失败，登录检查直接进入扫码流程
+        self.auth_expired = False
+        # 结果库同样只用于真实站点
+        self.use_result_store = real_site
+        self.force = force
+
+        self.base_url = base_url or config.VENDOR_URLS[vendor]
+        self.router = None
+        # 本次运行的路由统计（共享上下文的其他运行单独统计）
+        self.route_stats = None
+        self.selectors = SelectorRegistry(vendor)
+        self.readiness = ReadinessWaiter(self.page, self.deadline)
+        self.input = InputStrategy(self.page, resolve_strategy(vendor, input_strategy))
+
+    @property
+    def display_name(self):
+        return VENDOR_NAMES.get(self.VENDOR, self.VENDOR)
+
+    # ---- 浏览器 ----
+
+    async def _open_context(self, profile, headless):
+        self.context = await launch_persistent(self.playwright, self.profile_dir, headless, self.download_dir,
+                                               profile=profile)
+        registry().gauge_add("drf_active_contexts", 1, vendor=self.VENDOR)
+        if self.CONTEXT_PERMISSIONS:
+            await self.context.grant_permissions(self.CONTEXT_PERMISSIONS)
+        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        self.readiness.page = self.page
+        self.input.page = self.page
+
+    async def setup_driver(self):
+        """设置Playwright驱动"""
+        try:
+            print("🔧 正在启动 Playwright...")
+
+            # 清理 Chromium 锁文件，防止 "profile in use" 错误
+            clean_profile_locks(self.profile_dir, verbose=True)
+
+            self.playwright = await async_playwright().start()
+
+            # 启动浏览器，使用用户数据目录以持久化登录
+            await self._open_context(self.launch_profile, self.headless)
+            print("✅ 浏览器启动成功")
+
+        except Exception as e:
+            print(f"❌ 浏览器启动失败: {str(e)}")
+            print("\n💡 解决方案：")
+            print("1. 安装 Playwright: pip install playwright")
+            print("2. 安装浏览器: playwright install chromium")
+            sys.exit(1)
+
+    async def _open_page(self):
+        """未传入上下文时启动浏览器，传入上下文但没有页面时在其中打开本会话的标签页"""
+        if self.owns_context:
+            if self.context is None:
+                await self.setup_driver()
+            return
+        if self.CONTEXT_PERMISSIONS:
+            await self.context.grant_permissions(self.CONTEXT_PERMISSIONS)
+        if self.page is None:
+            self.page = await self.context.new_page()
+        self.readiness.page = self.page
+        self.input.page = self.page
+
+    async def _relaunch(self, profile, headless=None):
+        """使用指定启动配置重新启动浏览器（同一用户数据目录）"""
+        if self.context is not None:
+            try:
+                await self.context.close()
+            except Exception:
+                pass
+            self.context = None
+            registry().gauge_add("drf_active_contexts", -1, vendor=self.VENDOR)
+        await self._open_context(profile, self.headless if headless is None else headless)
+        if self.router:
+            self.router = await RequestRouter.install(self.context, self.VENDOR)
+            self.route_stats = self.router.track(self.page, self.route_stats)
+
+    async def _login_with_visible_browser(self):
+        """dense 配置下需要扫码时临时切换为可见浏览器完成登录，完成后切回 dense
+
+        返回登录结果；可见浏览器无法启动时返回 None，由调用方继续在无头模式下截图二维码。
+        """
+        print("🖥️ 切换到可见浏览器完成扫码登录...")
+        self.launch_profile = "default"
+        result = None
+        try:
+            await self._relaunch("default", headless=False)
+            result = await self.visit_page() and await self.check_and_handle_login()
+        except Exception as e:
+            print(f"⚠️ 可见浏览器启动失败，继续在无头模式下截图二维码: {str(e)}")
+        finally:
+            self.launch_profile = "dense"
+            await self._relaunch("dense")
+            await self.visit_page()
+        return result
+
+    async def _close_page(self):
+        if self.owns_page and self.page is not None:
+            try:
+                await self.page.close()
+            except Exception:
+                pass
+
+    # ---- 公共步骤 ----
+
+    @traced_step
+    @retry_step()
+    async def visit_page(self):
+        """访问厂商页面（恢复模式下回到检查点中的对话）"""
+        try:
+            if self.resumed:
+                print(f"\n♻️ 从检查点恢复，回到原对话: {self.checkpoint.conversation_url}")
+                await self.page.goto(self.checkpoint.conversation_url, wait_until="networkidle",
+                                     timeout=self.deadline.ms(60000))
+                await self.readiness.dom_quiet("页面加载", 5000)
+                return True
+
+            if not self.owns_context and not self.owns_page and self.page.url.startswith(self.base_url):
+                print(f"♻️ 复用已预热的{self.display_name}页面，跳过加载")
+                return True
+
+            print(f"\n🚀 正在访问{self.display_name}页面: {self.base_url}")
+            await self.page.goto(self.base_url, wait_until="networkidle", timeout=self.deadline.ms(60000))
+
+            # 等待页面加载
+            print("⏳ 等待页面加载完成...")
+            await self.readiness.dom_quiet("页面加载", 5000)
+
+            if self.page.url.startswith(self.base_url):
+                print("✅ 页面加载成功")
+            else:
+                # 可能跳转到登录页，这是正常的
+                print(f"⚠️ 页面重定向至: {self.page.url}")
+            return True
+
+        except Exception as e:
+            print(f"❌ 页面访问失败: {str(e)}")
+            return False
+
+    @traced_step
+    @retry_step()
+    async def check_and_handle_login(self):
+        """检查并处理登录：需要登录时打开登录框、保存二维码截图并等待扫码"""
+        try:
+            print("\n🔍 检查登录状态...")
+            logged_in = False if self.auth_expired else await self.login_state()
+            if logged_in is None:
+                print("⚠️ 无法确定登录状态，继续执行...")
+                return True
+            if logged_in:
+                print("✅ 检测到已登录状态")
+                return True
+
+            print("\n" + "=" * 50)
+            print("🔐 检测到需要登录")
+            print("=" * 50)
+
+            if self.launch_profile == "dense" and self.owns_context:
+                result = await self._login_with_visible_browser()
+                if result is not None:
+                    return result
+            if self.router and self.router.unblock():
+                # 复用的上下文（浏览器池等）中之前的任务登录后屏蔽了图片，二维码需要图片才能显示
+                print("🖼️ 已恢复加载图片，用于显示登录二维码")
+
+            # 确保 images 目录存在
+            images_dir = os.path.join(self.workspace_dir, "images")
+            os.makedirs(images_dir, exist_ok=True)
+            if not await self.open_login(images_dir):
+                return False
+            return await self._wait_for_login(images_dir)
+
+        except Exception as e:
+            print(f"⚠️ 登录检查异常: {str(e)}")
+            return False
+
+    async def _wait_for_login(self, images_dir):
+        """监控登录状态和二维码失效"""
+        print("\n⏳ 等待登录完成...")
+        login_limit = self.deadline.limit(self.LOGIN_TIMEOUT)
+        start_time = time.time()
+
+        while not login_limit.expired():
+            await self.page.wait_for_timeout(login_limit.ms(2000))
+
+            if await self.login_completed():
+                print("✅ 登录成功！")
+                self.login_performed = True
+                return True
+
+            if await self.qr_expired():
+                print("🔄 二维码已失效，尝试刷新...")
+                self.trace.qr_refresh()
+                await self.refresh_qr(images_dir)
+
+            elapsed = int(time.time() - start_time)
+            if elapsed % 30 == 0:
+                print(f"⏳ 等待登录中... ({elapsed}秒)")
+
+        print("⚠️ 登录等待超时")
+        return False
+
+    def _result_dir(self):
+        return self.workspace_dir
+
+    def _result_filepath(self):
+        """生成结果文件路径（同一秒内完成的会话追加序号，见 reserve_result_path）"""
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return reserve_result_path(os.path.join(self._result_dir(), f"{self.RESULT_FILE_PREFIX}_{timestamp}.md"))
+
+    @traced_step
+    @retry_step()
+    async def save_results(self):
+        """保存研究结果（流式正文 / 网络捕获 / 厂商页面提取），未得到结果文件时返回 False"""
+        try:
+            print("\n💾 准备保存研究结果...")
+
+            # 流式写入的正文直接转为最终结果
+            if self.partial:
+                await (self.capture or self.recorder).wait_idle()
+                captured = self.capture.report() if self.capture else self.recorder.report()
+                if len(captured) > len(self.partial.written):
+                    # 实时写入的正文不完整（流中断、页面刷新后重新开始等）时改用捕获到的最长报告
+                    print("⚠️ 实时写入的正文短于捕获到的报告，改用捕获结果")
+                    self.partial.update(captured)
+                target_path = self.partial.commit()
+                if target_path:
+                    self.result_path = target_path
+                    print(f"📁 实时写入的结果已保存到: {target_path}")
+                    return True
+                print("⚠️ 未收到流式正文")
+
+            # 网络层捕获到报告时直接落盘，跳过页面上的下载/复制操作
+            if self.capture:
+                target_path = self._result_filepath()
+                if await self.capture.save(target_path):
+                    self.result_path = target_path
+                    print(f"📁 已从网络响应重建结果并保存到: {target_path}")
+                    return True
+                release_result_path(target_path)
+                print("⚠️ 研究期间未捕获到对话响应正文，改用页面提取方式")
+
+            return bool(await self.extract_result()) and self.result_path is not None
+
+        except Exception as e:
+            print(f"❌ 保存结果失败: {str(e)}")
+            return False
+
+    # ---- 厂商插件实现 ----
+
+    async def login_state(self):
+        """返回 True（已登录）/ False（需要登录）/ None（无法确定）"""
+        raise NotImplementedError
+
+    async def open_login(self, images_dir):
+        """打开登录框并保存二维码截图，无法显示登录框时返回 False"""
+        raise NotImplementedError
+
+    async def login_completed(self):
+        """扫码等待期间判断是否已登录"""
+        raise NotImplementedError
+
+    async def qr_expired(self):
+        return False
+
+    async def refresh_qr(self, images_dir):
+        """刷新失效的二维码并重新截图"""
+
+    async def extract_result(self):
+        """从页面提取研究结果并设置 self.result_path，失败时返回 False"""
+        raise NotImplementedError
+
+    # ---- 运行 ----
+
+    def _use_cached_result(self):
+        """有效期内已有该主题的结果时直接使用，不再打开厂商页面"""
+        if not self.use_result_store or self.force or self.resumed:
+            return False
+        cached = cached_result(self.VENDOR, self.topic)
+        if not cached:
+            return False
+        print(f"♻️ 有效期内已有该主题的研究结果，直接返回: {cached}")
+        self.result_path = cached
+        self.run_metadata["result_cache"] = "hit"
+        registry().inc("drf_result_cache_hits_total", vendor=self.VENDOR)
+        return True
+
+    async def _restore_auth_state(self):
+        if self.auth_cache:
+            self.auth_expired = await restore_auth_state(self.auth_cache, self.context, self.base_url) is False
+
+    async def _save_auth_state(self):
+        if self.auth_cache and (self.login_performed or not self.auth_cache.is_fresh()):
+            self.auth_cache.save(await self.context.storage_state())
+
+    def run(self):
+        """运行完整流程（同步调用方入口，浏览器保持打开，由 close() 关闭）"""
+        return run_sync(self.run_async())
+
+    async def run_async(self):
+        """运行完整流程"""
+        vendor = self.VENDOR
+        success = False
+        self.trace.start()
+        try:
+            print("\n" + "=" * 60)
+            print(f"🤖 {self.display_name}深度研究自动化")
+            print("=" * 60)
+
+            if self._use_cached_result():
+                success = True
+                return True
+            await self._open_page()
+            if routing_needed(self.launch_profile):
+                self.router = await RequestRouter.install(self.context, vendor)
+                self.route_stats = self.router.track(self.page)
+            await self._restore_auth_state()
+            if not await self.visit_page(): return False
+            self.checkpoint.step_done("visit_page", self.page.url)
+            if not await self.check_and_handle_login(): return False
+            self.checkpoint.step_done("check_and_handle_login", self.page.url)
+            await self._save_auth_state()
+            if self.launch_profile == "dense":
+                # 登录完成后不再需要二维码等图片资源
+                self.router.block(config.DENSE_BLOCKED_RESOURCE_TYPES)
+            if self.stream_partial:
+                self.partial = PartialReportWriter(self._result_filepath())
+            if self.partial or self.capture_mode == "network":
+                # 实时写入与网络捕获共用页面内的同一个 fetch 包装
+                sink = self.partial.update if self.partial else lambda text: None
+                self.recorder = await StreamRecorder(self.page, vendor, sink).install()
+            if self.capture_mode == "network":
+                print("📡 已启用网络层结果捕获")
+                self.capture = ResponseCapture(self.page, vendor, self.recorder)
+            self.checkpoint.track(self.page)
+            if self.resumed:
+                print(f"♻️ 主题已提交（检查点步骤: {self.checkpoint.step}），跳过提交")
+            else:
+                for step, submits in self.SUBMIT_STEPS:
+                    if not await getattr(self, step)(): return False
+                    self.checkpoint.step_done(step, self.page.url, submitted=submits)
+            for step in self.COMPLETION_STEPS:
+                if self.checkpoint.done(step):
+                    continue
+                if not await getattr(self, step)(): return False
+                self.checkpoint.step_done(step, self.page.url)
+            if not await self.save_results(): return False
+            self.checkpoint.step_done("save_results", self.page.url)
+
+            print("\n" + "=" * 60)
+            print("🎉 自动化流程完成！")
+            print("=" * 60)
+            success = True
+
+        except DeadlineExceeded as e:
+            print(f"\n⏰ {str(e)}，结束本次运行")
+            self.run_metadata["deadline_exceeded"] = True
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # run_sync 在 Ctrl+C 时取消运行中的协程；多标签页模式下会话随 worker 一起取消
+            print("\n⚠️ 运行被中断")
+            self.interrupted = True
+            raise
+        except Exception as e:
+            print(f"\n❌ 执行出错: {str(e)}")
+        finally:
+            await self._close_page()
+            self.cleanup(success)
+        return success
+
+    def login_only(self, scan=True):
+        """只完成登录检查（同步调用方入口，浏览器保持打开，由 close() 关闭）"""
+        return run_sync(self.login_only_async(scan))
+
+    async def login_only_async(self, scan=True):
+        """只打开页面完成登录检查（需要时等待扫码），不提交主题，返回是否已登录
+
+        scan 为 False 时需要扫码直接返回 None，由调用方换成可见浏览器后再登录。
+        """
+        try:
+            await self._open_page()
+            await self._restore_auth_state()
+            if not await self.visit_page():
+                return False
+            if not scan and (self.auth_expired or await self.login_state() is False):
+                return None
+            logged_in = await self.check_and_handle_login()
+            if logged_in:
+                await self._save_auth_state()
+            return logged_in
+        finally:
+            await self._close_page()
+
+    def cleanup(self, success):
+        """清理资源（浏览器保持打开，由 close() 关闭），每一步单独处理异常，一步失败不影响其余步骤"""
+        if self.partial:
+            try:
+                # 未完成时保留 .partial.md，已写入的进度不会丢失
+                self.partial.close()
+                release_result_path(self.partial.final_path)
+            except Exception as e:
+                print(f"⚠️ 关闭实时写入文件失败: {str(e)}")
+        try:
+            if self.recorder:
+                self.recorder.detach()
+            if self.capture:
+                self.capture.detach()
+        except Exception as e:
+            print(f"⚠️ 移除网络捕获失败: {str(e)}")
+        try:
+            self.checkpoint.untrack()
+        except Exception as e:
+            print(f"⚠️ 移除检查点页面监听失败: {str(e)}")
+        try:
+            self.checkpoint.finish(success, interrupted=self.interrupted)
+        except Exception as e:
+            print(f"⚠️ 更新检查点失败: {str(e)}")
+        if success and self.result_path and self.use_result_store and "result_cache" not in self.run_metadata:
+            try:
+                store = ResultStore()
+                try:
+                    store.record(self.VENDOR, self.topic, self.result_path, self.trace.run_id, self.trace.started_at)
+                finally:
+                    store.close()
+            except Exception as e:
+                print(f"⚠️ 写入结果库失败: {str(e)}")
+        try:
+            self.readiness.summary()
+        except Exception as e:
+            print(f"⚠️ 输出就绪等待统计失败: {str(e)}")
+        try:
+            self.selectors.flush()
+        except Exception as e:
+            print(f"⚠️ 保存选择器统计失败: {str(e)}")
+        try:
+            if self.router:
+                self.run_metadata["routing"] = self.route_stats.to_dict()
+                self.router.untrack(self.page)
+        except Exception as e:
+            print(f"⚠️ 读取请求路由统计失败: {str(e)}")
+        try:
+            self.trace.finish(success, self.result_path, self.run_metadata)
+        except Exception as e:
+            print(f"⚠️ 写入运行追踪失败: {str(e)}")
+        if success:
+            print("\n🔚 任务完成！")
+        else:
+            print("\n💔 任务失败！")
+
+    def close(self):
+        """关闭浏览器并停止 Playwright（同步调用方入口，复用的外部上下文由调用方负责关闭）"""
+        if self.owns_context and (self.context or self.playwright):
+            run_sync(self.close_async())
+
+    async def close_async(self):
+        if not self.owns_context:
+            return
+        try:
+            if self.context:
+                await self.context.close()
+                registry().gauge_add("drf_active_contexts", -1, vendor=self.VENDOR)
+            if self.playwright:
+                await self.playwright.stop()
+        except Exception as e:
+            print(f"⚠️ 关闭浏览器失败: {str(e)}")
+        finally:
+            self.context = None
+            self.playwright = None
+
+    @classmethod
+    def main(cls):
+        """命令行入口：python <厂商模块>.py [--resume [RUN_ID]] [--force]"""
+        # 从环境变量读取 headless 配置，默认为 False (本地运行通常需要界面)
+        # 在 Docker 中可以通过 ENV HEADLESS=true 设置
+        headless_env = os.environ.get("HEADLESS", "false").lower() == "true"
+        parser = argparse.ArgumentParser(description=f"{VENDOR_NAMES.get(cls.VENDOR, cls.VENDOR)}深度研究自动化")
+        parser.add_argument("--resume", nargs="?", const="", default=None, metavar="RUN_ID",
+                            help="从检查点恢复（不指定 RUN_ID 时取最近一次）")
+        parser.add_argument("--force", action="store_true", help="忽略有效期内的已有结果，重新研究")
+        args = parser.parse_args()
+        auto = cls(headless=headless_env, run_id=args.resume or None, resume=args.resume is not None,
+                   force=args.force)
+        try:
+            success = auto.run()
+        except KeyboardInterrupt:
+            success = False
+        finally:
+            auto.close()
+        if not success:
+            sys.exit(1)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+研究结果库
+
+每次成功的运行把厂商、主题、结果文件路径和起止时间记录到 RESULT_STORE_DB（SQLite）。
+提交新研究前按「厂商 + 规范化主题」查找，在有效期（RESULT_CACHE_MAX_AGE）内已有结果时
+直接返回已有的 Markdown 文件，不再重新发起数小时的深度研究；force 可跳过缓存。
+
+结果正文同时写入 FTS5 全文索引（trigram 分词，支持中文子串检索），可按关键词检索所有历史报告。
+
+    python result_store.py list                  # 查看最近的结果
+    python result_store.py lookup --vendor qwen --topic "..."
+    python result_store.py search "固态电池" --vendor doubao
+    python result_store.py index                 # 把索引之前已下载的报告文件补录进来
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    vendor TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    topic_key TEXT NOT NULL,
+    result_path TEXT NOT NULL,
+    run_id TEXT,
+    started_at REAL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_lookup ON results (vendor, topic_key, finished_at);
+CREATE INDEX IF NOT EXISTS idx_results_path ON results (result_path);
+"""
+
+# rowid 与 results.id 一致
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS results_fts USING fts5(topic, content, tokenize='trigram');
+"""
+
+# trigram 分词下短于 3 个字符的关键词无法走索引，改用 LIKE 扫描
+MIN_MATCH_CHARS = 3
+
+# 补录时识别的结果文件名：(文件名正则, 厂商)；同一秒内保存的多个结果带 _2、_3 ... 后缀
+RESULT_FILE_PATTERNS = [
+    (re.compile(r"^research_result_\d{8}_\d{6}(_\d+)?\.md$"), "doubao"),
+    (re.compile(r"^qwen_research_\d{8}_\d{6}(_\d+)?\.md$"), "qwen"),
+]
+
+
+def reserve_result_path(path):
+    """按时间戳命名的结果文件在同一秒内已存在时（多个标签页同时完成）追加序号，并创建空文件占位"""
+    base, ext = os.path.splitext(path)
+    candidate, index = path, 1
+    while True:
+        try:
+            with open(candidate, "x"):
+                return candidate
+        except FileExistsError:
+            index += 1
+            candidate = f"{base}_{index}{ext}"
+
+
+def release_result_path(path):
+    """删除预留后没有写入内容的占位文件"""
+    try:
+        if os.path.getsize(path) == 0:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+def normalize_topic(topic):
+    """规范化主题：全半角统一、忽略大小写、合并空白、去掉首尾标点"""
+    text = unicodedata.normalize("NFKC", topic or "").lower()
+    # 豆包输入时会去掉 "/"，两边保持一致
+    text = text.replace("/", "")
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" .。!！?？,，;；:：\"'“”‘’")
+
+
+def topic_key(topic):
+    return hashlib.sha1(normalize_topic(topic).encode("utf-8")).hexdigest()
+
+
+class ResultStore:
+    """基于 SQLite 的结果库（每个进程各自创建实例）"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config.RESULT_STORE_DB
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite 未编译 FTS5 或版本低于 3.34（无 trigram）时只按主题检索
+            print(f"⚠️ 全文索引不可用，仅按主题检索: {str(e)}")
+            self.fts = False
+
+    def close(self):
+        self.conn.close()
+
+    def record(self, vendor, topic, result_path, run_id=None, started_at=None, finished_at=None):
+        """记录一次成功运行的结果并写入全文索引，返回记录 id"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(
+                "INSERT INTO results (vendor, topic, topic_key, result_path, run_id, started_at, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (vendor, topic, topic_key(topic), os.path.abspath(result_path), run_id,
+                 started_at, finished_at or time.time()),
+            )
+            self._index(cursor.lastrowid, topic, result_path)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return cursor.lastrowid
+
+    def _index(self, result_id, topic, result_path):
+        if not self.fts:
+            return
+        try:
+            with open(result_path, "r", encoding="utf-8", errors="replace") as f:
+                content = f.read()
+        except OSError:
+            content = ""
+        self.conn.execute("INSERT INTO results_fts (rowid, topic, content) VALUES (?, ?, ?)",
+                          (result_id, topic, content))
+
+    def search(self, query, vendor=None, limit=20):
+        """按关键词（空白分隔，全部命中）检索主题和正文，返回带 snippet 的结果记录"""
+        terms = [t for t in query.split() if t]
+        if not terms:
+            return []
+        if not self.fts:
+            sql = "SELECT *, '' AS snippet FROM results WHERE " + " AND ".join("topic LIKE ?" for _ in terms)
+            params = [f"%{t}%" for t in terms]
+            if vendor:
+                sql += " AND vendor = ?"
+                params.append(vendor)
+            return self.conn.execute(sql + " ORDER BY finished_at DESC LIMIT ?", params + [limit]).fetchall()
+
+        long_terms = [t for t in terms if len(t) >= MIN_MATCH_CHARS]
+        short_terms = [t for t in terms if len(t) < MIN_MATCH_CHARS]
+        where, params = [], []
+        if long_terms:
+            where.append("results_fts MATCH ?")
+            params.append(" ".join('"{}"'.format(t.replace('"', '""')) for t in long_terms))
+        for term in short_terms:
+            where.append("(results_fts.topic LIKE ? OR results_fts.content LIKE ?)")
+            params.extend([f"%{term}%", f"%{term}%"])
+        if vendor:
+            where.append("r.vendor = ?")
+            params.append(vendor)
+        order = "rank" if long_terms else "r.finished_at DESC"
+        sql = (
+            "SELECT r.*, snippet(results_fts, 1, '【', '】', '…', 24) AS snippet "
+            "FROM results_fts JOIN results r ON r.id = results_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?"
+        )
+        return self.conn.execute(sql, params + [limit]).fetchall()
+
+    def backfill(self, dirs=None):
+        """补录：索引缺失的已记录结果，并把目录中尚未记录的结果文件加入结果库，返回新增数量"""
+        added = 0
+        if self.fts:
+            for row in self.conn.execute(
+                "SELECT id, topic, result_path FROM results WHERE id NOT IN (SELECT rowid FROM results_fts)"
+            ).fetchall():
+                self._index(row["id"], row["topic"], row["result_path"])
+                added += 1
+
+        dirs = dirs or [config.WORKSPACE_DIR, config.SYSTEM_DOWNLOADS_DIR, config.DOWNLOAD_DIR]
+        for directory in dict.fromkeys(os.path.abspath(d) for d in dirs):
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                vendor = next((v for pattern, v in RESULT_FILE_PATTERNS if pattern.match(name)), None)
+                if vendor is None:
+                    continue
+                path = os.path.join(directory, name)
+                if self.conn.execute("SELECT 1 FROM results WHERE result_path = ?", (path,)).fetchone():
+                    continue
+                # 没有运行记录的旧文件以正文第一个标题作为主题、文件修改时间作为完成时间
+                self.record(vendor, _title_of(path) or name, path, finished_at=os.path.getmtime(path))
+                added += 1
+        return added
+
+    def lookup(self, vendor, topic, max_age=None):
+        """返回有效期内最新的结果记录（结果文件必须仍然存在），没有时返回 None"""
+        max_age = config.RESULT_CACHE_MAX_AGE if max_age is None else max_age
+        rows = self.conn.execute(
+            "SELECT * FROM results WHERE vendor = ? AND topic_key = ? AND finished_at >= ? "
+            "ORDER BY finished_at DESC",
+            (vendor, topic_key(topic), time.time() - max_age),
+        ).fetchall()
+        for row in rows:
+            if os.path.exists(row["result_path"]):
+                return row
+        return None
+
+    def recent(self, limit=50):
+        return self.conn.execute("SELECT * FROM results ORDER BY finished_at DESC LIMIT ?", (limit,)).fetchall()
+
+
+def _title_of(path):
+    """Markdown 文件的第一个标题"""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if line.startswith("#"):
+                    return line.lstrip("#").strip()
+    except OSError:
+        pass
+    return None
+
+
+def cached_result(vendor, topic, max_age=None):
+    """有效期内已有结果时返回结果文件路径，否则返回 None（RESULT_CACHE_ENABLED 关闭时始终为 None）"""
+    if not config.RESULT_CACHE_ENABLED:
+        return None
+    store = ResultStore()
+    try:
+        row = store.lookup(vendor, topic, max_age)
+    finally:
+        store.close()
+    return row["result_path"] if row else None
+
+
+def _format_time(ts):
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) if ts else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="研究结果库")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="查看最近的结果")
+    list_parser.add_argument("--limit", type=int, default=50)
+
+    lookup_parser = subparsers.add_parser("lookup", help="按厂商和主题查找有效期内的结果")
+    lookup_parser.add_argument("--vendor", required=True)
+    lookup_parser.add_argument("--topic", required=True)
+    lookup_parser.add_argument("--max-age-hours", type=float, default=None)
+
+    search_parser = subparsers.add_parser("search", help="按关键词检索历史报告")
+    search_parser.add_argument("query", help="关键词，空白分隔表示同时包含")
+    search_parser.add_argument("--vendor", default=None)
+    search_parser.add_argument("--limit", type=int, default=20)
+
+    subparsers.add_parser("index", help="补录索引之前已下载的报告文件")
+
+    args = parser.parse_args()
+    store = ResultStore()
+    try:
+        if args.command == "list":
+            for row in store.recent(args.limit):
+                print(f"📄 [{row['vendor']}] {_format_time(row['finished_at'])} {row['topic']}\n   {row['result_path']}")
+        elif args.command == "lookup":
+            max_age = args.max_age_hours * 3600 if args.max_age_hours is not None else None
+            row = store.lookup(args.vendor, args.topic, max_age)
+            if row:
+                print(f"✅ {row['result_path']} ({_format_time(row['finished_at'])})")
+            else:
+                print("📭 有效期内没有该主题的结果")
+        elif args.command == "search":
+            start_time = time.time()
+            rows = store.search(args.query, args.vendor, args.limit)
+            print(f"🔍 找到 {len(rows)} 条结果（{(time.time() - start_time) * 1000:.1f}毫秒）")
+            for row in rows:
+                print(f"\n📄 [{row['vendor']}] {_format_time(row['finished_at'])} {row['topic']}\n   {row['result_path']}")
+                if row["snippet"]:
+                    print(f"   {' '.join(row['snippet'].split())}")
+        elif args.command == "index":
+            added = store.backfill()
+            print(f"✅ 已补录 {added} 条结果")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
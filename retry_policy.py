@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+步骤重试策略
+
+步骤方法统一约定：返回 True 表示成功、False 表示失败，异常在方法内部捕获并转为 False。
+retry_step 按 STEP_RETRY_POLICIES 中该步骤的策略（总尝试次数、首次退避秒数、退避上限）
+在失败时重试，退避时间指数增长并加随机抖动，且不超过运行的剩余时间预算。
+
+会把主题提交给厂商的步骤标记为 idempotent=False，无论策略如何配置都只执行一次，
+避免重复提交产生多个对话。
+
+与 traced_step 一起使用时 traced_step 放在外层，重试次数计入同一个步骤事件：
+
+    @traced_step
+    @retry_step(idempotent=False)
+    def send_request(self): ...
+"""
+
+import asyncio
+import functools
+import inspect
+import random
+import time
+
+import config
+from metrics import registry
+
+
+class RetryPolicy:
+    """单个步骤的重试策略（attempts 为总尝试次数）"""
+
+    def __init__(self, attempts=1, backoff=5.0, max_backoff=60.0):
+        self.attempts = max(1, int(attempts))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def for_step(cls, vendor, step, idempotent=True):
+        """读取配置中的步骤策略，"<厂商>.<步骤>" 优先于 "<步骤>" """
+        if not idempotent or not config.STEP_RETRY_ENABLED:
+            return cls(1)
+        options = dict(config.STEP_RETRY_DEFAULT)
+        options.update(config.STEP_RETRY_POLICIES.get(step, {}))
+        options.update(config.STEP_RETRY_POLICIES.get(f"{vendor}.{step}", {}))
+        return cls(**options)
+
+    def delay(self, attempt):
+        """第 attempt 次失败后的退避秒数（±20% 抖动，避免多个 worker 同时重试）"""
+        base = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return base * random.uniform(0.8, 1.2)
+
+
+def _before_retry(self, name, policy, attempt):
+    """记录重试并返回退避秒数；时间预算已用完时抛出 DeadlineExceeded"""
+    delay = policy.delay(attempt)
+    deadline = getattr(self, "deadline", None)
+    if deadline is not None:
+        deadline.check(name)
+        delay = min(delay, deadline.remaining())
+    trace = getattr(self, "trace", None)
+    if trace is not None:
+        trace.retry()
+        registry().inc("drf_step_retries_total", vendor=trace.vendor, step=name)
+    print(f"🔁 步骤 {name} 失败，{delay:.0f}秒后重试（{attempt + 1}/{policy.attempts}）")
+    return delay
+
+
+def retry_step(idempotent=True):
+    """按步骤策略在返回 False 时重试（同步与 async 方法均可）"""
+    def decorator(method):
+        name = method.__name__
+
+        def _policy(self):
+            trace = getattr(self, "trace", None)
+            return RetryPolicy.for_step(trace.vendor if trace else None, name, idempotent)
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                policy = _policy(self)
+                for attempt in range(1, policy.attempts + 1):
+                    result = await method(self, *args, **kwargs)
+                    if result is not False or attempt == policy.attempts:
+                        return result
+                    await asyncio.sleep(_before_retry(self, name, policy, attempt))
+            async_wrapper.idempotent = idempotent
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            policy = _policy(self)
+            for attempt in range(1, policy.attempts + 1):
+                result = method(self, *args, **kwargs)
+                if result is not False or attempt == policy.attempts:
+                    return result
+                time.sleep(_before_retry(self, name, policy, attempt))
+        wrapper.idempotent = idempotent
+        return wrapper
+    return decorator
@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+运行追踪
+
+每次运行把各步骤的开始/结束时间、结果、重试次数和步骤内的就绪等待耗时
+以 JSON Lines 格式追加到 LOG_DIR/trace_YYYYMMDD.jsonl，每行一个事件：
+
+    {"event": "run_start", "run_id": ..., "vendor": ..., "topic": ..., "ts": ...}
+    {"event": "step", "run_id": ..., "step": "input_topic", "start": ..., "end": ...,
+     "duration_ms": ..., "outcome": "ok" | "fail" | "error", "retries": 0, "waits": [...]}
+    {"event": "run_end", "run_id": ..., "success": true, "duration_ms": ..., "metadata": {...}}
+
+多个进程可以同时写入同一个文件（每个事件一次 O_APPEND 写入）。
+"""
+
+import argparse
+import functools
+import inspect
+import json
+import os
+import time
+import uuid
+
+import config
+from metrics import JOB_DURATION_BUCKETS, LOGIN_WAIT_BUCKETS, registry
+
+
+class RunTrace:
+    """单次运行的追踪记录"""
+
+    def __init__(self, vendor, topic, run_id=None, log_dir=None, enabled=None):
+        self.vendor = vendor
+        self.topic = topic
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.log_dir = log_dir or config.LOG_DIR
+        self.enabled = config.TRACE_ENABLED if enabled is None else enabled
+        self.started_at = None
+        self.steps = []
+        self._retries = 0
+
+    @property
+    def path(self):
+        return os.path.join(self.log_dir, f"trace_{time.strftime('%Y%m%d')}.jsonl")
+
+    def _write(self, event):
+        if not self.enabled:
+            return
+        event = {"run_id": self.run_id, "vendor": self.vendor, **event}
+        line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"⚠️ 写入运行追踪失败: {str(e)}")
+
+    def start(self):
+        self.started_at = time.time()
+        self._write({"event": "run_start", "topic": self.topic, "ts": self.started_at})
+        registry().inc("drf_jobs_started_total", vendor=self.vendor)
+
+    def retry(self):
+        """当前步骤内的一次重试/轮询"""
+        self._retries += 1
+
+    def qr_refresh(self):
+        """登录二维码失效后的一次刷新"""
+        self.retry()
+        registry().inc("drf_qr_refresh_total", vendor=self.vendor)
+
+    def begin_step(self):
+        self._retries = 0
+        return time.time()
+
+    def end_step(self, name, start, outcome, waits=None, error=None):
+        end = time.time()
+        event = {
+            "event": "step",
+            "step": name,
+            "start": start,
+            "end": end,
+            "duration_ms": round((end - start) * 1000),
+            "outcome": outcome,
+            "retries": self._retries,
+            "waits": waits or [],
+        }
+        if error:
+            event["error"] = error
+        self.steps.append(event)
+        self._write(event)
+        if name == "check_and_handle_login":
+            registry().observe("drf_login_wait_seconds", end - start, LOGIN_WAIT_BUCKETS, vendor=self.vendor)
+
+    def finish(self, success, result_path=None, metadata=None):
+        end = time.time()
+        self._write({
+            "event": "run_end",
+            "success": bool(success),
+            "result_path": result_path,
+            "ts": end,
+            "duration_ms": round((end - (self.started_at or end)) * 1000),
+            "metadata": metadata or {},
+        })
+
+        metrics = registry()
+        status = "completed" if success else "failed"
+        metrics.inc(f"drf_jobs_{status}_total", vendor=self.vendor)
+        metrics.observe("drf_job_duration_seconds", end - (self.started_at or end), JOB_DURATION_BUCKETS, vendor=self.vendor)
+        # 直接返回结果库中已有结果时没有新下载
+        if result_path and os.path.exists(result_path) and "result_cache" not in (metadata or {}):
+            metrics.inc("drf_download_bytes_total", os.path.getsize(result_path), vendor=self.vendor)
+
+
+def _outcome(result):
+    # 步骤方法返回 False 表示失败，返回 None（无返回值的步骤）视为成功
+    return "fail" if result is False else "ok"
+
+
+def traced_step(method):
+    """记录步骤方法的耗时、结果、重试次数和期间的就绪等待（同步与 async 方法均可）"""
+    name = method.__name__
+
+    def _waits(self, mark):
+        readiness = getattr(self, "readiness", None)
+        return [r.to_dict() for r in readiness.records[mark:]] if readiness else []
+
+    def _mark(self):
+        readiness = getattr(self, "readiness", None)
+        return len(readiness.records) if readiness else 0
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            trace = getattr(self, "trace", None)
+            if trace is None:
+                return await method(self, *args, **kwargs)
+            mark, start = _mark(self), trace.begin_step()
+            try:
+                result = await method(self, *args, **kwargs)
+            except BaseException as e:
+                trace.end_step(name, start, "error", _waits(self, mark), error=str(e))
+                raise
+            trace.end_step(name, start, _outcome(result), _waits(self, mark))
+            return result
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        trace = getattr(self, "trace", None)
+        if trace is None:
+            return method(self, *args, **kwargs)
+        mark, start = _mark(self), trace.begin_step()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException as e:
+            trace.end_step(name, start, "error", _waits(self, mark), error=str(e))
+            raise
+        trace.end_step(name, start, _outcome(result), _waits(self, mark))
+        return result
+    return wrapper
+
+
+def summarize(path):
+    """按厂商和步骤汇总追踪文件中的耗时"""
+    durations = {}
+    runs = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if event.get("event") == "step":
+                durations.setdefault((event["vendor"], event["step"]), []).append(event["duration_ms"])
+            elif event.get("event") == "run_end":
+                runs.setdefault(event["vendor"], []).append(event)
+
+    for vendor, ends in sorted(runs.items()):
+        ok = sum(1 for e in ends if e["success"])
+        avg = sum(e["duration_ms"] for e in ends) / len(ends) / 1000
+        print(f"\n📊 {vendor}: {len(ends)} 次运行，成功 {ok} 次，平均耗时 {avg:.1f}秒")
+        routed = [e["metadata"]["routing"] for e in ends if e.get("metadata", {}).get("routing")]
+        if routed:
+            blocked = sum(r["blocked"] for r in routed) / len(routed)
+            mb_in = sum(r["bytes_in"] for r in routed) / len(routed) / (1024 * 1024)
+            print(f"  请求路由: 平均每次拦截 {blocked:.0f} 个请求，接收 {mb_in:.1f}MB")
+            cached = [r["cache"] for r in routed if r.get("cache")]
+            if cached:
+                hits = sum(c["hits"] + c["revalidated"] for c in cached)
+                total = hits + sum(c["misses"] for c in cached)
+                mb_saved = sum(c["bytes_saved"] for c in cached) / len(cached) / (1024 * 1024)
+                print(f"  静态资源缓存: 命中率 {hits / max(total, 1):.0%}，平均每次节省 {mb_saved:.1f}MB")
+        for (step_vendor, step), values in durations.items():
+            if step_vendor != vendor:
+                continue
+            values = sorted(values)
+            median = values[len(values) // 2] / 1000
+            print(f"  {step:<32} 次数 {len(values):<4} 中位数 {median:8.2f}秒  最大 {values[-1] / 1000:8.2f}秒")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="汇总运行追踪")
+    parser.add_argument("path", nargs="?", default=None, help="追踪文件，默认今天的 trace_YYYYMMDD.jsonl")
+    args = parser.parse_args()
+    summarize(args.path or RunTrace("", "").path)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+选择器注册表
+
+各厂商页面元素的候选选择器集中声明在 SELECTORS 中，按顺序作为回退。解析时把全部候选一次性
+交给页面内脚本判断，返回第一个可见的候选，只需一次往返；上次命中的候选会排到最前面优先尝试
+（keep_order 的条目除外，例如候选之间有语义优先级的登录状态判断）。
+
+候选写法与 Playwright 选择器一致：CSS、"text=文本"（不区分大小写的子串匹配）、"xpath=..."。
+命中统计和上次命中的候选保存在 SELECTOR_STATS_PATH，多个进程合并写入：
+
+    python selector_registry.py report    # 查看各候选的实际命中情况
+"""
+
+import argparse
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+import config
+
+SELECTORS = {
+    "doubao": {
+        # 登录提示优先于头像判断，不按命中记录调整顺序
+        "login_state": {
+            "candidates": ["text=登录", "text=请登录", "text=登录后使用", ".avatar", ".user"],
+            "keep_order": True,
+        },
+        "qr_code": {"candidates": ["#semi-modal-body > div > div"]},
+        "chat_input": {
+            "candidates": ["textarea[placeholder*='发消息']", "textarea.text-area", "div[contenteditable='true']"],
+        },
+        "send_button": {"candidates": ['[data-testid="chat_input_send_button"]']},
+        "start_research": {
+            "candidates": ['div[data-testid="suggest_message_item"]', "text=直接开始研究"],
+        },
+        "result_card": {"candidates": ["[data-testid='doc_card']", ".flow-product-card"]},
+    },
+    "qwen": {
+        "login_modal": {"candidates": ['[class^="StyledRight-tongyi-login-"]']},
+        "chat_input": {"candidates": [".ant-input"]},
+        "download_button": {"candidates": ['span[data-icon-type="qwpcicon-down"]']},
+    },
+}
+
+# 返回第一个可见候选的序号 + 1，都不可见时返回 0（wait_for_function 以真值结束等待）
+RESOLVE_SCRIPT = """
+(selectors) => {
+    if (!document.body) return 0;
+    const visible = (el) => {
+        if (!el || !el.isConnected) return false;
+        if (getComputedStyle(el).visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const byText = (text) => {
+        const needle = text.toLowerCase().replace(/\\s+/g, ' ');
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (node.nodeValue.toLowerCase().replace(/\\s+/g, ' ').includes(needle) && visible(node.parentElement)) {
+                return true;
+            }
+        }
+        return false;
+    };
+    const byXPath = (xpath) => {
+        const result = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (let i = 0; i < result.snapshotLength; i++) {
+            if (visible(result.snapshotItem(i))) return true;
+        }
+        return false;
+    };
+    const byCss = (css) => Array.from(document.querySelectorAll(css)).some(visible);
+    for (let i = 0; i < selectors.length; i++) {
+        const selector = selectors[i];
+        try {
+            if (selector.startsWith('text=') ? byText(selector.slice(5))
+                : selector.startsWith('xpath=') ? byXPath(selector.slice(6))
+                : byCss(selector)) {
+                return i + 1;
+            }
+        } catch (e) {
+            // 无效选择器按未命中处理
+        }
+    }
+    return 0;
+}
+"""
+
+# 页面元素变化不一定触发 DOM 变更（例如纯样式切换），等待时按固定间隔轮询
+WAIT_POLLING_MS = 100
+
+
+@contextmanager
+def _locked(path):
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def load_stats(path=None):
+    path = path or config.SELECTOR_STATS_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class SelectorRegistry:
+    """厂商页面元素的选择器解析（asyncio API）"""
+
+    def __init__(self, vendor, stats_path=None):
+        self.vendor = vendor
+        self.entries = SELECTORS[vendor]
+        self.stats_path = stats_path or config.SELECTOR_STATS_PATH
+        stored = load_stats(self.stats_path).get(vendor, {})
+        self.winners = {key: item.get("winner") for key, item in stored.items()}
+        # 本进程尚未写入文件的命中计数 {key: {"used": {selector: n}, "missed": n}}
+        self.pending = {}
+
+    def candidates(self, key):
+        """按本次尝试顺序排列的候选（上次命中的候选在前）"""
+        entry = self.entries[key]
+        candidates = list(entry["candidates"])
+        winner = self.winners.get(key)
+        if not entry.get("keep_order") and winner in candidates:
+            candidates.remove(winner)
+            candidates.insert(0, winner)
+        return candidates
+
+    def _finish(self, page, key, candidates, index):
+        item = self.pending.setdefault(key, {"used": {}, "missed": 0})
+        if index < 0:
+            item["missed"] += 1
+            return None, None
+        selector = candidates[index]
+        item["used"][selector] = item["used"].get(selector, 0) + 1
+        self.winners[key] = selector
+        return page.locator(f"{selector} >> visible=true").first, selector
+
+    async def resolve(self, page, key):
+        """一次页面查询找出第一个可见的候选，返回 (locator, 选择器)，都不可见时返回 (None, None)"""
+        candidates = self.candidates(key)
+        try:
+            index = await page.evaluate(RESOLVE_SCRIPT, candidates) - 1
+        except Exception:
+            index = -1
+        return self._finish(page, key, candidates, index)
+
+    async def wait(self, page, key, timeout_ms, waiter=None, name=None):
+        """等待任一候选可见；传入 ReadinessWaiter 时记录等待耗时。超时返回 (None, None)"""
+        candidates = self.candidates(key)
+        found = {"index": -1}
+
+        async def _wait(timeout):
+            handle = await page.wait_for_function(RESOLVE_SCRIPT, arg=candidates, polling=WAIT_POLLING_MS, timeout=timeout)
+            found["index"] = await handle.json_value() - 1
+
+        if waiter is not None:
+            await waiter.until(name or key, _wait, timeout_ms)
+        else:
+            try:
+                await _wait(timeout_ms)
+            except PlaywrightTimeoutError:
+                pass
+        return self._finish(page, key, candidates, found["index"])
+
+    def flush(self):
+        """把本进程的命中计数和最新命中的候选合并写入统计文件"""
+        if not self.pending:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+            with _locked(self.stats_path):
+                stats = load_stats(self.stats_path)
+                vendor_stats = stats.setdefault(self.vendor, {})
+                for key, item in self.pending.items():
+                    stored = vendor_stats.setdefault(key, {"winner": None, "used": {}, "missed": 0})
+                    for selector, count in item["used"].items():
+                        stored["used"][selector] = stored["used"].get(selector, 0) + count
+                    stored["missed"] += item["missed"]
+                    if self.winners.get(key):
+                        stored["winner"] = self.winners[key]
+                tmp_path = f"{self.stats_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(stats, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.stats_path)
+            self.pending = {}
+        except OSError as e:
+            print(f"⚠️ 写入选择器统计失败: {str(e)}")
+
+
+def report(path=None):
+    """打印各厂商、各元素的候选命中情况"""
+    stats = load_stats(path)
+    for vendor, entries in SELECTORS.items():
+        vendor_stats = stats.get(vendor, {})
+        print(f"\n📊 {vendor}")
+        for key, entry in entries.items():
+            item = vendor_stats.get(key, {"used": {}, "missed": 0, "winner": None})
+            total = sum(item["used"].values()) + item["missed"]
+            print(f"  {key}: 解析 {total} 次，未找到 {item['missed']} 次")
+            for selector in entry["candidates"]:
+                count = item["used"].get(selector, 0)
+                mark = "⭐" if selector == item.get("winner") else ("·" if count else "✗")
+                print(f"    {mark} {count:>6}  {selector}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="选择器注册表")
+    parser.add_argument("command", choices=["report"])
+    args = parser.parse_args()
+    report()
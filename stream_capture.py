@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+网络层研究结果捕获
+
+StreamRecorder 在页面内包装 fetch，把对话接口响应体按到达顺序逐块回传给 Python，
+用于在研究进行期间增量落盘。
+
+ResponseCapture 在研究进行期间收集厂商对话接口的响应（SSE / JSON）：流式响应复用 StreamRecorder
+逐块重建，其余响应在请求结束时立即读取。研究完成后直接用重建出的报告落盘，无需刷新页面、
+点击下载菜单或读取剪贴板。
+"""
+
+import itertools
+import json
+import os
+import re
+
+import config
+
+# 可能携带正文的字段名
+TEXT_KEYS = ("text", "content", "markdown")
+
+
+def parse_sse(body):
+    """解析 SSE 响应体，返回每个事件的 data 字符串列表"""
+    events = []
+    data_lines = []
+    for line in body.splitlines():
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip())
+        elif not line.strip() and data_lines:
+            events.append("\n".join(data_lines))
+            data_lines = []
+    if data_lines:
+        events.append("\n".join(data_lines))
+    return events
+
+
+def _load_json(value):
+    """尝试把字符串解析为 JSON 对象，失败返回 None"""
+    value = value.strip()
+    if not value or value[0] not in "{[":
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def extract_text(obj):
+    """从单个事件对象中提取正文（取正文字段中最长的字符串，支持嵌套的 JSON 字符串）"""
+    best = ""
+
+    def visit(node):
+        nonlocal best
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, str):
+                    nested = _load_json(value)
+                    if nested is not None:
+                        visit(nested)
+                    elif key in TEXT_KEYS and len(value) > len(best):
+                        best = value
+                else:
+                    visit(value)
+        elif isinstance(node, list):
+            for item in node:
+                visit(item)
+
+    visit(obj)
+    return best
+
+
+class StreamAssembler:
+    """增量解析流式响应体并重建正文
+
+    兼容两种流式风格：每个事件携带全文（后一个以前一个为前缀）或只携带增量。
+    """
+
+    def __init__(self):
+        self.report = ""
+        self.buffer = ""
+        self.data_lines = []
+
+    def add_event(self, event):
+        """处理单个事件的 data 内容"""
+        obj = _load_json(event)
+        if obj is None:
+            return
+        text = extract_text(obj)
+        if not text:
+            return
+        if text.startswith(self.report):
+            self.report = text
+        else:
+            self.report += text
+
+    def feed(self, chunk):
+        """输入一段原始响应体，返回当前重建出的正文"""
+        self.buffer += chunk
+        lines = self.buffer.split("\n")
+        self.buffer = lines.pop()
+        for line in lines:
+            line = line.rstrip("\r")
+            if line.startswith("data:"):
+                self.data_lines.append(line[5:].lstrip())
+            elif not line.strip() and self.data_lines:
+                self.add_event("\n".join(self.data_lines))
+                self.data_lines = []
+        return self.report
+
+    def close(self):
+        """响应结束，处理剩余的未完结事件"""
+        if self.buffer.startswith("data:"):
+            self.data_lines.append(self.buffer[5:].lstrip())
+        self.buffer = ""
+        if self.data_lines:
+            self.add_event("\n".join(self.data_lines))
+            self.data_lines = []
+        return self.report
+
+
+def rebuild_report(body):
+    """从完整的流式响应体重建正文，非 SSE 响应按单个 JSON 处理"""
+    assembler = StreamAssembler()
+    if parse_sse(body):
+        assembler.feed(body)
+        return assembler.close()
+    assembler.add_event(body)
+    return assembler.report
+
+
+class ResponseCapture:
+    """在研究进行期间收集指定厂商对话接口的响应正文
+
+    fetch 发起的流式响应由 StreamRecorder 在页面内逐块回传并即时重建（Chromium 通常无法在事后
+    返回 SSE / 流式响应体）；其他方式发起的响应（XHR 等）在请求结束时立即读取响应体，
+    不等到保存结果时才读取，避免响应体已被浏览器回收。
+    """
+
+    def __init__(self, page, vendor, recorder):
+        self.page = page
+        self.vendor = vendor
+        self.recorder = recorder
+        self.patterns = [re.compile(p) for p in config.CAPTURE_URL_PATTERNS[vendor]]
+        # 请求结束时读到的响应正文
+        self.texts = []
+        self.pending = set()
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_request_finished)
+        self.page.on("requestfailed", self._on_request_failed)
+
+    def matches(self, url):
+        return any(p.search(url) for p in self.patterns)
+
+    def _on_request(self, request):
+        if self.matches(request.url):
+            self.pending.add(request)
+
+    async def _on_request_finished(self, request):
+        if not self.matches(request.url):
+            return
+        try:
+            response = await request.response()
+            if response is not None:
+                self._add_body(await response.text())
+        except Exception:
+            # 流式响应体通常无法读取，由 recorder 负责
+            pass
+        finally:
+            self.pending.discard(request)
+
+    def _on_request_failed(self, request):
+        self.pending.discard(request)
+
+    def _add_body(self, body):
+        text = rebuild_report(body)
+        if text:
+            self.texts.append(text)
+
+    def detach(self):
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_request_finished)
+        self.page.remove_listener("requestfailed", self._on_request_failed)
+
+    async def wait_idle(self, timeout_ms=10000):
+        """等待仍在传输的对话响应结束（页面完成信号可能略早于响应流结束）"""
+        waited = 0
+        while (self.pending or self.recorder.open_streams) and waited < timeout_ms:
+            await self.page.wait_for_timeout(200)
+            waited += 200
+        return not (self.pending or self.recorder.open_streams)
+
+    def report(self):
+        """返回已收集的响应中重建出的最长报告文本"""
+        return max(self.texts + self.recorder.reports(), key=len, default="")
+
+    async def save(self, path):
+        """把重建的报告写入文件，成功返回写入的字符数"""
+        await self.wait_idle()
+        text = self.report()
+        if not text:
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return len(text)
+
+
+# 页面内 fetch 包装脚本：对匹配的响应体做 tee，一路交还页面，一路逐块回传 Python
+TEE_SCRIPT = """
+([patterns, sinkName]) => {
+    // 同一页面可能被多个任务复用，回传目标始终指向最新的记录器
+    window.__drfStreamSink = (streamId, chunk) => window[sinkName](streamId, chunk);
+    if (window.__drfStreamTee) return;
+    window.__drfStreamTee = true;
+    const regexps = patterns.map((p) => new RegExp(p));
+    const originalFetch = window.fetch;
+    let nextId = 0;
+    window.fetch = async (...args) => {
+        const response = await originalFetch(...args);
+        const url = response.url || String(args[0] && args[0].url || args[0]);
+        if (!response.body || !regexps.some((r) => r.test(url))) return response;
+        const streamId = `${Date.now()}-${nextId++}`;
+        const [pageStream, tapStream] = response.body.tee();
+        (async () => {
+            const reader = tapStream.getReader();
+            const decoder = new TextDecoder();
+            try {
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+                    await window.__drfStreamSink(streamId, decoder.decode(value, { stream: true }));
+                }
+            } finally {
+                await window.__drfStreamSink(streamId, null);
+            }
+        })();
+        return new Response(pageStream, {
+            status: response.status,
+            statusText: response.statusText,
+            headers: response.headers,
+        });
+    };
+}
+"""
+
+
+class StreamRecorder:
+    """逐块接收对话接口响应并交给回调（回调参数为报告流的当前正文），创建后 await install() 安装到页面"""
+
+    _ids = itertools.count()
+
+    def __init__(self, page, vendor, on_text):
+        self.page = page
+        self.vendor = vendor
+        self.on_text = on_text
+        self.assemblers = {}
+        self.open_streams = set()
+        # 当前正文最长的流视为报告流
+        self.report_stream = None
+        patterns = list(config.CAPTURE_URL_PATTERNS[vendor])
+        # 页面绑定无法注销，每个记录器使用独立的绑定名
+        self.sink_name = f"__drfStreamChunk{next(self._ids)}"
+        self.script = f"({TEE_SCRIPT})({json.dumps([patterns, self.sink_name])})"
+
+    async def install(self):
+        await self.page.expose_function(self.sink_name, self._on_chunk)
+        # 之后的导航/刷新由 init script 安装，当前已加载的页面直接安装
+        await self.page.add_init_script(self.script)
+        try:
+            await self.page.evaluate(self.script)
+        except Exception as e:
+            print(f"⚠️ 安装流式捕获脚本失败: {str(e)}")
+        return self
+
+    def detach(self):
+        """停止向回调转发正文"""
+        self.on_text = lambda text: None
+
+    def reports(self):
+        """各条流当前重建出的正文"""
+        return [assembler.report for assembler in self.assemblers.values() if assembler.report]
+
+    def report(self):
+        """报告流当前重建出的正文"""
+        assembler = self.assemblers.get(self.report_stream)
+        return assembler.report if assembler else ""
+
+    def _on_chunk(self, stream_id, chunk):
+        assembler = self.assemblers.setdefault(stream_id, StreamAssembler())
+        if chunk is None:
+            self.open_streams.discard(stream_id)
+            text = assembler.close()
+        else:
+            self.open_streams.add(stream_id)
+            text = assembler.feed(chunk)
+        if not text:
+            return
+        # 只跟随报告流：研究计划等较短的流不会覆盖（截断）已写入的报告，报告流超过后再切换过去
+        if stream_id != self.report_stream and len(text) <= len(self.report()):
+            return
+        self.report_stream = stream_id
+        self.on_text(text)
+
+    async def wait_idle(self, timeout_ms=10000):
+        """等待页面回传完所有未结束的流（页面完成信号可能略早于最后一块回传）"""
+        waited = 0
+        while self.open_streams and waited < timeout_ms:
+            await self.page.wait_for_timeout(200)
+            waited += 200
+        return not self.open_streams
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多标签页会话复用
+
+研究任务的大部分时间都在等待厂商生成报告，每个任务独占一个浏览器上下文时内存主要花在闲置的
+浏览器进程上。多标签页模式下一个已登录的持久化上下文同时运行最多 TABS_PER_CONTEXT 个研究对话，
+每个对话一个标签页，由厂商插件的 ResearchPipeline.run_async() 运行，检查点、结果库、
+网络捕获、实时写入和启动配置与单任务模式一致；标签页共享浏览器进程、渲染进程、Cookie 和请求路由。
+
+- 登录只在单独的标签页中检查一次，之后的标签页直接复用登录状态；dense 配置下需要扫码时临时换成
+  可见浏览器登录
+- 后台标签页关闭定时器节流（BACKGROUND_TAB_ARGS），轮询和流式接收不受影响
+- 剪贴板在浏览器内共享，读取剪贴板的结果提取按标签页依次进行
+- 队列任务以 job-<任务ID> 为运行 ID，重新排队的任务从检查点回到原对话继续，不重复提交主题
+
+任务队列中设置 TABS_PER_CONTEXT 大于 1 时 worker 自动使用该模式，也可以直接运行一批主题：
+
+    python tab_multiplexer.py --vendor doubao --tabs 4 "主题一" "主题二" "主题三"
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+
+from playwright.async_api import async_playwright
+
+import config
+from browser_launch import BACKGROUND_TAB_ARGS, clean_profile_locks, launch_persistent
+from circuit_breaker import STATE_HALF_OPEN
+from deadline import Deadline
+from metrics import registry
+from profile_manager import ProfileManager, vendor_profile_dir
+from result_store import cached_result
+from vendors import VENDOR_NAMES, load_vendor_class
+
+
+class TabMultiplexer:
+    """一个持久化浏览器上下文中以多个标签页并发运行研究对话（asyncio API）"""
+
+    def __init__(self, vendor, profile_dir=None, tabs=None, headless=False, base_url=None,
+                 workspace_dir=None, download_dir=None, launch_profile=None):
+        self.vendor = vendor
+        self.profile_dir = profile_dir or vendor_profile_dir(vendor)
+        self.tabs = tabs or config.TABS_PER_CONTEXT
+        self.headless = headless
+        self.base_url = base_url
+        self.workspace_dir = workspace_dir
+        self.download_dir = download_dir or config.SYSTEM_DOWNLOADS_DIR
+        self.launch_profile = launch_profile or config.LAUNCH_PROFILE
+        self.session_class = load_vendor_class(vendor)
+        self.playwright = None
+        self.context = None
+        # 锁和信号量在 start() 中创建，绑定到运行中的事件循环
+        self.slots = None
+        self.login_lock = None
+        self.clipboard_lock = None
+        self.logged_in = False
+        # 登录检查中完成了扫码登录（供用户数据目录管理提升为黄金目录）
+        self.login_performed = False
+
+    async def start(self):
+        print(f"🗂️ 正在启动多标签页浏览器上下文 ({self.vendor}，最多 {self.tabs} 个标签页)...")
+        clean_profile_locks(self.profile_dir, verbose=True)
+        self.playwright = await async_playwright().start()
+        await self._launch(self.launch_profile, self.headless)
+        self.slots = asyncio.Semaphore(self.tabs)
+        self.login_lock = asyncio.Lock()
+        self.clipboard_lock = asyncio.Lock()
+        print("✅ 浏览器启动成功")
+        return self
+
+    async def _launch(self, profile, headless):
+        self.context = await launch_persistent(self.playwright, self.profile_dir, headless, self.download_dir,
+                                               profile=profile, extra_args=BACKGROUND_TAB_ARGS)
+        registry().gauge_add("drf_active_contexts", 1, vendor=self.vendor)
+
+    async def _close_context(self):
+        if self.context is not None:
+            try:
+                await self.context.close()
+            finally:
+                self.context = None
+                registry().gauge_add("drf_active_contexts", -1, vendor=self.vendor)
+
+    def _session(self, topic=None, **kwargs):
+        options = {
+            "headless": self.headless,
+            "workspace_dir": self.workspace_dir,
+            "topic": topic,
+            "base_url": self.base_url,
+            "profile_dir": self.profile_dir,
+            "download_dir": self.download_dir,
+            "launch_profile": self.launch_profile,
+        }
+        options.update(kwargs)
+        session = self.session_class(context=self.context, **options)
+        session.clipboard_lock = self.clipboard_lock
+        return session
+
+    async def _check_login(self, scan=True, launch_profile=None):
+        session = self._session(launch_profile=launch_profile or self.launch_profile)
+        # 登录检查不是一次研究运行，不写入运行追踪
+        session.trace.enabled = False
+        result = await session.login_only_async(scan=scan)
+        self.login_performed = self.login_performed or session.login_performed
+        return result
+
+    async def _login_with_visible_browser(self):
+        """dense 配置下需要扫码时临时换成可见浏览器登录，完成后切回 dense（此时还没有研究标签页）"""
+        print("🖥️ 切换到可见浏览器完成扫码登录...")
+        result = None
+        try:
+            await self._close_context()
+            await self._launch("default", False)
+            result = await self._check_login(launch_profile="default")
+        except Exception as e:
+            print(f"⚠️ 可见浏览器启动失败，继续在无头模式下截图二维码: {str(e)}")
+        finally:
+            await self._close_context()
+            await self._launch(self.launch_profile, self.headless)
+        if result is None:
+            result = await self._check_login()
+        return result
+
+    async def ensure_login(self):
+        """在单独的标签页中检查一次登录（需要时等待扫码），所有标签页共享登录状态"""
+        async with self.login_lock:
+            if self.logged_in:
+                return True
+            logged_in = await self._check_login(scan=self.launch_profile != "dense")
+            if logged_in is None:
+                logged_in = await self._login_with_visible_browser()
+            self.logged_in = bool(logged_in)
+            if not self.logged_in:
+                print(f"❌ {VENDOR_NAMES[self.vendor]} 登录检查未通过，暂不打开研究标签页")
+            return self.logged_in
+
+    async def run_topic(self, topic, **kwargs):
+        """占用一个标签页运行一个主题，返回 (是否成功, 会话)；标签页全部占用时排队等待"""
+        async with self.slots:
+            if not await self.ensure_login():
+                return False, None
+            session = self._session(topic, **kwargs)
+            success = await session.run_async()
+            return success, session
+
+    async def run_all(self, topics):
+        """并发运行一批主题，返回各主题的结果文件路径（失败为 None）"""
+        results = await asyncio.gather(*(self.run_topic(topic) for topic in topics), return_exceptions=True)
+        paths = []
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"❌ 标签页会话异常: {str(result)}")
+                paths.append(None)
+                continue
+            success, session = result
+            paths.append(session.result_path if success and session else None)
+        return paths
+
+    async def close(self):
+        try:
+            await self._close_context()
+            if self.playwright:
+                await self.playwright.stop()
+        except Exception as e:
+            print(f"⚠️ 关闭浏览器失败: {str(e)}")
+        finally:
+            self.context = None
+            self.playwright = None
+
+
+# 任务队列和熔断器各只有一个 SQLite 连接，在线程中执行时逐个使用
+_db_lock = threading.Lock()
+
+
+async def _in_thread(func, *args):
+    """在线程中执行阻塞的数据库操作，等待数据库锁时不阻塞其他标签页"""
+    def call():
+        with _db_lock:
+            return func(*args)
+    return await asyncio.to_thread(call)
+
+
+async def _run_tab_job(mux, queue, db_path, job, worker, breaker):
+    """在一个标签页中执行队列任务并更新任务状态"""
+    # 与单任务模式共用心跳实现，避免循环导入在此延迟导入
+    from job_queue import start_heartbeat
+
+    deadline = Deadline.from_config()
+    heartbeat, stop_event = start_heartbeat(db_path, job, deadline)
+    result_path = None
+    force = bool(job.get("force"))
+    try:
+        if mux.base_url is None and not force:
+            # 有效期内已有相同主题的结果时不再占用标签页
+            result_path = await asyncio.to_thread(cached_result, job["vendor"], job["topic"])
+            if result_path:
+                print(f"♻️ 任务 #{job['id']} 直接使用已有结果: {result_path}")
+        if result_path is None:
+            # 重新排队的任务从上次的检查点继续，不重复提交主题
+            success, session = await mux.run_topic(job["topic"], run_id=f"job-{job['id']}", resume=True,
+                                                   force=force, deadline=deadline)
+            if success and session.result_path:
+                result_path = session.result_path
+        if result_path:
+            owned = await _in_thread(queue.complete, job["id"], job["lease"], result_path)
+            print(f"✅ [{worker}] 任务 #{job['id']} 完成: {result_path}")
+        else:
+            owned = await _in_thread(queue.fail, job["id"], job["lease"], "未获取到研究结果")
+            print(f"❌ [{worker}] 任务 #{job['id']} 失败")
+    except Exception as e:
+        owned = await _in_thread(queue.fail, job["id"], job["lease"], str(e))
+        print(f"❌ [{worker}] 任务 #{job['id']} 异常: {str(e)}")
+    finally:
+        stop_event.set()
+        await asyncio.to_thread(heartbeat.join)
+    if not owned:
+        # 任务已由其他 worker 接手，本次结果不计入任务状态和熔断
+        print(f"⚠️ [{worker}] 任务 #{job['id']} 的租约已被收回，未更新任务状态")
+        return
+    if breaker:
+        if result_path:
+            await _in_thread(breaker.record_success, job["vendor"])
+        else:
+            await _in_thread(breaker.record_failure, job["vendor"])
+
+
+async def _tab_worker_loop(vendor, worker, queue, db_path, profile_dir, headless, base_url, breaker):
+    mux = await TabMultiplexer(vendor, profile_dir, headless=headless, base_url=base_url).start()
+    running = set()
+    try:
+        # 启动时先完成登录检查，会话中扫码登录过时同步回黄金目录（先关闭浏览器，不复制正在写入的目录）
+        if await mux.ensure_login() and mux.login_performed and profile_dir != config.VENDOR_PROFILE_DIRS[vendor]:
+            await mux.close()
+            try:
+                ProfileManager().promote(vendor, profile_dir)
+            except Exception as e:
+                print(f"⚠️ 提升黄金用户数据目录失败: {str(e)}")
+            mux = await TabMultiplexer(vendor, profile_dir, headless=headless, base_url=base_url).start()
+            mux.logged_in = True
+        while True:
+            # 有空闲标签页时继续领取任务；熔断探测期间只运行一个探测任务
+            while len(running) < mux.tabs:
+                allowed = await _in_thread(breaker.allow, vendor) if breaker else True
+                if not allowed:
+                    break
+                job = await _in_thread(queue.claim, vendor, worker)
+                if job is None:
+                    if allowed == STATE_HALF_OPEN:
+                        await _in_thread(breaker.release_probe, vendor)
+                    break
+                print(f"\n📥 [{worker}] 领取任务 #{job['id']}: {job['topic']} "
+                      f"(标签页 {len(running) + 1}/{mux.tabs})")
+                running.add(asyncio.create_task(_run_tab_job(mux, queue, db_path, job, worker, breaker)))
+                if allowed == STATE_HALF_OPEN:
+                    break
+            if running:
+                _, running = await asyncio.wait(running, timeout=config.JOB_POLL_INTERVAL,
+                                                return_when=asyncio.FIRST_COMPLETED)
+            else:
+                await asyncio.sleep(config.JOB_POLL_INTERVAL)
+    finally:
+        await mux.close()
+
+
+def run_tab_worker(vendor, worker, queue, db_path, profile_dir, headless=False, base_url=None, breaker=None):
+    """worker 的多标签页模式：一个浏览器上下文同时领取并运行最多 TABS_PER_CONTEXT 个任务"""
+    asyncio.run(_tab_worker_loop(vendor, worker, queue, db_path, profile_dir, headless, base_url, breaker))
+
+
+async def _main(args):
+    mux = await TabMultiplexer(args.vendor, tabs=args.tabs, headless=args.headless).start()
+    try:
+        return await mux.run_all(args.topics)
+    finally:
+        await mux.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="多标签页会话复用")
+    parser.add_argument("topics", nargs="+", help="研究主题")
+    parser.add_argument("--vendor", required=True, choices=list(VENDOR_NAMES))
+    parser.add_argument("--tabs", type=int, default=None, help="同时打开的标签页数（默认 TABS_PER_CONTEXT）")
+    parser.add_argument("--headless", action="store_true",
+                        default=os.environ.get("HEADLESS", "false").lower() == "true")
+    args = parser.parse_args()
+
+    paths = asyncio.run(_main(args))
+    print("\n" + "=" * 60)
+    for topic, path in zip(args.topics, paths):
+        print(f"{'✅' if path else '❌'} {topic}: {path or '失败'}")
+    if not all(paths):
+        raise SystemExit(1)
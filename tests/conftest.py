@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workspace(tmp_path, monkeypatch):
+    """每个测试使用独立的工作区，不读写仓库中的 workspace/"""
+    monkeypatch.setattr(config, "WORKSPACE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(config, "RESULT_STORE_DB", str(tmp_path / "results.db"))
+    monkeypatch.setattr(config, "METRICS_DIR", str(tmp_path / "metrics"))
+    monkeypatch.setattr(config, "LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setattr(config, "TRACE_ENABLED", False)
+    return tmp_path
+
+
+@pytest.fixture
+def browser_page():
+    """无头 Chromium 中的空白页面（asyncio API，在 run_sync 的事件循环中使用），未安装浏览器时跳过"""
+    from playwright.async_api import Error, async_playwright
+
+    from browser_launch import run_sync
+
+    playwright = run_sync(async_playwright().start())
+    try:
+        try:
+            browser = run_sync(playwright.chromium.launch())
+        except Error as e:
+            pytest.skip(f"Chromium 不可用: {e}")
+        try:
+            yield run_sync(browser.new_page())
+        finally:
+            run_sync(browser.close())
+    finally:
+        run_sync(playwright.stop())
@@ -0,0 +1,149 @@
+import asyncio
+import os
+
+import pytest
+
+import asset_cache as asset_cache_module
+from asset_cache import AssetCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRequest:
+    def __init__(self, url):
+        self.url = url
+        self.headers = {"accept": "*/*"}
+
+
+class FakeResponse:
+    def __init__(self, status, headers, body=b""):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def body(self):
+        return self._body
+
+
+class FakeRoute:
+    """记录 fetch 请求头和 fulfill 参数的路由"""
+
+    def __init__(self, url, response=None):
+        self.request = FakeRequest(url)
+        self.response = response
+        self.fetched_headers = None
+        self.fulfilled = None
+
+    async def fetch(self, headers=None):
+        self.fetched_headers = headers
+        return self.response
+
+    async def fulfill(self, **kwargs):
+        self.fulfilled = kwargs
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(asset_cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = AssetCache(str(tmp_path / "assets"), max_bytes=1000)
+    yield cache
+    cache.close()
+
+
+URL = "https://cdn.example.com/app.js"
+
+
+def test_store_and_lookup(cache):
+    cache.store(URL, 200, {"Cache-Control": "max-age=60", "Content-Encoding": "br", "ETag": '"v1"'}, b"console.log(1)")
+    row, body = cache.lookup(URL)
+    assert body == b"console.log(1)"
+    assert row["etag"] == '"v1"'
+    assert "content-encoding" not in row["headers"]
+
+
+def test_uncacheable_responses_are_skipped(cache):
+    cache.store(URL, 200, {"cache-control": "no-store", "etag": '"v1"'}, b"a")
+    cache.store(URL, 200, {}, b"a")
+    cache.store(URL, 404, {"cache-control": "max-age=60"}, b"a")
+    assert cache.lookup(URL) == (None, None)
+
+
+def test_hit_within_max_age_skips_network(cache, clock):
+    cache.store(URL, 200, {"cache-control": "max-age=60"}, b"cached")
+    clock.now += 59
+    route = FakeRoute(URL)
+    assert asyncio.run(cache.serve(route)) == ("hits", len(b"cached"))
+
+    assert route.fetched_headers is None
+    assert route.fulfilled["body"] == b"cached"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["bytes_saved"] == len(b"cached")
+
+
+def test_expired_entry_is_revalidated_with_etag(cache, clock):
+    cache.store(URL, 200, {"cache-control": "max-age=60", "etag": '"v1"'}, b"cached")
+    clock.now += 61
+    route = FakeRoute(URL, FakeResponse(304, {"cache-control": "max-age=120"}))
+    asyncio.run(cache.serve(route))
+
+    assert route.fetched_headers["if-none-match"] == '"v1"'
+    assert route.fulfilled["body"] == b"cached"
+    assert cache.stats()["revalidated"] == 1
+    # 重新验证后按新的 max-age 计算有效期
+    row, _ = cache.lookup(URL)
+    assert row["expires_at"] == clock.now + 120
+
+
+def test_miss_fetches_and_stores(cache):
+    route = FakeRoute(URL, FakeResponse(200, {"cache-control": "max-age=60"}, b"fresh"))
+    asyncio.run(cache.serve(route))
+
+    assert route.fulfilled["body"] == b"fresh"
+    assert cache.stats()["misses"] == 1
+    assert cache.lookup(URL)[1] == b"fresh"
+
+
+def test_evicts_least_recently_used_to_max_bytes(cache, clock):
+    headers = {"cache-control": "max-age=3600"}
+    cache.store("https://cdn.example.com/a.js", 200, headers, b"a" * 400)
+    clock.now += 1
+    cache.store("https://cdn.example.com/b.js", 200, headers, b"b" * 400)
+    clock.now += 1
+    cache.touch("https://cdn.example.com/a.js")
+    clock.now += 1
+    cache.store("https://cdn.example.com/c.js", 200, headers, b"c" * 400)
+
+    assert cache.lookup("https://cdn.example.com/b.js") == (None, None)
+    assert cache.lookup("https://cdn.example.com/a.js")[1] == b"a" * 400
+    assert cache.summary()["bytes"] <= 1000
+
+
+def test_shared_blob_survives_eviction_of_one_url(cache, clock):
+    headers = {"cache-control": "max-age=3600"}
+    cache.store("https://cdn.example.com/v1/lib.js", 200, headers, b"x" * 400)
+    clock.now += 1
+    cache.store("https://cdn.example.com/v2/lib.js", 200, headers, b"x" * 400)
+    clock.now += 1
+    cache.store("https://cdn.example.com/big.js", 200, headers, b"y" * 500)
+
+    assert cache.lookup("https://cdn.example.com/v1/lib.js") == (None, None)
+    assert cache.lookup("https://cdn.example.com/v2/lib.js")[1] == b"x" * 400
+
+
+def test_missing_blob_is_treated_as_miss(cache):
+    cache.store(URL, 200, {"cache-control": "max-age=60"}, b"gone")
+    row, _ = cache.lookup(URL)
+    os.remove(cache._blob_path(row["digest"]))
+    assert cache.lookup(URL) == (None, None)
@@ -0,0 +1,141 @@
+import asyncio
+import os
+
+import pytest
+
+import auth_cache as auth_cache_module
+import config
+from auth_cache import AuthStateCache, restore_auth_state
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, ok=True, url="https://www.qianwen.com/"):
+        self.ok = ok
+        self.url = url
+
+    async def dispose(self):
+        pass
+
+
+class FakeRequest:
+    def __init__(self, context, response):
+        self.context = context
+        self.response = response
+        self.urls = []
+
+    async def get(self, url, timeout=None):
+        self.urls.append(url)
+        if self.context.server_clears:
+            self.context.jar = [c for c in self.context.jar if c["name"] != "tongyi_sso_ticket"]
+        return self.response
+
+
+class FakeContext:
+    """保存 Cookie 的浏览器上下文，server_clears 模拟服务端在复核响应中清除登录 Cookie"""
+
+    def __init__(self, cookies=(), response=None, server_clears=False):
+        self.jar = list(cookies)
+        self.scripts = []
+        self.server_clears = server_clears
+        self.request = FakeRequest(self, response or FakeResponse())
+
+    async def cookies(self):
+        return list(self.jar)
+
+    async def add_cookies(self, cookies):
+        names = {c["name"] for c in cookies}
+        self.jar = [c for c in self.jar if c["name"] not in names] + list(cookies)
+
+    async def add_init_script(self, script):
+        self.scripts.append(script)
+
+    async def clear_cookies(self, name=None):
+        self.jar = [c for c in self.jar if c["name"] != name]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth_cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return AuthStateCache("qwen", cache_dir=str(tmp_path / "auth"), max_age=3600)
+
+
+def _ticket(value, expires):
+    return {"name": "tongyi_sso_ticket", "value": value, "domain": ".qianwen.com", "path": "/", "expires": expires}
+
+
+def _save(cache, clock, expires):
+    cache.save({"cookies": [_ticket("cached", expires)],
+                "origins": [{"origin": "https://www.qianwen.com", "localStorage": [{"name": "k", "value": "v"}]}]})
+    os.utime(cache.path, (clock.now, clock.now))
+
+
+def test_fresh_until_max_age_or_cookie_expiry(cache, clock):
+    _save(cache, clock, expires=clock.now + 7200)
+    assert cache.is_fresh()
+
+    clock.now += 3601
+    assert not cache.is_fresh()
+
+    _save(cache, clock, expires=clock.now + 10)
+    clock.now += 11
+    assert not cache.is_fresh()
+
+
+def test_restore_loads_cookies_into_empty_context(cache, clock):
+    _save(cache, clock, expires=clock.now + 7200)
+    context = FakeContext()
+
+    assert asyncio.run(restore_auth_state(cache, context, "https://www.qianwen.com/")) is True
+    assert [c["value"] for c in context.jar] == ["cached"]
+    assert context.scripts and "localStorage" in context.scripts[0]
+    assert context.request.urls == ["https://www.qianwen.com/"]
+
+
+def test_restore_keeps_newer_session_in_context(cache, clock):
+    _save(cache, clock, expires=clock.now + 7200)
+    context = FakeContext([_ticket("newer", clock.now + 9000)])
+
+    assert asyncio.run(restore_auth_state(cache, context, "https://www.qianwen.com/")) is None
+    assert [c["value"] for c in context.jar] == ["newer"]
+    assert context.request.urls == []
+
+
+def test_rejected_session_invalidates_cache(cache, clock):
+    _save(cache, clock, expires=clock.now + 7200)
+    context = FakeContext(server_clears=True)
+
+    assert asyncio.run(restore_auth_state(cache, context, "https://www.qianwen.com/")) is False
+    assert cache.load() is None
+    assert context.jar == []
+
+
+def test_login_redirect_fails_configured_check_url(cache, clock, monkeypatch):
+    monkeypatch.setattr(config, "AUTH_CHECK_URLS", {"qwen": "https://www.qianwen.com/api/user"})
+    _save(cache, clock, expires=clock.now + 7200)
+    context = FakeContext(response=FakeResponse(url="https://login.qianwen.com/"))
+
+    assert not cache.expiry_only()
+    assert asyncio.run(restore_auth_state(cache, context, "https://www.qianwen.com/")) is False
+    assert context.request.urls == ["https://www.qianwen.com/api/user"]
+
+
+def test_invalidate_removes_cache_file(cache, clock):
+    _save(cache, clock, expires=-1)
+    assert cache.is_fresh()
+    cache.invalidate()
+    assert not os.path.exists(cache.path)
+    cache.invalidate()
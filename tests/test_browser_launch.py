@@ -0,0 +1,22 @@
+import asyncio
+import threading
+
+from browser_launch import run_sync
+
+
+async def _current_loop():
+    return asyncio.get_running_loop()
+
+
+def test_run_sync_reuses_loop_within_thread():
+    assert run_sync(_current_loop()) is run_sync(_current_loop())
+
+
+def test_run_sync_uses_separate_loop_per_thread():
+    main_loop = run_sync(_current_loop())
+    loops = []
+    thread = threading.Thread(target=lambda: loops.append(run_sync(_current_loop())))
+    thread.start()
+    thread.join()
+
+    assert loops and loops[0] is not main_loop
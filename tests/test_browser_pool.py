@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from browser_pool import BrowserPool, PooledContext
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+
+class FakeContext:
+    def __init__(self):
+        self.page = FakePage()
+        self.pages = [self.page]
+
+    async def close(self):
+        self.page.closed = True
+        self.pages = []
+
+
+class FlakyPool(BrowserPool):
+    """启动浏览器按 failures 中的顺序失败的池"""
+
+    def __init__(self, failures=()):
+        super().__init__("doubao", ["/tmp/profile"], max_uses=1)
+        self.failures = list(failures)
+        self.launches = 0
+
+    async def _launch(self, slot):
+        self.launches += 1
+        if self.failures and self.failures.pop(0):
+            raise RuntimeError("profile in use")
+        context = FakeContext()
+        return PooledContext(slot, self.profile_dirs[slot], context, context.page)
+
+    async def _warm(self, item):
+        pass
+
+    async def _heap_size(self, item):
+        return 0
+
+
+def _pool():
+    pool = FlakyPool()
+    pool.idle.append(asyncio.run(pool._launch(0)))
+    return pool
+
+
+async def _lease(pool, body=None):
+    async with pool.lease() as item:
+        if body:
+            body(item)
+
+
+def test_failed_relaunch_keeps_slot_and_relaunches_on_acquire():
+    pool = _pool()
+    pool.failures = [True]
+
+    asyncio.run(_lease(pool))
+    # max_uses=1 触发回收，重建失败后槽位仍在池中
+    assert pool.stats() == {"idle": 1, "busy": 0}
+    assert not pool.idle[0].is_alive()
+
+    item = asyncio.run(pool.acquire())
+    assert item.is_alive()
+    assert pool.launches == 3
+
+
+def test_release_error_does_not_replace_job_result(monkeypatch):
+    pool = _pool()
+    results = []
+
+    async def broken_release(item):
+        raise RuntimeError("release failed")
+
+    monkeypatch.setattr(pool, "release", broken_release)
+    asyncio.run(_lease(pool, lambda item: results.append("done")))
+    assert results == ["done"]
+
+
+def test_failed_launch_in_acquire_keeps_slot():
+    pool = FlakyPool()
+    item = asyncio.run(pool._launch(0))
+    asyncio.run(item.context.close())
+    pool.idle.append(item)
+    pool.failures = [True]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(pool.acquire())
+    assert pool.stats() == {"idle": 1, "busy": 0}
+    assert asyncio.run(pool.acquire()).is_alive()
+
+
+def test_after_close_runs_once_context_is_closed():
+    pool = _pool()
+    pool.max_uses = 10
+    seen = []
+
+    def set_after_close(item):
+        item.after_close = lambda: seen.append((item.context, pool.launches))
+
+    asyncio.run(_lease(pool, set_after_close))
+    # 上下文已关闭、尚未重建
+    assert seen == [(None, 1)]
+    assert pool.idle[0].is_alive() and pool.launches == 2
@@ -0,0 +1,39 @@
+import json
+
+from checkpoint import STATUS_FAILED, STATUS_INTERRUPTED, STATUS_RUNNING, Checkpoint
+
+
+def _checkpoint(run_id, status, updated_at, vendor="qwen"):
+    checkpoint = Checkpoint(vendor, f"主题 {run_id}", run_id)
+    checkpoint.step_done("submit_research", "https://example.com/c/1", submitted=True)
+    checkpoint.state["status"] = status
+    checkpoint.save()
+    # save() 会刷新 updated_at，按需要的先后顺序直接改写
+    checkpoint.state["updated_at"] = updated_at
+    with open(checkpoint.path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint.state, f)
+    return checkpoint
+
+
+def test_load_latest_skips_running_and_queue_checkpoints():
+    _checkpoint("failed-run", STATUS_FAILED, 100)
+    _checkpoint("interrupted-run", STATUS_INTERRUPTED, 200)
+    _checkpoint("live-run", STATUS_RUNNING, 300)
+    _checkpoint("job-7", STATUS_FAILED, 400)
+    _checkpoint("other-vendor", STATUS_FAILED, 500, vendor="doubao")
+
+    assert Checkpoint.load("qwen").state["run_id"] == "interrupted-run"
+
+
+def test_load_by_run_id_ignores_status():
+    _checkpoint("job-7", STATUS_RUNNING, 100)
+    assert Checkpoint.load("qwen", "job-7").state["run_id"] == "job-7"
+    assert Checkpoint.load("qwen") is None
+
+
+def test_finish_records_interruption_and_removes_on_success():
+    checkpoint = Checkpoint("qwen", "主题", "run")
+    checkpoint.finish(False, interrupted=True)
+    assert Checkpoint.load("qwen", "run").state["status"] == STATUS_INTERRUPTED
+    checkpoint.finish(True)
+    assert Checkpoint.load("qwen", "run") is None
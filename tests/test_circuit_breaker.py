@@ -0,0 +1,99 @@
+import pytest
+
+import circuit_breaker as circuit_breaker_module
+from circuit_breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """共享同一个数据库的两个 worker"""
+    db_path = str(tmp_path / "jobs.db")
+    breakers = [CircuitBreaker(db_path, threshold=3, cooldown=60, probe_timeout=600) for _ in range(2)]
+    yield breakers
+    for breaker in breakers:
+        breaker.close()
+
+
+def test_opens_after_threshold_failures(clock, workers):
+    breaker, _ = workers
+    assert not breaker.record_failure("qwen")
+    assert not breaker.record_failure("qwen")
+    assert breaker.allow("qwen") is True
+    assert breaker.record_failure("qwen")
+
+    assert breaker.state("qwen")["state"] == STATE_OPEN
+    assert breaker.allow("qwen") is False
+    assert breaker.allow("doubao") is True
+
+
+def test_success_resets_failure_count(clock, workers):
+    breaker, _ = workers
+    breaker.record_failure("qwen")
+    breaker.record_failure("qwen")
+    breaker.record_success("qwen")
+    assert not breaker.record_failure("qwen")
+    assert breaker.state("qwen")["failures"] == 1
+
+
+def test_half_open_lets_exactly_one_probe_through(clock, workers):
+    first, second = workers
+    for _ in range(3):
+        first.record_failure("qwen")
+
+    clock.now += 59
+    assert first.allow("qwen") is False
+
+    clock.now += 1
+    assert first.allow("qwen") == STATE_HALF_OPEN
+    assert second.allow("qwen") is False
+    assert first.allow("qwen") is False
+
+    first.record_success("qwen")
+    assert second.state("qwen")["state"] == STATE_CLOSED
+    assert second.allow("qwen") is True
+
+
+def test_failed_probe_reopens_and_cools_down_again(clock, workers):
+    first, second = workers
+    for _ in range(3):
+        first.record_failure("qwen")
+    clock.now += 60
+    assert first.allow("qwen") == STATE_HALF_OPEN
+
+    assert first.record_failure("qwen")
+    assert second.allow("qwen") is False
+    clock.now += 60
+    assert second.allow("qwen") == STATE_HALF_OPEN
+
+
+def test_released_or_stale_probe_can_be_taken_again(clock, workers):
+    first, second = workers
+    for _ in range(3):
+        first.record_failure("qwen")
+    clock.now += 60
+    assert first.allow("qwen") == STATE_HALF_OPEN
+
+    # 没有可领取的任务时交还探测机会
+    first.release_probe("qwen")
+    assert second.allow("qwen") == STATE_HALF_OPEN
+
+    # 探测 worker 没有回报结果，超过 probe_timeout 后其他 worker 重新探测
+    clock.now += 599
+    assert first.allow("qwen") is False
+    clock.now += 1
+    assert first.allow("qwen") == STATE_HALF_OPEN
@@ -0,0 +1,75 @@
+import pytest
+
+import qwen_research_auto
+from browser_launch import run_sync
+from completion_detector import STATE_DONE, CompletionDetector
+from deadline import Deadline, DeadlineExceeded
+from qwen_research_auto import QwenResearchAuto
+from selector_registry import SelectorRegistry
+
+FINISHED_PAGE = """
+<button id="stop-task" style="display: none">终止任务</button>
+<div id="answer"><span data-icon-type="qwpcicon-down">⬇</span></div>
+"""
+
+
+class FakeDetector:
+    """记录 done_selector，并像页面脚本一样只在传入 done_selector 时识别已完成的对话"""
+
+    instances = []
+
+    def __init__(self, page, done_selector=None):
+        self.done_selector = done_selector
+        self.seen_stop = False
+        FakeDetector.instances.append(self)
+
+    async def next_state(self, timeout_ms):
+        return STATE_DONE if self.done_selector else None
+
+
+def _qwen(resumed):
+    auto = QwenResearchAuto.__new__(QwenResearchAuto)
+    auto.page = None
+    auto.trace = None
+    auto.resumed = resumed
+    auto.deadline = Deadline(5)
+    auto.selectors = SelectorRegistry("qwen")
+    return auto
+
+
+def test_resumed_run_passes_download_button_as_done_selector(monkeypatch):
+    FakeDetector.instances = []
+    monkeypatch.setattr(qwen_research_auto, "CompletionDetector", FakeDetector)
+    monkeypatch.setattr(qwen_research_auto.config, "COMPLETION_PROGRESS_INTERVAL", 0.01)
+
+    assert run_sync(_qwen(resumed=True).wait_for_completion()) is True
+    assert "qwpcicon-down" in FakeDetector.instances[0].done_selector
+
+
+def test_fresh_run_waits_for_stop_button(monkeypatch):
+    FakeDetector.instances = []
+    monkeypatch.setattr(qwen_research_auto, "CompletionDetector", FakeDetector)
+    monkeypatch.setattr(qwen_research_auto.config, "COMPLETION_PROGRESS_INTERVAL", 0.01)
+
+    auto = _qwen(resumed=False)
+    auto.deadline = Deadline(0.2)
+    with pytest.raises(DeadlineExceeded):
+        run_sync(auto.wait_for_completion())
+    assert FakeDetector.instances[0].done_selector is None
+
+
+def test_finished_conversation_detected_without_stop_button(browser_page):
+    run_sync(browser_page.set_content(FINISHED_PAGE))
+    done_selector = ", ".join(SelectorRegistry("qwen").candidates("download_button"))
+
+    assert run_sync(CompletionDetector(browser_page).next_state(300)) is None
+    assert run_sync(CompletionDetector(browser_page, done_selector=done_selector).next_state(1000)) == STATE_DONE
+
+
+def test_running_research_not_reported_done_on_resume(browser_page):
+    run_sync(browser_page.set_content(FINISHED_PAGE.replace("display: none", "")))
+    done_selector = ", ".join(SelectorRegistry("qwen").candidates("download_button"))
+
+    detector = CompletionDetector(browser_page, done_selector=done_selector)
+    assert run_sync(detector.next_state(1000)) == "running"
+    assert run_sync(detector.next_state(300)) is None
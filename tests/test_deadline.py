@@ -0,0 +1,78 @@
+import pytest
+
+import deadline as deadline_module
+from deadline import Deadline, DeadlineExceeded
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(deadline_module.time, "monotonic", clock)
+    return clock
+
+
+def test_ms_is_capped_by_remaining_budget(clock):
+    budget = Deadline(10)
+    assert budget.ms(60000) == 10000
+    assert budget.ms(2000) == 2000
+
+    clock.now += 9.9995
+    # 剩余不足 1 毫秒时仍返回 1，Playwright 中 0 表示不限时
+    assert budget.ms(2000) == 1
+
+
+def test_unlimited_budget(clock):
+    budget = Deadline()
+    assert budget.ms(2000) == 2000
+    assert budget.ms() == 0
+    clock.now += 10 ** 6
+    budget.check()
+
+
+def test_check_raises_once_budget_is_spent(clock):
+    budget = Deadline(5)
+    budget.check()
+    clock.now += 5
+    with pytest.raises(DeadlineExceeded, match="等待研究结果"):
+        budget.ms(1000, "等待研究结果")
+    # 步骤内部的 except Exception 不会吞掉预算超时
+    assert not issubclass(DeadlineExceeded, Exception)
+
+
+def test_child_limit_expires_without_ending_the_run(clock):
+    budget = Deadline(600)
+    login = budget.limit(300)
+    assert login.ms(2000) == 2000
+
+    clock.now += 300
+    assert login.expired()
+    login.check()
+    assert budget.remaining() == 300
+
+
+def test_child_limit_never_outlives_parent(clock):
+    budget = Deadline(60)
+    login = budget.limit(300)
+    assert login.remaining() == 60
+
+    clock.now += 60
+    with pytest.raises(DeadlineExceeded):
+        login.check()
+
+
+def test_cancel_ends_root_budget_with_reason(clock):
+    budget = Deadline(100)
+    child = budget.limit(10)
+    budget.cancel("任务租约已被收回")
+
+    assert budget.expired()
+    with pytest.raises(DeadlineExceeded, match="任务租约已被收回"):
+        child.ms(1000, "等待研究完成")
@@ -0,0 +1,42 @@
+import queue
+
+import fuse_research
+from fuse_research import _collect_results
+
+
+class FakeProcess:
+    def __init__(self, alive=True, exitcode=None):
+        self.alive = alive
+        self.exitcode = exitcode
+
+    def is_alive(self):
+        return self.alive
+
+
+def test_crashed_process_is_reported_as_failure(monkeypatch):
+    monkeypatch.setattr(fuse_research, "RESULT_POLL_INTERVAL", 0.01)
+    results = queue.Queue()
+    results.put({"vendor": "qwen", "success": True, "result_path": "/tmp/qwen.md", "elapsed": 1.0})
+    processes = {"doubao": FakeProcess(alive=False, exitcode=-9), "qwen": FakeProcess(alive=False, exitcode=0)}
+
+    collected = {r["vendor"]: r for r in _collect_results(processes, results, 0)}
+    assert collected["qwen"]["success"] is True
+    assert collected["doubao"]["success"] is False and collected["doubao"]["result_path"] is None
+
+
+def test_waits_while_process_is_alive(monkeypatch):
+    monkeypatch.setattr(fuse_research, "RESULT_POLL_INTERVAL", 0.01)
+    process = FakeProcess()
+
+    class SlowQueue(queue.Queue):
+        polls = 0
+
+        def get(self, block=True, timeout=None):
+            SlowQueue.polls += 1
+            if SlowQueue.polls == 3:
+                return {"vendor": "qwen", "success": True, "result_path": "/tmp/qwen.md", "elapsed": 1.0}
+            raise queue.Empty
+
+    collected = _collect_results({"qwen": process}, SlowQueue(), 0)
+    assert [r["vendor"] for r in collected] == ["qwen"]
+    assert SlowQueue.polls == 3
@@ -0,0 +1,81 @@
+import asyncio
+
+import config
+from input_strategy import CHUNK_SIZE, InputStrategy, resolve_strategy
+
+
+class FakeKeyboard:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def insert_text(self, text):
+        self.calls.append(("insert_text", text))
+
+    async def type(self, text):
+        self.calls.append(("key", text))
+
+
+class FakePage:
+    def __init__(self):
+        self.calls = []
+        self.keyboard = FakeKeyboard(self.calls)
+
+    async def wait_for_timeout(self, ms):
+        self.calls.append(("pause", ms))
+
+
+class FakeLocator:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def type(self, text, delay=0):
+        self.calls.append(("type", text))
+
+    async def focus(self):
+        self.calls.append(("focus",))
+
+    async def click(self):
+        self.calls.append(("click",))
+
+    async def bounding_box(self):
+        return None
+
+
+def _typed(name, text):
+    page = FakePage()
+    strategy = InputStrategy(page, name)
+    asyncio.run(strategy.type(FakeLocator(page.calls), text))
+    return strategy, page.calls
+
+
+def test_resolve_strategy_falls_back_to_human(monkeypatch):
+    monkeypatch.setattr(config, "INPUT_STRATEGIES", {"doubao": "fast"})
+
+    assert resolve_strategy("doubao") == "fast"
+    assert resolve_strategy("qwen") == "human"
+    assert resolve_strategy("doubao", "teleport") == "human"
+
+
+def test_fast_strategy_inserts_text_and_types_last_key():
+    strategy, calls = _typed("fast", "固态电池研究")
+
+    assert calls == [("focus",), ("insert_text", "固态电池研"), ("key", "究")]
+    assert strategy.metadata()["input_strategy"] == "fast"
+
+
+def test_chunked_strategy_types_in_chunks():
+    text = "x" * (CHUNK_SIZE * 2 + 1)
+    _, calls = _typed("chunked", text)
+
+    typed = [c[1] for c in calls if c[0] == "type"]
+    assert typed == ["x" * CHUNK_SIZE, "x" * CHUNK_SIZE, "x"]
+    assert sum(1 for c in calls if c[0] == "pause") == 3
+
+
+def test_non_human_strategies_skip_pauses():
+    page = FakePage()
+    strategy = InputStrategy(page, "fast")
+    asyncio.run(strategy.pause(100, 200))
+    asyncio.run(strategy.click(FakeLocator(page.calls)))
+
+    assert page.calls == [("click",)]
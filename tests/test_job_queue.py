@@ -0,0 +1,146 @@
+import sqlite3
+import threading
+
+import pytest
+
+import config
+import job_queue as job_queue_module
+from deadline import Deadline
+from job_queue import STATUS_DONE, STATUS_QUEUED, STATUS_RUNNING, JobQueue, _heartbeat_loop
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(job_queue_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+@pytest.fixture
+def queue(db_path):
+    queue = JobQueue(db_path)
+    yield queue
+    queue.close()
+
+
+def _status(queue, job_id):
+    return {job["id"]: job for job in queue.list_jobs()}[job_id]
+
+
+def test_claim_takes_oldest_job_of_vendor(queue, clock):
+    first = queue.enqueue("qwen", "主题一")
+    queue.enqueue("doubao", "主题二")
+    queue.enqueue("qwen", "主题三")
+
+    job = queue.claim("qwen", "w1")
+    assert job["id"] == first
+    assert job["status"] == STATUS_RUNNING and job["attempts"] == 1 and job["lease"]
+    assert queue.claim("qwen", "w2")["topic"] == "主题三"
+    assert queue.claim("qwen", "w3") is None
+
+
+def test_requeue_only_stale_jobs(queue, clock):
+    stale = queue.enqueue("qwen", "心跳过期")
+    live = queue.enqueue("qwen", "心跳正常")
+    stale_job = queue.claim("qwen", "w1")
+    live_job = queue.claim("qwen", "w2")
+
+    clock.now += 301
+    assert queue.heartbeat(live_job["id"], live_job["lease"])
+    assert queue.requeue_running(older_than=300) == 1
+    assert _status(queue, stale)["status"] == STATUS_QUEUED
+    assert _status(queue, live)["status"] == STATUS_RUNNING
+
+    # 重新领取时生成新的租约
+    again = queue.claim("qwen", "w3")
+    assert again["id"] == stale and again["attempts"] == 2
+    assert again["lease"] != stale_job["lease"]
+
+
+def test_superseded_worker_cannot_update_job(queue, clock):
+    job_id = queue.enqueue("qwen", "主题")
+    old = queue.claim("qwen", "w1")
+    clock.now += 301
+    queue.requeue_running(older_than=300)
+    new = queue.claim("qwen", "w2")
+
+    assert not queue.heartbeat(job_id, old["lease"])
+    assert not queue.fail(job_id, old["lease"], "超时")
+    assert not queue.complete(job_id, old["lease"], "/tmp/old.md")
+    assert _status(queue, job_id)["status"] == STATUS_RUNNING
+
+    assert queue.complete(job_id, new["lease"], "/tmp/new.md")
+    assert _status(queue, job_id)["status"] == STATUS_DONE
+    assert _status(queue, job_id)["result_path"] == "/tmp/new.md"
+
+
+def test_heartbeat_loop_cancels_deadline_when_lease_is_lost(queue, db_path, monkeypatch):
+    monkeypatch.setattr(config, "JOB_HEARTBEAT_INTERVAL", 0.01)
+    queue.enqueue("qwen", "主题")
+    job = queue.claim("qwen", "w1")
+    queue.requeue_running(older_than=-1)
+
+    deadline = Deadline(3600)
+    thread = threading.Thread(target=_heartbeat_loop, args=(db_path, job, deadline, threading.Event()))
+    thread.start()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert deadline.expired()
+
+
+def test_old_database_gains_lease_column(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, vendor TEXT NOT NULL, "
+                 "topic TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0, "
+                 "worker TEXT, result_path TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, "
+                 "finished_at REAL, heartbeat_at REAL)")
+    conn.close()
+
+    queue = JobQueue(db_path)
+    queue.enqueue("qwen", "主题")
+    assert queue.claim("qwen", "w1")["lease"]
+    queue.close()
+
+
+class FakeVendor:
+    instances = []
+
+    def __init__(self, **options):
+        self.options = options
+        self.login_performed = False
+        self.result_path = "/tmp/fresh.md"
+        FakeVendor.instances.append(self)
+
+    def run(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("force, expected", [(False, "/tmp/cached.md"), (True, "/tmp/fresh.md")])
+def test_forced_job_skips_result_cache(queue, monkeypatch, force, expected):
+    FakeVendor.instances = []
+    monkeypatch.setattr(job_queue_module, "cached_result", lambda vendor, topic: "/tmp/cached.md")
+    monkeypatch.setattr(job_queue_module, "load_vendor_class", lambda vendor: FakeVendor)
+    queue.enqueue("qwen", "主题", force=force)
+    job = queue.claim("qwen", "w1")
+
+    assert bool(job["force"]) is force
+    assert job_queue_module.run_job(job, config.VENDOR_PROFILE_DIRS["qwen"]) == expected
+    if force:
+        assert FakeVendor.instances[0].options["force"] is True
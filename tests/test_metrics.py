@@ -0,0 +1,61 @@
+import json
+import os
+
+import metrics
+from metrics import MetricsRegistry, collect
+from process_stats import process_start_time
+
+
+def _snapshot(metrics_dir, name, pid, start_time, jobs, contexts):
+    data = {"pid": pid, "start_time": start_time, "counters": {'drf_jobs_started_total{vendor="qwen"}': jobs},
+            "histograms": {}, "gauges": {'drf_active_contexts{vendor="qwen"}': contexts}}
+    with open(os.path.join(metrics_dir, name), "w") as f:
+        json.dump(data, f)
+
+
+def test_snapshot_keyed_by_pid_and_start_time(workspace):
+    registry = MetricsRegistry(str(workspace / "metrics"), enabled=True)
+    registry.inc("drf_jobs_started_total", vendor="qwen")
+
+    assert os.listdir(workspace / "metrics") == [f"{os.getpid()}-{process_start_time()}.json"]
+
+
+def test_reused_pid_does_not_revive_dead_counters(workspace):
+    metrics_dir = str(workspace / "metrics")
+    os.makedirs(metrics_dir)
+    pid = os.getpid()
+    # 旧容器中同一 pid 的 worker：启动时间不同，视为已退出
+    _snapshot(metrics_dir, f"{pid}-1.json", pid, 1, jobs=5, contexts=2)
+    _snapshot(metrics_dir, f"{pid}-{process_start_time()}.json", pid, process_start_time(), jobs=1, contexts=1)
+
+    total, alive = collect(metrics_dir)
+    assert alive == [pid]
+    assert total["counters"]['drf_jobs_started_total{vendor="qwen"}'] == 6
+    assert total["gauges"]['drf_active_contexts{vendor="qwen"}'] == 1
+
+
+def test_dead_counters_stay_in_totals(workspace):
+    metrics_dir = str(workspace / "metrics")
+    os.makedirs(metrics_dir)
+    _snapshot(metrics_dir, "123-1.json", 2 ** 22 + 1, 1, jobs=3, contexts=1)
+
+    first, _ = collect(metrics_dir)
+    second, _ = collect(metrics_dir)
+    key = 'drf_jobs_started_total{vendor="qwen"}'
+    assert first["counters"][key] == second["counters"][key] == 3
+    assert "123-1.json" not in os.listdir(metrics_dir)
+    assert second["gauges"] == {}
+
+
+def test_archived_snapshot_not_counted_twice(workspace, monkeypatch):
+    metrics_dir = str(workspace / "metrics")
+    os.makedirs(metrics_dir)
+    _snapshot(metrics_dir, "123-1.json", 2 ** 22 + 1, 1, jobs=3, contexts=1)
+    # 归档写入后、删除快照前中断
+    with monkeypatch.context() as patch:
+        patch.setattr(metrics.os, "remove", lambda path: None)
+        collect(metrics_dir)
+
+    total, _ = collect(metrics_dir)
+    assert total["counters"]['drf_jobs_started_total{vendor="qwen"}'] == 3
+    assert "123-1.json" not in os.listdir(metrics_dir)
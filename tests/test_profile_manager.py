@@ -0,0 +1,65 @@
+import os
+import socket
+
+import pytest
+
+import config
+from profile_manager import ProfileManager, profile_in_use, vendor_profile_dir
+
+
+@pytest.fixture
+def profiles(workspace, monkeypatch):
+    monkeypatch.setattr(config, "VENDOR_PROFILE_DIRS", {"doubao": str(workspace / "golden_doubao")})
+    return ProfileManager(str(workspace / "sessions"))
+
+
+def _session(workspace, lock_pid=None):
+    session_dir = workspace / "sessions" / "doubao-1"
+    session_dir.mkdir(parents=True)
+    (session_dir / "Cookies").write_text("logged-in")
+    if lock_pid is not None:
+        os.symlink(f"{socket.gethostname()}-{lock_pid}", session_dir / "SingletonLock")
+    return str(session_dir)
+
+
+def test_promote_refuses_profile_of_running_browser(profiles, workspace):
+    session_dir = _session(workspace, lock_pid=os.getpid())
+
+    assert profile_in_use(session_dir)
+    with pytest.raises(RuntimeError):
+        profiles.promote("doubao", session_dir)
+    assert not os.path.exists(config.VENDOR_PROFILE_DIRS["doubao"])
+
+
+def test_promote_closed_profile_skips_locks(profiles, workspace):
+    # 已退出进程留下的锁不算占用
+    session_dir = _session(workspace, lock_pid=2 ** 22 + 1)
+
+    profiles.promote("doubao", session_dir)
+    golden = config.VENDOR_PROFILE_DIRS["doubao"]
+    assert open(os.path.join(golden, "Cookies")).read() == "logged-in"
+    assert not os.path.lexists(os.path.join(golden, "SingletonLock"))
+
+
+def test_vendor_dir_is_seeded_from_legacy_profile(profiles, workspace, monkeypatch):
+    legacy = workspace / "chrome_profile"
+    legacy.mkdir()
+    (legacy / "Cookies").write_text("legacy-login")
+    (legacy / "Cache").mkdir()
+    monkeypatch.setattr(config, "CHROME_PROFILE_DIR", str(legacy))
+
+    golden = vendor_profile_dir("doubao")
+    assert golden == config.VENDOR_PROFILE_DIRS["doubao"]
+    assert open(os.path.join(golden, "Cookies")).read() == "legacy-login"
+    assert not os.path.exists(os.path.join(golden, "Cache"))
+
+    # 已有厂商目录时不再覆盖
+    (legacy / "Cookies").write_text("changed")
+    vendor_profile_dir("doubao")
+    assert open(os.path.join(golden, "Cookies")).read() == "legacy-login"
+
+
+def test_empty_legacy_profile_is_not_copied(profiles, workspace, monkeypatch):
+    (workspace / "chrome_profile").mkdir()
+    monkeypatch.setattr(config, "CHROME_PROFILE_DIR", str(workspace / "chrome_profile"))
+    assert not os.path.exists(vendor_profile_dir("doubao"))
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from deadline import Deadline, DeadlineExceeded
+from readiness import ReadinessWaiter
+
+
+def test_until_records_ready_and_timeout():
+    waiter = ReadinessWaiter(page=None)
+    timeouts = []
+
+    async def ready(timeout):
+        timeouts.append(timeout)
+
+    async def never(timeout):
+        raise PlaywrightTimeoutError("timeout")
+
+    assert asyncio.run(waiter.until("输入框", ready, 5000)) is True
+    assert asyncio.run(waiter.until("结果", never, 3000)) is False
+
+    assert timeouts == [5000]
+    assert [(r.name, r.ready) for r in waiter.records] == [("输入框", True), ("结果", False)]
+    # 两次等待几乎不耗时，节省的时长接近两个上限之和
+    assert waiter.saved_ms() > 7000
+
+
+def test_until_caps_timeout_by_deadline():
+    deadline = Deadline(2)
+    waiter = ReadinessWaiter(page=None, deadline=deadline)
+    timeouts = []
+
+    async def ready(timeout):
+        timeouts.append(timeout)
+
+    asyncio.run(waiter.until("页面加载", ready, 60000))
+    assert 0 < timeouts[0] <= 2000
+
+    deadline.cancel("任务租约已被收回")
+    with pytest.raises(DeadlineExceeded, match="任务租约已被收回"):
+        asyncio.run(waiter.until("页面加载", ready, 60000))
+    assert len(waiter.records) == 1
+
+
+def test_summary_prints_each_wait(capsys):
+    waiter = ReadinessWaiter(page=None)
+
+    async def ready(timeout):
+        pass
+
+    asyncio.run(waiter.until("发送按钮", ready, 2000))
+    waiter.summary()
+
+    out = capsys.readouterr().out
+    assert "✅ 发送按钮" in out and "上限 2秒" in out
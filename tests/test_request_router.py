@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+import config
+from request_router import RequestRouter
+
+
+class FakeFrame:
+    def __init__(self, page):
+        self.page = page
+
+
+class FakeRequest:
+    def __init__(self, page, url, resource_type="xhr", body_size=0):
+        self.frame = FakeFrame(page)
+        self.url = url
+        self.resource_type = resource_type
+        self.method = "GET"
+        self.headers = {}
+        self.body_size = body_size
+
+    async def sizes(self):
+        return {"responseBodySize": self.body_size}
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.action = None
+
+    async def abort(self):
+        self.action = "abort"
+
+    async def continue_(self):
+        self.action = "continue"
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(config, "ROUTING_ENABLED", True)
+    monkeypatch.setattr(config, "ASSET_CACHE_ENABLED", False)
+    return RequestRouter("qwen", rules={"allow": [r"sentry\.io/keep"], "deny": [r"sentry"],
+                                        "block_types": ["media"]})
+
+
+def test_decide_applies_allow_deny_and_types(router):
+    assert router.decide("https://sentry.io/keep/1", "xhr") is None
+    assert router.decide("https://sentry.io/api/1", "xhr") == "deny"
+    assert router.decide("https://www.google-analytics.com/collect", "xhr") == "deny"
+    assert router.decide("https://cdn.example.com/a.mp4", "media") == "type:media"
+    assert router.decide("https://cdn.example.com/logo.png", "image") is None
+    # 主文档始终放行
+    assert router.decide("https://sentry.io/", "document") is None
+
+    router.block(["image"])
+    assert router.decide("https://cdn.example.com/logo.png", "image") == "type:image"
+
+
+def test_routing_disabled_keeps_only_added_block_types(monkeypatch):
+    monkeypatch.setattr(config, "ROUTING_ENABLED", False)
+    monkeypatch.setattr(config, "ASSET_CACHE_ENABLED", False)
+    router = RequestRouter("qwen")
+    assert router.decide("https://www.google-analytics.com/collect", "xhr") is None
+    router.block(["image"])
+    assert router.decide("https://cdn.example.com/logo.png", "image") == "type:image"
+
+
+def test_stats_are_kept_per_run(router):
+    first_page, second_page = object(), object()
+    first = router.track(first_page)
+    second = router.track(second_page)
+
+    async def traffic():
+        for request in [FakeRequest(first_page, "https://api.example.com/chat", body_size=1200),
+                        FakeRequest(first_page, "https://sentry.io/api/1"),
+                        FakeRequest(second_page, "https://cdn.example.com/a.mp4", "media"),
+                        FakeRequest(object(), "https://api.example.com/other", body_size=99)]:
+            route = FakeRoute(request)
+            await router._handle(route)
+            if route.action == "continue":
+                await router._on_request_finished(request)
+
+    asyncio.run(traffic())
+    assert first.to_dict() == {"allowed": 1, "blocked": 1, "blocked_by": {"deny": 1}, "bytes_in": 1200, "cache": None}
+    assert second.to_dict()["blocked_by"] == {"type:media": 1}
+    assert second.bytes_in == 0
+
+    # 新运行复用同一页面时从零开始统计，不影响其他运行
+    router.untrack(first_page)
+    assert router.track(first_page).to_dict()["allowed"] == 0
+    assert second.to_dict()["blocked"] == 1
+
+
+def test_unblock_lifts_only_added_types(router):
+    router.block(["image", "font", "media"])
+    assert router.decide("https://cdn.example.com/qr.png", "image") == "type:image"
+
+    assert router.unblock() is True
+    assert router.decide("https://cdn.example.com/qr.png", "image") is None
+    # 厂商规则中配置的类型仍然拦截
+    assert router.decide("https://cdn.example.com/a.mp4", "media") == "type:media"
+    assert router.unblock() is False
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+import config
+from checkpoint import STATUS_FAILED, Checkpoint
+from research_pipeline import ResearchPipeline
+
+
+class FakePage:
+    url = "http://mock/chat/1"
+
+    def on(self, event, handler):
+        pass
+
+    def remove_listener(self, event, handler):
+        pass
+
+
+class FakePlugin(ResearchPipeline):
+    """不打开浏览器的厂商插件，只记录步骤的调用顺序"""
+
+    VENDOR = "doubao"
+    SUBMIT_STEPS = [("input_topic", False), ("send_request", True)]
+    COMPLETION_STEPS = ["wait_and_click_start_research", "monitor_results"]
+
+    def __init__(self, fail_step=None, **kwargs):
+        super().__init__(base_url="http://mock", topic="主题", stream_partial=False, capture_mode="clipboard", **kwargs)
+        self.fail_step = fail_step
+        self.calls = []
+
+    def _step(self, name):
+        self.calls.append(name)
+        return name != self.fail_step
+
+    async def _open_page(self):
+        self.page = FakePage()
+
+    async def _close_page(self):
+        self.calls.append("close_page")
+
+    async def visit_page(self):
+        return self._step("visit_page")
+
+    async def check_and_handle_login(self):
+        return self._step("check_and_handle_login")
+
+    async def input_topic(self):
+        return self._step("input_topic")
+
+    async def send_request(self):
+        return self._step("send_request")
+
+    async def wait_and_click_start_research(self):
+        return self._step("wait_and_click_start_research")
+
+    async def monitor_results(self):
+        return self._step("monitor_results")
+
+    async def save_results(self):
+        return self._step("save_results")
+
+
+@pytest.fixture(autouse=True)
+def plain_profile(monkeypatch):
+    monkeypatch.setattr(config, "LAUNCH_PROFILE", "default")
+    monkeypatch.setattr(config, "ROUTING_ENABLED", False)
+    monkeypatch.setattr(config, "ASSET_CACHE_ENABLED", False)
+
+
+def test_run_calls_plugin_steps_in_order():
+    plugin = FakePlugin(run_id="run-1")
+
+    assert plugin.run() is True
+    assert plugin.calls == ["visit_page", "check_and_handle_login", "input_topic", "send_request",
+                            "wait_and_click_start_research", "monitor_results", "save_results", "close_page"]
+    # 运行成功后删除检查点
+    assert not os.path.exists(plugin.checkpoint.path)
+
+
+def test_failed_step_stops_run_and_keeps_checkpoint():
+    plugin = FakePlugin(fail_step="monitor_results", run_id="run-2")
+
+    assert plugin.run() is False
+    assert plugin.calls[-2:] == ["monitor_results", "close_page"]
+    checkpoint = Checkpoint.load("doubao", "run-2")
+    assert checkpoint.state["status"] == STATUS_FAILED
+    assert checkpoint.done("wait_and_click_start_research")
+    assert not checkpoint.done("monitor_results")
+
+
+def test_resume_skips_submitted_and_completed_steps():
+    FakePlugin(fail_step="monitor_results", run_id="run-3").run()
+
+    plugin = FakePlugin(run_id="run-3", resume=True)
+    assert plugin.resumed
+    assert plugin.run() is True
+    assert plugin.calls == ["visit_page", "check_and_handle_login", "monitor_results", "save_results", "close_page"]
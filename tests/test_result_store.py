@@ -0,0 +1,78 @@
+import os
+import time
+
+import pytest
+
+import config
+from result_store import (ResultStore, cached_result, normalize_topic, release_result_path,
+                          reserve_result_path)
+
+
+@pytest.fixture
+def store():
+    store = ResultStore()
+    yield store
+    store.close()
+
+
+def _report(tmp_path, name, text="# 报告\n\n固态电池的能量密度"):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_normalize_topic_ignores_width_case_and_punctuation():
+    assert normalize_topic("  ＡＩ  芯片/发展？ ") == normalize_topic("ai 芯片发展")
+
+
+def test_lookup_respects_max_age(tmp_path, store):
+    path = _report(tmp_path, "research_result_20260101_000000.md")
+    store.record("doubao", "AI 芯片", path, finished_at=time.time() - 7200)
+
+    assert store.lookup("doubao", "ai  芯片", max_age=3 * 3600)["result_path"] == path
+    assert store.lookup("doubao", "AI 芯片", max_age=3600) is None
+    assert store.lookup("qwen", "AI 芯片", max_age=3 * 3600) is None
+
+
+def test_lookup_skips_deleted_result_files(tmp_path, store):
+    older = _report(tmp_path, "research_result_20260101_000000.md")
+    newer = _report(tmp_path, "research_result_20260101_000100.md")
+    store.record("doubao", "主题", older, finished_at=time.time() - 60)
+    store.record("doubao", "主题", newer)
+    os.remove(newer)
+
+    assert store.lookup("doubao", "主题")["result_path"] == older
+
+
+def test_cached_result_can_be_disabled(tmp_path, store, monkeypatch):
+    path = _report(tmp_path, "qwen_research_20260101_000000.md")
+    store.record("qwen", "主题", path)
+    assert cached_result("qwen", "主题") == path
+
+    monkeypatch.setattr(config, "RESULT_CACHE_ENABLED", False)
+    assert cached_result("qwen", "主题") is None
+
+
+def test_search_matches_report_content(tmp_path, store):
+    store.record("doubao", "电池研究", _report(tmp_path, "a.md"))
+    store.record("qwen", "芯片研究", _report(tmp_path, "b.md", "# 报告\n\n光刻机产能"))
+
+    assert [row["topic"] for row in store.search("固态电池")] == ["电池研究"]
+    assert [row["topic"] for row in store.search("光刻 产能", vendor="qwen")] == ["芯片研究"]
+    assert store.search("固态电池", vendor="qwen") == []
+
+
+def test_reserve_result_path_suffixes_same_second_results(tmp_path):
+    path = str(tmp_path / "qwen_research_20260101_000000.md")
+    first = reserve_result_path(path)
+    second = reserve_result_path(path)
+
+    assert first == path
+    assert second == str(tmp_path / "qwen_research_20260101_000000_2.md")
+
+    release_result_path(second)
+    assert not os.path.exists(second)
+    with open(first, "w", encoding="utf-8") as f:
+        f.write("正文")
+    release_result_path(first)
+    assert os.path.exists(first)
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+import config
+import retry_policy
+from deadline import Deadline, DeadlineExceeded
+from retry_policy import RetryPolicy, retry_step
+
+
+class Step:
+    """按预设结果依次返回的步骤方法宿主"""
+
+    def __init__(self, results, deadline=None):
+        self.results = list(results)
+        self.calls = 0
+        self.deadline = deadline or Deadline()
+
+    def _next(self):
+        self.calls += 1
+        return self.results.pop(0)
+
+    @retry_step()
+    def visit_page(self):
+        return self._next()
+
+    @retry_step(idempotent=False)
+    def send_request(self):
+        return self._next()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(retry_policy.time, "sleep", sleeps.append)
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+    monkeypatch.setattr(retry_policy.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(config, "STEP_RETRY_POLICIES", {"visit_page": {"attempts": 3, "backoff": 10, "max_backoff": 15}})
+    return sleeps
+
+
+def test_delay_grows_exponentially_up_to_max_backoff():
+    policy = RetryPolicy(attempts=5, backoff=5, max_backoff=12)
+    for attempt, base in [(1, 5), (2, 10), (3, 12), (4, 12)]:
+        for _ in range(20):
+            assert base * 0.8 <= policy.delay(attempt) <= base * 1.2
+
+
+def test_vendor_policy_overrides_step_policy(monkeypatch):
+    monkeypatch.setattr(config, "STEP_RETRY_POLICIES", {"visit_page": {"attempts": 3},
+                                                        "qwen.visit_page": {"attempts": 5}})
+    assert RetryPolicy.for_step("qwen", "visit_page").attempts == 5
+    assert RetryPolicy.for_step("doubao", "visit_page").attempts == 3
+    assert RetryPolicy.for_step("qwen", "visit_page", idempotent=False).attempts == 1
+
+
+def test_retries_until_success(sleeps):
+    step = Step([False, False, True])
+    assert step.visit_page() is True
+    assert step.calls == 3
+    assert len(sleeps) == 2
+    assert 8 <= sleeps[0] <= 12 and 12 <= sleeps[1] <= 15 * 1.2
+
+
+def test_gives_up_after_attempts(sleeps):
+    step = Step([False, False, False, True])
+    assert step.visit_page() is False
+    assert step.calls == 3
+
+
+def test_non_idempotent_step_runs_once(sleeps):
+    step = Step([False, True])
+    assert step.send_request() is False
+    assert step.calls == 1
+    assert sleeps == []
+
+
+def test_backoff_never_exceeds_remaining_budget(sleeps):
+    step = Step([False, True], deadline=Deadline(2))
+    assert step.visit_page() is True
+    assert sleeps[0] <= 2
+
+
+def test_no_retry_once_budget_is_spent(sleeps):
+    step = Step([False, True], deadline=Deadline(0))
+    with pytest.raises(DeadlineExceeded):
+        step.visit_page()
+    assert step.calls == 1
+
+
+class AsyncStep(Step):
+    @retry_step()
+    async def visit_page(self):
+        return self._next()
+
+
+def test_async_step_retries_with_same_policy(sleeps):
+    step = AsyncStep([False, False, True])
+    assert asyncio.run(step.visit_page()) is True
+    assert step.calls == 3
+    assert len(sleeps) == 2
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from run_trace import RunTrace, summarize, traced_step
+
+
+class Steps:
+    def __init__(self, trace):
+        self.trace = trace
+
+    @traced_step
+    async def input_topic(self):
+        self.trace.retry()
+        return True
+
+    @traced_step
+    def send_request(self):
+        return False
+
+    @traced_step
+    def extract_result(self):
+        raise RuntimeError("下载失败")
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_trace_records_steps_and_run_end(tmp_path):
+    trace = RunTrace("doubao", "主题", run_id="run-1", log_dir=str(tmp_path), enabled=True)
+    steps = Steps(trace)
+    trace.start()
+    asyncio.run(steps.input_topic())
+    steps.send_request()
+    try:
+        steps.extract_result()
+    except RuntimeError:
+        pass
+    trace.finish(False, metadata={"routing": {"blocked": 3, "bytes_in": 0}})
+
+    events = _read(trace.path)
+    assert [e["event"] for e in events] == ["run_start", "step", "step", "step", "run_end"]
+    assert all(e["run_id"] == "run-1" and e["vendor"] == "doubao" for e in events)
+    outcomes = {e["step"]: (e["outcome"], e["retries"]) for e in events if e["event"] == "step"}
+    assert outcomes == {"input_topic": ("ok", 1), "send_request": ("fail", 0), "extract_result": ("error", 0)}
+    assert events[3]["error"] == "下载失败"
+    assert events[-1]["success"] is False
+    assert events[-1]["metadata"]["routing"]["blocked"] == 3
+
+
+def test_disabled_trace_writes_nothing(tmp_path):
+    trace = RunTrace("doubao", "主题", log_dir=str(tmp_path), enabled=False)
+    trace.start()
+    Steps(trace).send_request()
+    trace.finish(True)
+
+    assert trace.steps[0]["outcome"] == "fail"
+    assert list(tmp_path.iterdir()) == []
+
+
+def _write_events(path, events):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        f.write("not json\n")
+
+
+def test_summarize_reports_runs_routing_and_steps(tmp_path, capsys):
+    mb = 1024 * 1024
+    path = tmp_path / "trace.jsonl"
+    _write_events(path, [
+        {"event": "step", "vendor": "doubao", "step": "input_topic", "duration_ms": 1000},
+        {"event": "step", "vendor": "doubao", "step": "input_topic", "duration_ms": 3000},
+        {"event": "step", "vendor": "doubao", "step": "input_topic", "duration_ms": 2000},
+        {"event": "run_end", "vendor": "doubao", "success": True, "duration_ms": 10000,
+         "metadata": {"routing": {"blocked": 10, "bytes_in": 2 * mb,
+                                  "cache": {"hits": 3, "revalidated": 1, "misses": 4, "bytes_saved": mb}}}},
+        {"event": "run_end", "vendor": "doubao", "success": False, "duration_ms": 20000,
+         "metadata": {"routing": {"blocked": 20, "bytes_in": 4 * mb,
+                                  "cache": {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 3 * mb}}}},
+        {"event": "run_end", "vendor": "qwen", "success": True, "duration_ms": 5000, "metadata": {}},
+    ])
+
+    summarize(str(path))
+    out = capsys.readouterr().out
+
+    assert "doubao: 2 次运行，成功 1 次，平均耗时 15.0秒" in out
+    assert "平均每次拦截 15 个请求，接收 3.0MB" in out
+    assert "命中率 50%，平均每次节省 2.0MB" in out
+    assert "input_topic" in out and "次数 3" in out and "中位数     2.00秒" in out and "最大     3.00秒" in out
+    # 未启用请求路由的运行不输出路由统计
+    qwen = out.split("qwen:")[1]
+    assert "成功 1 次" in qwen and "请求路由" not in qwen
@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+from selector_registry import SELECTORS, SelectorRegistry, load_stats
+
+
+class FakePage:
+    """按传入的候选列表返回命中序号的页面"""
+
+    def __init__(self, visible):
+        self.visible = visible
+        self.queries = []
+
+    async def evaluate(self, script, candidates):
+        self.queries.append(list(candidates))
+        for i, selector in enumerate(candidates):
+            if selector in self.visible:
+                return i + 1
+        return 0
+
+    def locator(self, selector):
+        return FakeLocator(selector)
+
+
+class FakeLocator:
+    def __init__(self, selector):
+        self.selector = selector
+        self.first = self
+
+
+def test_last_winner_is_tried_first(tmp_path):
+    stats_path = str(tmp_path / "selectors.json")
+    registry = SelectorRegistry("doubao", stats_path=stats_path)
+    page = FakePage({"div[contenteditable='true']"})
+
+    locator, selector = asyncio.run(registry.resolve(page, "chat_input"))
+
+    assert selector == "div[contenteditable='true']"
+    assert locator.selector == "div[contenteditable='true'] >> visible=true"
+    assert registry.candidates("chat_input")[0] == "div[contenteditable='true']"
+    assert sorted(registry.candidates("chat_input")) == sorted(SELECTORS["doubao"]["chat_input"]["candidates"])
+
+
+def test_keep_order_entries_ignore_winner(tmp_path):
+    registry = SelectorRegistry("doubao", stats_path=str(tmp_path / "selectors.json"))
+    asyncio.run(registry.resolve(FakePage({".avatar"}), "login_state"))
+
+    assert registry.candidates("login_state") == SELECTORS["doubao"]["login_state"]["candidates"]
+
+
+def test_missing_element_is_counted(tmp_path):
+    registry = SelectorRegistry("doubao", stats_path=str(tmp_path / "selectors.json"))
+
+    assert asyncio.run(registry.resolve(FakePage(set()), "result_card")) == (None, None)
+    assert registry.pending["result_card"] == {"used": {}, "missed": 1}
+
+
+def test_flush_merges_counts_across_registries(tmp_path):
+    stats_path = str(tmp_path / "stats" / "selectors.json")
+    first = SelectorRegistry("doubao", stats_path=stats_path)
+    second = SelectorRegistry("doubao", stats_path=stats_path)
+    page = FakePage({"textarea.text-area"})
+
+    asyncio.run(first.resolve(page, "chat_input"))
+    asyncio.run(second.resolve(page, "chat_input"))
+    asyncio.run(second.resolve(FakePage(set()), "chat_input"))
+    first.flush()
+    second.flush()
+
+    stored = load_stats(stats_path)["doubao"]["chat_input"]
+    assert stored == {"winner": "textarea.text-area", "used": {"textarea.text-area": 2}, "missed": 1}
+    assert first.pending == {} and second.pending == {}
+
+    # 新进程读取统计文件后优先尝试上次命中的候选
+    reloaded = SelectorRegistry("doubao", stats_path=stats_path)
+    assert reloaded.candidates("chat_input")[0] == "textarea.text-area"
+
+
+def test_flush_without_hits_does_not_write(tmp_path):
+    stats_path = tmp_path / "selectors.json"
+    SelectorRegistry("doubao", stats_path=str(stats_path)).flush()
+
+    assert not stats_path.exists()
+
+
+def test_unreadable_stats_file_is_ignored(tmp_path):
+    stats_path = tmp_path / "selectors.json"
+    stats_path.write_text("{not json", encoding="utf-8")
+    registry = SelectorRegistry("doubao", stats_path=str(stats_path))
+
+    assert registry.candidates("chat_input") == SELECTORS["doubao"]["chat_input"]["candidates"]
+    asyncio.run(registry.resolve(FakePage({"textarea.text-area"}), "chat_input"))
+    registry.flush()
+    assert json.loads(stats_path.read_text(encoding="utf-8"))["doubao"]["chat_input"]["used"] == {"textarea.text-area": 1}
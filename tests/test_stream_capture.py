@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+from partial_report import PartialReportWriter
+from research_pipeline import ResearchPipeline
+from stream_capture import StreamAssembler, StreamRecorder, extract_text, rebuild_report
+
+
+def _event(text, key="content"):
+    return f"data: {json.dumps({'message': {key: text}}, ensure_ascii=False)}\n\n"
+
+
+def test_full_text_events_replace_report():
+    assembler = StreamAssembler()
+    assembler.feed(_event("# 报告"))
+    assembler.feed(_event("# 报告\n\n第一节"))
+    assert assembler.feed(_event("# 报告\n\n第一节\n\n第二节")) == "# 报告\n\n第一节\n\n第二节"
+
+
+def test_delta_events_are_appended():
+    assembler = StreamAssembler()
+    for delta in ["# 报告", "\n\n第一节", "\n\n第二节"]:
+        assembler.feed(_event(delta, key="text"))
+    assert assembler.report == "# 报告\n\n第一节\n\n第二节"
+
+
+def test_events_split_across_chunks():
+    body = _event("# 报告") + _event("# 报告\n\n正文")
+    assembler = StreamAssembler()
+    for i in range(0, len(body), 7):
+        assembler.feed(body[i:i + 7])
+    assert assembler.report == "# 报告\n\n正文"
+
+
+def test_close_flushes_unterminated_event():
+    assembler = StreamAssembler()
+    assembler.feed(_event("开头"))
+    assembler.feed(_event("开头，结尾").rstrip("\n"))
+    assert assembler.report == "开头"
+    assert assembler.close() == "开头，结尾"
+
+
+def test_non_json_and_empty_events_are_ignored():
+    assembler = StreamAssembler()
+    assembler.feed("data: [DONE]\n\n" + _event("正文") + "data: {}\n\n: keep-alive\n\n")
+    assert assembler.close() == "正文"
+
+
+def test_extract_text_reads_nested_json_strings():
+    payload = {"data": {"content": json.dumps({"text": "嵌套正文"}, ensure_ascii=False), "id": "x"}}
+    assert extract_text(payload) == "嵌套正文"
+
+
+def test_rebuild_report_handles_sse_and_plain_json():
+    assert rebuild_report(_event("甲") + _event("甲乙")) == "甲乙"
+    assert rebuild_report(json.dumps({"content": "完整报告"}, ensure_ascii=False)) == "完整报告"
+    assert rebuild_report("<html></html>") == ""
+
+
+class FakePage:
+    async def expose_function(self, name, callback):
+        self.callback = callback
+
+    async def add_init_script(self, script):
+        pass
+
+    async def evaluate(self, script):
+        pass
+
+
+def test_recorder_follows_longest_stream():
+    page, texts = FakePage(), []
+    recorder = asyncio.run(StreamRecorder(page, "qwen", texts.append).install())
+
+    page.callback("plan", _event("研究计划：第一步，第二步"))
+    page.callback("report", _event("# 最终报告"))
+    assert recorder.open_streams == {"plan", "report"}
+    # 报告流还没有超过研究计划时不切换，也不截断已写入的正文
+    assert texts == ["研究计划：第一步，第二步"]
+    page.callback("report", _event("# 最终报告\n\n第一节\n\n第二节"))
+    page.callback("plan", _event("研究计划：第一步，第二步，第三步"))
+    page.callback("plan", None)
+    page.callback("report", None)
+
+    assert texts[-1] == "# 最终报告\n\n第一节\n\n第二节"
+    assert recorder.report() == "# 最终报告\n\n第一节\n\n第二节"
+    assert recorder.open_streams == set()
+
+    recorder.detach()
+    page.callback("late", _event("迟到的正文，比报告还要长很多很多很多很多很多"))
+    assert texts[-1] == "# 最终报告\n\n第一节\n\n第二节"
+
+
+class FakeCapture:
+    def __init__(self, text):
+        self.text = text
+
+    async def wait_idle(self, timeout_ms=10000):
+        return True
+
+    def report(self):
+        return self.text
+
+
+def _pipeline(tmp_path, written, captured):
+    auto = ResearchPipeline.__new__(ResearchPipeline)
+    auto.trace = None
+    auto.result_path = None
+    auto.partial = PartialReportWriter(str(tmp_path / "result.md"))
+    auto.partial.update(written)
+    auto.recorder = auto.capture = FakeCapture(captured)
+    return auto
+
+
+def test_save_results_commits_partial_report(tmp_path):
+    auto = _pipeline(tmp_path, "# 报告\n\n完整正文", "# 报告")
+    assert asyncio.run(auto.save_results()) is True
+    with open(auto.result_path, encoding="utf-8") as f:
+        assert f.read() == "# 报告\n\n完整正文"
+
+
+def test_save_results_falls_back_to_longer_captured_report(tmp_path):
+    auto = _pipeline(tmp_path, "# 报告", "# 报告\n\n完整正文")
+    assert asyncio.run(auto.save_results()) is True
+    with open(auto.result_path, encoding="utf-8") as f:
+        assert f.read() == "# 报告\n\n完整正文"
@@ -0,0 +1,89 @@
+import asyncio
+
+from checkpoint import Checkpoint
+from circuit_breaker import CircuitBreaker
+from job_queue import STATUS_DONE, JobQueue
+from tab_multiplexer import TabMultiplexer, _run_tab_job
+
+
+class FakeQueue:
+    def __init__(self):
+        self.completed = {}
+        self.failed = {}
+
+    def complete(self, job_id, lease, result_path):
+        self.completed[job_id] = result_path
+        return True
+
+    def fail(self, job_id, lease, error):
+        self.failed[job_id] = error
+        return True
+
+
+class FakeSession:
+    result_path = "/tmp/result.md"
+
+
+class RecordingMux:
+    base_url = "http://mock"
+
+    def __init__(self):
+        self.calls = []
+
+    async def run_topic(self, topic, **kwargs):
+        self.calls.append((topic, kwargs))
+        return True, FakeSession()
+
+
+def test_tab_job_resumes_by_job_run_id(tmp_path):
+    mux, queue = RecordingMux(), FakeQueue()
+    job = {"id": 7, "vendor": "doubao", "topic": "主题", "lease": "lease-7"}
+    asyncio.run(_run_tab_job(mux, queue, str(tmp_path / "jobs.db"), job, "worker", None))
+
+    (topic, kwargs), = mux.calls
+    assert topic == "主题"
+    assert kwargs["run_id"] == "job-7"
+    assert kwargs["resume"] is True
+    assert queue.completed == {7: "/tmp/result.md"}
+
+
+def test_requeued_tab_session_returns_to_conversation():
+    checkpoint = Checkpoint("doubao", "主题", "job-7")
+    checkpoint.step_done("send_request", "https://www.doubao.com/chat/123", submitted=True)
+
+    mux = TabMultiplexer("doubao")
+    mux.context = object()
+    session = mux._session("主题", run_id="job-7", resume=True)
+
+    assert session.owns_page
+    assert session.resumed
+    assert session.checkpoint.conversation_url == "https://www.doubao.com/chat/123"
+    assert session.trace.run_id == "job-7"
+
+
+def test_forced_tab_job_skips_result_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr("tab_multiplexer.cached_result", lambda vendor, topic: "/tmp/cached.md")
+    mux, queue = RecordingMux(), FakeQueue()
+    mux.base_url = None
+    job = {"id": 8, "vendor": "doubao", "topic": "主题", "lease": "lease-8", "force": 1}
+    asyncio.run(_run_tab_job(mux, queue, str(tmp_path / "jobs.db"), job, "worker", None))
+
+    (_, kwargs), = mux.calls
+    assert kwargs["force"] is True
+    assert queue.completed == {8: "/tmp/result.md"}
+
+
+def test_tab_job_updates_real_queue_from_worker_thread(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    queue = JobQueue(db_path)
+    breaker = CircuitBreaker(db_path)
+    try:
+        queue.enqueue("doubao", "主题")
+        job = queue.claim("doubao", "worker")
+        asyncio.run(_run_tab_job(RecordingMux(), queue, db_path, job, "worker", breaker))
+
+        done, = queue.list_jobs(status=STATUS_DONE)
+        assert done["result_path"] == "/tmp/result.md"
+    finally:
+        breaker.close()
+        queue.close()
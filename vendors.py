@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+厂商注册表
+
+每个厂商是 research_pipeline.ResearchPipeline 的一个插件。新增厂商时在 VENDOR_NAMES 和
+VENDOR_PLUGINS 中登记，在 config.VENDOR_URLS、config.VENDOR_PROFILE_DIRS 和
+selector_registry.SELECTORS 中补充该厂商的条目（config.ROUTING_RULES、config.INPUT_STRATEGIES 可选）。
+同一个插件类同时提供同步 API 和 asyncio API（async_api=True，多标签页模式和并发会话使用）。
+"""
+
+import importlib
+
+VENDOR_NAMES = {
+    "doubao": "豆包",
+    "qwen": "通义千问",
+}
+
+# 厂商名 -> "模块:类名"
+VENDOR_PLUGINS = {
+    "doubao": "doubao_research_auto:DoubaoResearchAuto",
+    "qwen": "qwen_research_auto:QwenResearchAuto",
+}
+
+
+def load_vendor_class(vendor):
+    """按厂商名加载自动化类（延迟导入，避免调用方进程提前加载 Playwright）"""
+    if vendor not in VENDOR_PLUGINS:
+        raise ValueError(f"未知厂商: {vendor}")
+    module_name, class_name = VENDOR_PLUGINS[vendor].split(":")
+    return getattr(importlib.import_module(module_name), class_name)